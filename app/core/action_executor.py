@@ -1,15 +1,20 @@
 # core/action_executor.py
 
-import webbrowser
-import subprocess
+from core.action_registry import registry as default_registry
+from core.launcher import Launcher
+from core.log import get_logger
+from core.metrics import ACTION_ERRORS
+from core.url_dispatcher import UrlDispatcher
 
-try:
-    import keyboard
-except ImportError:
-    keyboard = None
+log = get_logger("actions")
 
 class ActionExecutor:
-    """Handles execution of configured actions."""
+    """Handles execution of configured actions through the action type plugins."""
+
+    def __init__(self, launcher=None, urls=None, registry=None):
+        self.launcher = launcher or Launcher()
+        self.urls = urls or UrlDispatcher(self.launcher)
+        self.registry = registry or default_registry
     
     def execute(self, action, force=False):
         """
@@ -23,42 +28,16 @@ class ActionExecutor:
             return
 
         action_type = action.get("type")
-        value = action.get("value", "")
-
-        if action_type == "none":
-            return
-
-        if action_type == "open_website":
-            if value:
-                webbrowser.open(value)
-            return
-
-        if action_type == "open_app":
-            if value:
-                subprocess.Popen(value)
-            return
-
-        if action_type == "run_command":
-            if value:
-                subprocess.Popen(f'start cmd /k "{value}"', shell=True)
-            return
-
-        if action_type == "key_combo":
-            if keyboard and value:
-                try:
-                    keyboard.press_and_release(value)
-                except Exception as e:
-                    print(f"[ERROR] Failed to execute key combo: {e}")
-            elif not keyboard:
-                print("[ERROR] 'keyboard' module not installed.")
+        if not action_type or action_type == "none":
             return
 
-        if action_type == "type_text":
-            if keyboard and value:
-                try:
-                    keyboard.write(value)
-                except Exception as e:
-                    print(f"[ERROR] Failed to write text: {e}")
-            elif not keyboard:
-                print("[ERROR] 'keyboard' module not installed.")
+        # Loading a plugin already logs and swallows its import errors
+        plugin = self.registry.get(action_type)
+        if plugin is None:
             return
+        try:
+            plugin.execute(action, self)
+        except Exception:
+            # Third-party plugins must never take the key handler down with them
+            ACTION_ERRORS.inc(action_type)
+            log.error("Action type '%s' failed", action_type, exc_info=True)
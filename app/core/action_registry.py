@@ -0,0 +1,107 @@
+# core/action_registry.py
+
+from importlib.metadata import EntryPoint, entry_points
+
+from core.log import get_logger
+
+log = get_logger("actions")
+
+# Third-party packages add action types by declaring an entry point in this group:
+#
+#   [project.entry-points."macropad.actions"]
+#   obs_scene = "macropad_obs:SwitchScene"
+#
+# The entry point names a class (or factory) that is only imported the first time
+# an action of that type is executed, edited or used by the active preset.
+ENTRY_POINT_GROUP = "macropad.actions"
+
+# Built-in types, in the order the editor lists them
+BUILTIN_ACTIONS = {
+    "open_website": "core.actions.web:OpenWebsite",
+    "open_app": "core.actions.launch:OpenApp",
+    "run_command": "core.actions.launch:RunCommand",
+    "key_combo": "core.actions.keys:KeyCombo",
+    "type_text": "core.actions.keys:TypeText",
+}
+
+
+class ActionRegistry:
+    """Maps action type names to plugins, importing each plugin on first use.
+
+    A plugin is an object with:
+      label             Name shown in the editor
+      schema            {field: {"type": "text"|"url"|"file"|"keys", "placeholder": ..., "required": bool}}
+                        describing the values stored in the key's action dict
+      execute(action, executor)
+                        Runs the action; `executor` gives access to the launcher and URL dispatcher
+      create_editor()   Optional; returns a QWidget with values() and set_values(action) to use
+                        instead of the form generated from the schema
+
+    Type names that no plugin provides are reported once and ignored.
+    """
+
+    def __init__(self, builtins=None, group=ENTRY_POINT_GROUP):
+        self.builtins = BUILTIN_ACTIONS if builtins is None else builtins
+        self.group = group
+        self._entries = None
+        self._plugins = {}
+
+    def _discover(self):
+        # Reading entry point metadata is cheap; nothing is imported until load()
+        if self._entries is None:
+            self._entries = {name: EntryPoint(name, target, self.group) for name, target in self.builtins.items()}
+            try:
+                try:
+                    found = entry_points(group=self.group)
+                except TypeError:
+                    # Python < 3.10
+                    found = entry_points().get(self.group, [])
+                for ep in found:
+                    self._entries[ep.name] = ep
+            except Exception as e:
+                log.error("Failed to read action plugins: %s", e)
+        return self._entries
+
+    def names(self):
+        return list(self._discover())
+
+    def label(self, name):
+        """Display name, without importing the plugin unless it is already loaded."""
+        plugin = self._plugins.get(name)
+        if plugin is not None:
+            return plugin.label
+        return name.replace("_", " ").title()
+
+    def is_loaded(self, name):
+        return self._plugins.get(name) is not None
+
+    def get(self, name):
+        """Returns the plugin for a type name, importing it if needed, or None."""
+        if name in self._plugins:
+            return self._plugins[name]
+        plugin = None
+        entry = self._discover().get(name)
+        if entry is None:
+            log.error("Unknown action type: %s", name)
+        else:
+            try:
+                plugin = entry.load()()
+            except Exception as e:
+                log.error("Failed to load action type '%s' (%s): %s", name, entry.value, e)
+        self._plugins[name] = plugin
+        return plugin
+
+    def preload(self, preset_data):
+        """Imports the plugins a preset uses, so its first key press doesn't pay for the import."""
+        actions = list((preset_data or {}).get("keys", []))
+        actions += (preset_data or {}).get("chords", [])
+        for key in (preset_data or {}).get("keys", []):
+            actions += (key.get("gestures") or {}).values()
+        for action in actions:
+            name = action.get("type", "none")
+            if name != "none" and name not in self._plugins:
+                self.get(name)
+
+
+# Shared instance for the executor and the editor
+registry = ActionRegistry()
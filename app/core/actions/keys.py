@@ -0,0 +1,41 @@
+# core/actions/keys.py
+
+# Only imported when a preset uses keyboard actions; the keyboard hook is slow to load
+try:
+    import keyboard
+except ImportError:
+    keyboard = None
+
+from core.log import get_logger
+
+log = get_logger("actions")
+
+
+class KeyCombo:
+    label = "Key Combo"
+    schema = {"value": {"type": "keys", "required": True}}
+
+    def execute(self, action, executor):
+        value = action.get("value", "")
+        if not keyboard:
+            log.error("'keyboard' module not installed.")
+        elif value:
+            try:
+                keyboard.press_and_release(value)
+            except Exception as e:
+                log.error("Failed to execute key combo %r: %s", value, e)
+
+
+class TypeText:
+    label = "Type Text"
+    schema = {"value": {"type": "text", "required": True}}
+
+    def execute(self, action, executor):
+        value = action.get("value", "")
+        if not keyboard:
+            log.error("'keyboard' module not installed.")
+        elif value:
+            try:
+                keyboard.write(value)
+            except Exception as e:
+                log.error("Failed to write text: %s", e)
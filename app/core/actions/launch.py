@@ -0,0 +1,21 @@
+# core/actions/launch.py
+
+
+class OpenApp:
+    label = "Open App"
+    schema = {"value": {"type": "file", "placeholder": "Path or program name", "required": True}}
+
+    def execute(self, action, executor):
+        value = action.get("value", "")
+        if value:
+            executor.launcher.open_app(value)
+
+
+class RunCommand:
+    label = "Run Command"
+    schema = {"value": {"type": "text", "required": True}}
+
+    def execute(self, action, executor):
+        value = action.get("value", "")
+        if value:
+            executor.launcher.run_command(value)
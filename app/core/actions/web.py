@@ -0,0 +1,11 @@
+# core/actions/web.py
+
+
+class OpenWebsite:
+    label = "Open Website"
+    schema = {"value": {"type": "url", "placeholder": "https://...", "required": True}}
+
+    def execute(self, action, executor):
+        value = action.get("value", "")
+        if value:
+            executor.urls.open(value)
@@ -0,0 +1,349 @@
+# core/device_manager.py
+
+import json
+import os
+import selectors
+import threading
+import time
+
+import serial
+from PySide6.QtCore import QObject, Signal
+
+from core.log import get_logger, suppressed
+from core.metrics import DECODE_ERRORS, EVENTS_RECEIVED, SERIAL_RECONNECTS
+from core.profiler import profiler
+
+log = get_logger("serial")
+
+
+class SerialDevice:
+    """Connection state for a single macropad on one serial port."""
+
+    def __init__(self, device_id, port, preset=None, config=None):
+        self.device_id = device_id
+        self.port = port
+        self.preset = preset  # Preset bound to this pad, None follows the active preset
+        # Firmware settings pushed on every connect, and the config the firmware last reported
+        self.desired_config = dict(config or {})
+        self.config = {}
+        self.write_lock = threading.Lock()
+        self.ser = None
+        self.buffer = b""
+        self.retry_at = 0.0
+        self.last_beat = None  # Host time of the last heartbeat, None until the firmware sends one
+        self.sends_heartbeat = False
+        # Delivery state for acknowledged events: firmware boot id and last sequence seen
+        self.boot = None
+        self.last_seq = 0
+        self.ack_due = False
+        self.health = {}
+        self.connected_before = False  # Tells reconnects apart from the first connect
+
+    @property
+    def is_connected(self):
+        return self.ser is not None and self.ser.is_open
+
+
+class DeviceManager(QObject):
+    """Multiplexes any number of macropads over a single reader thread."""
+    connection_status = Signal(str, bool)  # device_id, connected
+    key_pressed = Signal(str, int)  # device_id, key_index (legacy press-only firmware)
+    key_event = Signal(str, int, bool, int, int)  # device_id, key_index, pressed, firmware ticks_ms, age_ms
+    health_updated = Signal(str, dict)  # device_id, scan-loop summary reported by the firmware
+    config_updated = Signal(str, dict)  # device_id, full firmware config after a change
+    config_error = Signal(str, str)  # device_id, message from the firmware
+
+    # Firmware settings accepted by the CFG command channel
+    CONFIG_FIELDS = ("pins", "scan_ms", "idle_scan_ms", "idle_after_ms", "debounce_ms", "batch")
+
+    # Keys the host tracks (the firmware accepts at most this many pins)
+    KEY_COUNT = 16
+
+    RETRY_INTERVAL = 2.0
+    POLL_TIMEOUT = 0.1
+    # How often the firmware resends unacknowledged events (RESEND_MS in firmware/main.py)
+    FIRMWARE_RESEND = 0.2
+    MAX_LINE = 1024
+
+    def __init__(self, baudrate=115200, heartbeat_interval=0.5, missed_beats=3):
+        super().__init__()
+        self.baudrate = baudrate
+        # The link is declared down after this many heartbeats fail to arrive
+        self.heartbeat_interval = heartbeat_interval
+        self.missed_beats = missed_beats
+        self.devices = {}
+        self.running = False
+        self._closing = []
+        # Serial handles are not selectable on Windows, so fall back to polling there
+        self.selector = selectors.DefaultSelector() if os.name != "nt" else None
+
+    def load_config(self, path, default_port):
+        """Adds devices from a JSON list of {"id", "port", "preset"} entries, or a single default pad.
+
+        The file may also be an object with a "devices" list plus "heartbeat_interval"
+        and "missed_beats" overrides.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            config = [{"id": "pad0", "port": default_port}]
+        if isinstance(config, dict):
+            try:
+                interval = float(config.get("heartbeat_interval", self.heartbeat_interval))
+                beats = int(config.get("missed_beats", self.missed_beats))
+                if interval <= 0 or beats < 1:
+                    raise ValueError("must be positive")
+                self.heartbeat_interval, self.missed_beats = interval, beats
+            except (TypeError, ValueError) as e:
+                log.error("%s: bad heartbeat_interval or missed_beats, using the defaults: %s", path, e)
+            entries = config.get("devices", [])
+        else:
+            entries = config
+        if not isinstance(entries, list):
+            log.error("%s: devices must be a list", path)
+            entries = []
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get("id"), str) or not isinstance(entry.get("port"), str):
+                log.error("%s: skipping device entry without an id and port: %r", path, entry)
+                continue
+            settings = entry.get("config")
+            if settings is not None and not isinstance(settings, dict):
+                log.error("%s: ignoring config of %s, it must be an object", path, entry["id"])
+                settings = None
+            self.add_device(entry["id"], entry["port"], entry.get("preset"), settings)
+
+    def reconnect_latency(self):
+        """Worst-case seconds from a link drop until the presses made meanwhile are redelivered.
+
+        The drop is noticed once the heartbeats stop, the port is reopened on the next
+        retry, and the pad resends its queue on its next resend tick.
+        """
+        return (self.heartbeat_interval * self.missed_beats + self.RETRY_INTERVAL
+                + self.FIRMWARE_RESEND + self.POLL_TIMEOUT)
+
+    def add_device(self, device_id, port, preset=None, config=None):
+        """Registers a pad. It is opened by the reader thread on its next pass."""
+        self.devices[device_id] = SerialDevice(device_id, port, preset, config)
+        return self.devices[device_id]
+
+    def configure(self, device_id, **settings):
+        """Sends firmware settings to a pad, which applies them live and keeps them in flash.
+
+        Accepts scan_ms / idle_scan_ms / idle_after_ms (adaptive scan rate), debounce_ms,
+        batch (events per frame) and pins. The settings are also re-sent whenever the pad
+        reconnects. The firmware answers through config_updated or config_error.
+        """
+        unknown = set(settings) - set(self.CONFIG_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown firmware settings: {', '.join(sorted(unknown))}")
+        dev = self.devices[device_id]
+        dev.desired_config.update(settings)
+        if dev.is_connected:
+            self._write(dev, "CFG:" + json.dumps(settings, separators=(",", ":")) + "\n")
+
+    def remove_device(self, device_id):
+        dev = self.devices.pop(device_id, None)
+        if dev:
+            self._closing.append(dev)
+
+    def bind_preset(self, device_id, preset):
+        """Binds a preset to a pad so its keys no longer follow the active preset."""
+        dev = self.devices.get(device_id)
+        if dev:
+            dev.preset = preset
+
+    def any_connected(self):
+        return any(dev.is_connected for dev in list(self.devices.values()))
+
+    def start(self):
+        """Starts the shared reader thread."""
+        self.running = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self.running = False
+
+    def _run(self):
+        """Internal loop serving every registered pad."""
+        while self.running:
+            while self._closing:
+                self._close(self._closing.pop(), emit=False)
+
+            now = time.monotonic()
+            devices = list(self.devices.values())
+            deadline = self.heartbeat_interval * self.missed_beats
+            for dev in devices:
+                if dev.ser is None and now >= dev.retry_at:
+                    self._open(dev)
+                elif dev.ser is not None and dev.last_beat is not None and now - dev.last_beat > deadline:
+                    # The port is still open but the firmware went quiet
+                    self._close(dev)
+
+            if self.selector is not None and self.selector.get_map():
+                for key, _ in self.selector.select(self.POLL_TIMEOUT):
+                    self._read(key.data)
+            elif self.selector is None:
+                busy = False
+                for dev in devices:
+                    if dev.ser is not None and self._waiting(dev):
+                        self._read(dev)
+                        busy = True
+                if not busy:
+                    time.sleep(0.005)
+            else:
+                time.sleep(self.POLL_TIMEOUT)
+
+    def _open(self, dev):
+        try:
+            dev.ser = serial.Serial(dev.port, self.baudrate, timeout=0)
+        except (OSError, serial.SerialException, ValueError) as e:
+            # Retried every RETRY_INTERVAL while the pad is unplugged, so only at DEBUG
+            log.debug("%s: cannot open %s: %s", dev.device_id, dev.port, e)
+            dev.ser = None
+            dev.retry_at = time.monotonic() + self.RETRY_INTERVAL
+            self.connection_status.emit(dev.device_id, False)
+            return
+        dev.buffer = b""
+        if dev.connected_before:
+            SERIAL_RECONNECTS.inc(dev.device_id)
+        dev.connected_before = True
+        log.info("%s: connected on %s", dev.device_id, dev.port)
+        # Firmware that sent heartbeats before must resume them, otherwise the link is dead
+        dev.last_beat = time.monotonic() if dev.sends_heartbeat else None
+        if self.selector is not None:
+            self.selector.register(dev.ser.fileno(), selectors.EVENT_READ, dev)
+        self.connection_status.emit(dev.device_id, True)
+        if dev.desired_config:
+            self._write(dev, "CFG:" + json.dumps(dev.desired_config, separators=(",", ":")) + "\n")
+        else:
+            self._write(dev, "CFG?\n")
+
+    def _close(self, dev, emit=True):
+        if dev.ser is not None:
+            if self.selector is not None:
+                try:
+                    self.selector.unregister(dev.ser.fileno())
+                except (KeyError, ValueError, OSError):
+                    suppressed(log, "selector.unregister")
+            try:
+                dev.ser.close()
+            except Exception:
+                suppressed(log, "serial.close")
+            dev.ser = None
+        dev.retry_at = time.monotonic() + self.RETRY_INTERVAL
+        if emit:
+            self.connection_status.emit(dev.device_id, False)
+
+    def _waiting(self, dev):
+        try:
+            return dev.ser.in_waiting
+        except (OSError, serial.SerialException) as e:
+            log.warning("%s: link lost: %s", dev.device_id, e)
+            self._close(dev)
+            return 0
+
+    def _read(self, dev):
+        try:
+            data = dev.ser.read(dev.ser.in_waiting or 1)
+        except (OSError, serial.SerialException, TypeError, AttributeError) as e:
+            log.warning("%s: read failed, link lost: %s", dev.device_id, e)
+            self._close(dev)
+            return
+        self._feed(dev, data)
+
+    def _feed(self, dev, data):
+        """Splits buffered bytes into lines and dispatches each complete one."""
+        dev.buffer += data
+        while b"\n" in dev.buffer:
+            raw, dev.buffer = dev.buffer.split(b"\n", 1)
+            self._handle_line(dev, raw.decode(errors="replace").strip())
+        if len(dev.buffer) > self.MAX_LINE:
+            log.warning("%s: dropped %d bytes without a line break", dev.device_id, len(dev.buffer))
+            dev.buffer = b""
+            DECODE_ERRORS.inc(dev.device_id)
+        if dev.ack_due:
+            # One cumulative ack per read, the firmware drops everything up to it
+            dev.ack_due = False
+            self._write(dev, f"ACK:{dev.last_seq}\n")
+
+    def _write(self, dev, text):
+        # Acks come from the reader thread, config frames from the GUI thread
+        try:
+            with dev.write_lock:
+                dev.ser.write(text.encode())
+        except (OSError, serial.SerialException, AttributeError) as e:
+            log.warning("%s: write failed, link lost: %s", dev.device_id, e)
+            self._close(dev)
+
+    def _decode_error(self, dev, line):
+        DECODE_ERRORS.inc(dev.device_id)
+        log.debug("%s: malformed line %r", dev.device_id, line[:80])
+
+    @profiler.traced("serial.line")
+    def _handle_line(self, dev, line):
+        if line.startswith("HB:"):
+            # HB:<uptime_ms>:<scan_hz>:<jitter_us>:<max_loop_us>
+            try:
+                uptime, scan_hz, jitter, max_loop = (int(v) for v in line.split(":")[1:5])
+            except ValueError:
+                self._decode_error(dev, line)
+                return
+            dev.last_beat = time.monotonic()
+            dev.sends_heartbeat = True
+            dev.health = {"uptime_ms": uptime, "scan_hz": scan_hz, "jitter_us": jitter, "max_loop_us": max_loop}
+            self.health_updated.emit(dev.device_id, dev.health)
+        elif line.startswith("EVT:"):
+            # EVT:<boot>:<seq>:<key>:<D|U>:<ticks_ms>:<age_ms>
+            parts = line.split(":")
+            if len(parts) == 7:
+                self._handle_event(dev, parts[1], parts[2:])
+            else:
+                self._decode_error(dev, line)
+        elif line.startswith("EVTS:"):
+            # EVTS:<boot>:<seq>,<key>,<D|U>,<ticks_ms>,<age_ms>|... (batched events)
+            parts = line.split(":", 2)
+            if len(parts) == 3:
+                for event in parts[2].split("|"):
+                    self._handle_event(dev, parts[1], event.split(","))
+            else:
+                self._decode_error(dev, line)
+        elif line.startswith("CFGOK:"):
+            try:
+                dev.config = json.loads(line[6:])
+            except ValueError:
+                self._decode_error(dev, line)
+                return
+            self.config_updated.emit(dev.device_id, dev.config)
+        elif line.startswith("CFGERR:"):
+            log.warning("%s: firmware rejected config: %s", dev.device_id, line[7:])
+            self.config_error.emit(dev.device_id, line[7:])
+        elif line.startswith("KEY:"):
+            try:
+                key_index = int(line.split(":")[1])
+            except ValueError:
+                self._decode_error(dev, line)
+                return
+            EVENTS_RECEIVED.inc()
+            self.key_pressed.emit(dev.device_id, key_index)
+
+    def _handle_event(self, dev, boot, fields):
+        try:
+            seq, key_index, edge, ts, age = fields
+            seq, key_index, ts, age = int(seq), int(key_index), int(ts), int(age)
+        except ValueError:
+            self._decode_error(dev, ",".join(fields))
+            return
+        if boot != dev.boot:
+            # The firmware restarted and numbers events from scratch
+            dev.boot, dev.last_seq = boot, 0
+        dev.ack_due = True
+        if seq <= dev.last_seq:
+            return  # Resent copy of an event that was already delivered
+        dev.last_seq = seq
+        if not 1 <= key_index <= self.KEY_COUNT or edge not in ("D", "U"):
+            # Still acknowledged above, so the pad doesn't keep resending it
+            self._decode_error(dev, ",".join(fields))
+            return
+        EVENTS_RECEIVED.inc()
+        self.key_event.emit(dev.device_id, key_index, edge == "D", ts, age)
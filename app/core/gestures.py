@@ -0,0 +1,190 @@
+# core/gestures.py
+
+import time
+
+TAP = "tap"
+DOUBLE_TAP = "double_tap"
+LONG_PRESS = "long_press"
+CHORD = "chord"
+
+# MicroPython's ticks_ms() wraps around at 2**30
+TICKS_PERIOD = 1 << 30
+TICKS_HALF = TICKS_PERIOD // 2
+
+# Pending decisions a key can be waiting on
+_WAIT_CHORD = 1
+_WAIT_LONG = 2
+_WAIT_DOUBLE = 3
+
+
+def ticks_diff(a, b):
+    """Signed difference a - b between two firmware timestamps, wrap-safe."""
+    return ((a - b + TICKS_HALF) % TICKS_PERIOD) - TICKS_HALF
+
+
+class _KeyState:
+    """Fixed-size per-key state so memory stays constant regardless of traffic."""
+    __slots__ = ("down_at", "age", "pending", "deadline", "consumed")
+
+    def __init__(self):
+        self.down_at = None
+        self.age = 0  # How late the pad delivered the last press, in ms
+        self.pending = 0
+        self.deadline = 0
+        self.consumed = False
+
+
+class GestureEngine:
+    """Turns timestamped press/release edges into tap, double-tap, long-press and chord gestures.
+
+    Decisions are only delayed when the key actually has a competing gesture configured:
+    a key with nothing but a tap action fires on the press edge. `options(key)` returns a
+    (has_double_tap, has_long_press, in_chord) tuple and `has_chord(a, b)` tells whether
+    a two-key chord is configured, both evaluated against the preset at event time.
+
+    Fired gestures are returned as (gesture, key_index, other_key_index, age_ms) tuples;
+    the second key is only set for chords, and age_ms is the delivery delay of the press
+    that started the gesture, whenever and however the gesture was decided. Edges for keys outside 1..key_count are ignored.
+    """
+
+    def __init__(self, options, has_chord, key_count=16,
+                 double_tap_ms=250, long_press_ms=500, chord_ms=50):
+        self.options = options
+        self.has_chord = has_chord
+        self.double_tap_ms = double_tap_ms
+        self.long_press_ms = long_press_ms
+        self.chord_ms = chord_ms
+        self.states = [_KeyState() for _ in range(key_count + 1)]  # 1-based key indices
+        # Firmware clock minus host clock, refreshed on every event
+        self.offset = None
+
+    def _device_now(self):
+        host_ms = int(time.monotonic() * 1000)
+        return (host_ms + self.offset) % TICKS_PERIOD if self.offset is not None else None
+
+    def _sync(self, ts, age):
+        # Events resent after a reconnect are `age` ms old, so the device clock is ts + age now
+        self.offset = ts + age - int(time.monotonic() * 1000)
+
+    def press(self, key, ts, age=0):
+        self._sync(ts, age)
+        fired = self._flush_due(ts)
+        if not 0 < key < len(self.states):
+            return fired
+        st = self.states[key]
+
+        # Chord: another key went down within the chord window and the pair is mapped
+        for other, ost in enumerate(self.states):
+            if other == key or ost.down_at is None or ost.consumed:
+                continue
+            if ticks_diff(ts, ost.down_at) <= self.chord_ms and self.has_chord(key, other):
+                ost.pending = 0
+                ost.consumed = True
+                st.down_at, st.age, st.pending, st.consumed = ts, age, 0, True
+                fired.append((CHORD, min(key, other), max(key, other), age))
+                return fired
+
+        if st.pending == _WAIT_DOUBLE:
+            # Second press inside the window (expired windows were flushed above)
+            st.pending = 0
+            st.down_at, st.age, st.consumed = ts, age, True
+            fired.append((DOUBLE_TAP, key, None, age))
+            return fired
+
+        has_double, has_long, in_chord = self.options(key)
+        st.down_at, st.age, st.consumed, st.pending = ts, age, False, 0
+        if has_long:
+            st.pending, st.deadline = _WAIT_LONG, ts + self.long_press_ms
+        elif has_double:
+            pass  # Decided on release
+        elif in_chord:
+            st.pending, st.deadline = _WAIT_CHORD, ts + self.chord_ms
+        else:
+            st.consumed = True
+            fired.append((TAP, key, None, age))
+        return fired
+
+    def release(self, key, ts, age=0):
+        self._sync(ts, age)
+        fired = self._flush_due(ts)
+        if not 0 < key < len(self.states):
+            return fired
+        st = self.states[key]
+        if st.down_at is None:
+            return fired
+        st.down_at = None
+        if st.consumed:
+            st.pending = 0
+            return fired
+
+        has_double, _, _ = self.options(key)
+        if has_double:
+            st.pending, st.deadline = _WAIT_DOUBLE, ts + self.double_tap_ms
+        else:
+            st.pending = 0
+            fired.append((TAP, key, None, st.age))
+        return fired
+
+    def poll(self):
+        """Fires every gesture whose decision deadline has passed on the device clock."""
+        now = self._device_now()
+        return self._flush_due(now) if now is not None else []
+
+    def ms_until_deadline(self):
+        """Milliseconds until the next pending decision, or None if nothing is pending."""
+        now = self._device_now()
+        if now is None:
+            return None
+        waits = [ticks_diff(st.deadline, now) for st in self.states if st.pending]
+        return max(0, min(waits)) if waits else None
+
+    def _flush_due(self, now):
+        fired = []
+        for key, st in enumerate(self.states):
+            if not st.pending or ticks_diff(now, st.deadline) < 0:
+                continue
+            pending, st.pending = st.pending, 0
+            if pending == _WAIT_LONG:
+                # An early release already resolved the key, so it must still be held here
+                st.consumed = True
+                fired.append((LONG_PRESS, key, None, st.age))
+                continue
+            if pending == _WAIT_CHORD:
+                st.consumed = True
+            fired.append((TAP, key, None, st.age))
+        return fired
+
+
+# Preset JSON helpers. Key indices are 1-based, matching the firmware and the grid labels.
+#   keys[i]["gestures"] = {"double_tap": {action}, "long_press": {action}}
+#   "chords" = [{"keys": [1, 2], "type": ..., "value": ..., "label": ...}]
+
+def find_chord(data, a, b):
+    """Returns the chord action mapped to keys a and b, if any."""
+    pair = {a, b}
+    for chord in data.get("chords", []):
+        if set(chord.get("keys", [])) == pair:
+            return chord
+    return None
+
+
+def gesture_options(data, key, macro_keys=12):
+    """Returns (has_double_tap, has_long_press, in_chord) for a key of the given preset data."""
+    if key > macro_keys:
+        return False, False, False
+    keys = data.get("keys", [])
+    gestures = keys[key - 1].get("gestures", {}) if key <= len(keys) else {}
+    in_chord = any(key in chord.get("keys", []) for chord in data.get("chords", []))
+    return bool(gestures.get(DOUBLE_TAP)), bool(gestures.get(LONG_PRESS)), in_chord
+
+
+def resolve_action(data, key, gesture=TAP, other=None):
+    """Returns the action configured for a gesture, or None."""
+    if gesture == CHORD:
+        return find_chord(data, key, other)
+    keys = data.get("keys", [])
+    if not 0 < key <= len(keys):
+        return None
+    if gesture == TAP:
+        return keys[key - 1]
+    return keys[key - 1].get("gestures", {}).get(gesture)
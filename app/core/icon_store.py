@@ -0,0 +1,282 @@
+# core/icon_store.py
+
+import hashlib
+import json
+import ntpath
+import os
+import shutil
+import zipfile
+from pathlib import Path
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage
+
+from core.log import get_logger
+
+log = get_logger("presets")
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+
+# Presets refer to stored icons as "sha256:<hex digest of the file>"
+REF_PREFIX = "sha256:"
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".ico", ".svg", ".webp")
+# Sizes the UI draws icons at: the overlay tiles, the editor preview and icon picker
+SIZES = (24, 32)
+BUNDLE_FORMAT = 1
+CHUNK = 64 * 1024
+
+
+def _actions(data):
+    """Every action dict in preset data: keys, chords and their gesture actions."""
+    actions = list(data.get("keys", [])) + list(data.get("chords", []))
+    for action in list(actions):
+        actions.extend((action.get("gestures") or {}).values())
+    return actions
+
+
+def _bad_shape(data):
+    """Why preset data read from a bundle can't be used, or None if it can."""
+    if not isinstance(data, dict):
+        return "not a JSON object"
+    for field in ("keys", "chords"):
+        entries = data.get(field, [])
+        if not isinstance(entries, list) or not all(isinstance(a, dict) for a in entries):
+            return f"{field} must be a list of objects"
+        for action in entries:
+            gestures = action.get("gestures") or {}
+            if not isinstance(gestures, dict) or not all(isinstance(g, dict) for g in gestures.values()):
+                return "gestures must map names to objects"
+    return None
+
+
+class IconStore:
+    """Content-addressed icon files under assets/icons/.
+
+    Each icon is stored once as <digest><ext>, whatever it was called and however
+    many presets use it, next to pre-scaled <digest>@<size>.png copies for SIZES.
+    The scaled copies are made on import, and again on first use if they are
+    missing (they are not kept in git). References are plain strings, so a preset
+    works on any machine that has the same store.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._exts = None  # digest -> extension of the original, read on first use
+
+    @staticmethod
+    def is_ref(value):
+        return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+    def _index(self):
+        if self._exts is None:
+            self._exts = {}
+            if self.root.is_dir():
+                for path in self.root.iterdir():
+                    if "@" not in path.stem and path.suffix.lower() in IMAGE_EXTS:
+                        self._exts[path.stem] = path.suffix.lower()
+        return self._exts
+
+    def original(self, ref):
+        """Path of a stored icon as imported, or None if the store doesn't have it."""
+        digest = ref[len(REF_PREFIX):] if self.is_ref(ref) else None
+        ext = self._index().get(digest)
+        return self.root / f"{digest}{ext}" if ext else None
+
+    def path(self, ref, size=None):
+        """Path to draw a stored icon from: the copy pre-scaled to `size` if that is one of SIZES."""
+        original = self.original(ref)
+        if original is None or size not in SIZES:
+            return original
+        variant = self.root / f"{original.stem}@{size}.png"
+        if variant.exists() or self._scale(original, size):
+            return variant
+        return original
+
+    def _scale(self, original, size):
+        image = QImage(str(original))
+        if image.isNull():
+            return False
+        if image.width() > size or image.height() > size:
+            image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        variant = self.root / f"{original.stem}@{size}.png"
+        tmp = variant.with_suffix(".tmp")
+        if not image.save(str(tmp), "PNG"):
+            return False
+        os.replace(tmp, variant)
+        return True
+
+    def import_file(self, path):
+        """Copies an image file into the store; returns its reference, or None if it can't be read."""
+        ext = Path(path).suffix.lower()
+        if ext not in IMAGE_EXTS:
+            log.error("Not an icon file: %s", path)
+            return None
+        try:
+            with open(path, "rb") as f:
+                return self.import_stream(f, ext)
+        except OSError as e:
+            log.error("Failed to import icon %s: %s", path, e)
+            return None
+
+    def import_stream(self, stream, ext):
+        """Streams an image into the store, hashing as it is copied; returns its reference.
+
+        An icon that is already stored is kept as it is, so importing the same image
+        again from anywhere costs no extra space.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        tmp = self.root / f"import-{os.getpid()}-{id(stream)}.tmp"
+        try:
+            with open(tmp, "wb") as out:
+                for chunk in iter(lambda: stream.read(CHUNK), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+            digest = digest.hexdigest()
+            ref = REF_PREFIX + digest
+            if self.original(ref) is None:
+                os.replace(tmp, self.root / f"{digest}{ext}")
+                self._index()[digest] = ext
+                for size in SIZES:
+                    self._scale(self.root / f"{digest}{ext}", size)
+            return ref
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+    def _locate(self, value):
+        """Finds the image a legacy icon path points to, here or under the same name in assets/."""
+        if os.path.isfile(value):
+            return value
+        # Absolute paths written on another machine: ntpath splits on both kinds of separator
+        name = ntpath.basename(value)
+        for folder in (ASSETS_DIR / "custom_icons", self.root):
+            candidate = folder / name
+            if name and candidate.is_file():
+                return candidate
+        return None
+
+    def migrate(self, data):
+        """Replaces icon file paths in preset data (a plain dict) with store references.
+
+        Returns (data, changed, missing); paths that can't be found are left as they are.
+        """
+        changed = False
+        missing = []
+        for action in _actions(data):
+            icon = action.get("icon")
+            if not icon or self.is_ref(icon) or Path(icon).suffix.lower() not in IMAGE_EXTS:
+                continue  # No icon, already stored, or a qtawesome id
+            found = self._locate(icon)
+            ref = self.import_file(found) if found else None
+            if ref is None:
+                missing.append(icon)
+                continue
+            action["icon"] = ref
+            changed = True
+        return data, changed, missing
+
+    def migrate_presets(self, preset_manager):
+        """Moves the icons of every preset into the store; returns the names of the presets changed."""
+        changed_names = []
+        for name in preset_manager.list_presets():
+            preset = preset_manager.peek_preset_data(name)
+            if preset is None:
+                continue
+            data, changed, missing = self.migrate(preset.to_dict())
+            for icon in missing:
+                log.warning("Preset '%s': icon not found, left as is: %s", name, icon)
+            if changed:
+                preset_manager.save_data(name, data)
+                changed_names.append(name)
+        return changed_names
+
+    def refs(self, data):
+        """The stored icons preset data (a plain dict) refers to."""
+        return {a["icon"] for a in _actions(data) if self.is_ref(a.get("icon"))}
+
+    def export_bundle(self, preset_manager, names, dest):
+        """Writes presets and the icons they use to one zip archive.
+
+        `dest` is a path or a writable binary file; the archive is written in a single
+        pass, icon files in chunks, so it can go straight to a pipe or socket.
+        """
+        written = []
+        refs = set()
+        with zipfile.ZipFile(dest, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for name in names:
+                preset = preset_manager.peek_preset_data(name)
+                if preset is None:
+                    continue
+                data, _, _ = self.migrate(preset.to_dict())
+                refs |= self.refs(data)
+                zf.writestr(f"presets/{name}.json", json.dumps(data, indent=4))
+                written.append(name)
+            icons = 0
+            for ref in sorted(refs):
+                original = self.original(ref)
+                if original is None:
+                    log.warning("Icon %s is not in the store, bundle will miss it", ref)
+                    continue
+                with open(original, "rb") as f, zf.open(f"icons/{original.name}", "w") as out:
+                    shutil.copyfileobj(f, out, CHUNK)
+                icons += 1
+            zf.writestr("manifest.json", json.dumps({"format": BUNDLE_FORMAT, "presets": written, "icons": icons}))
+        return written
+
+    def import_bundle(self, preset_manager, src):
+        """Adds the presets and icons of a bundle; returns the names the presets were saved as.
+
+        Icons are streamed into the store and deduplicated. A preset whose name is
+        taken is saved under "<name> (2)", "<name> (3)"... rather than overwriting it.
+        Entries that can't be read or aren't valid presets are skipped and logged.
+        """
+        imported = []
+        with zipfile.ZipFile(src) as zf:
+            presets = []
+            for info in zf.infolist():
+                path = Path(info.filename)
+                if path.parent.name != "presets" or path.suffix != ".json":
+                    continue
+                try:
+                    with zf.open(info) as f:
+                        data = json.load(f)
+                    reason = _bad_shape(data)
+                    if reason:
+                        raise ValueError(reason)
+                # RuntimeError: encrypted entry, NotImplementedError: unknown compression
+                except (ValueError, OSError, RuntimeError, NotImplementedError, zipfile.BadZipFile) as e:
+                    log.error("Skipping %s in bundle: %s", info.filename, e)
+                    continue
+                presets.append((path.stem, data))
+            if not presets:
+                return imported
+
+            for info in zf.infolist():
+                path = Path(info.filename)
+                if info.is_dir() or path.parent.name != "icons" or path.suffix.lower() not in IMAGE_EXTS:
+                    continue
+                try:
+                    with zf.open(info) as f:
+                        ref = self.import_stream(f, path.suffix.lower())
+                except (OSError, RuntimeError, NotImplementedError, zipfile.BadZipFile) as e:
+                    log.error("Skipping %s in bundle: %s", info.filename, e)
+                    continue
+                if ref != REF_PREFIX + path.stem:
+                    log.warning("Bundle icon %s doesn't match its hash", info.filename)
+
+            existing = set(preset_manager.list_presets())
+            for stem, data in presets:
+                name, n = stem, 1
+                while name in existing:
+                    n += 1
+                    name = f"{stem} ({n})"
+                data["name"] = name
+                preset_manager.save_data(name, data)
+                existing.add(name)
+                imported.append(name)
+        return imported
+
+
+# Shared instance for the app's assets folder
+icon_store = IconStore(ASSETS_DIR / "icons")
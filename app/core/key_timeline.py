@@ -0,0 +1,69 @@
+# core/key_timeline.py
+
+import time
+
+# Event kinds
+PRESS = "press"        # Macro key, with or without an action
+FIXED = "fixed"        # APP / LAYER / PREV / NEXT
+STALE = "stale"        # Replayed press dropped as too old
+CONNECT = "connect"
+DISCONNECT = "disconnect"
+
+
+class TimelineEvent:
+    """One slot of the ring buffer; overwritten in place when the buffer wraps."""
+    __slots__ = ("t", "kind", "key", "preset", "label", "gesture", "link_ms", "resolve_ms", "action_ms")
+
+    def __init__(self):
+        self.t = 0.0
+        self.kind = None
+        self.key = 0
+        self.preset = ""
+        self.label = ""
+        self.gesture = ""
+        self.link_ms = 0.0
+        self.resolve_ms = 0.0
+        self.action_ms = 0.0
+
+
+class KeyTimeline:
+    """Fixed-size ring buffer of recent key and connection events.
+
+    Recording fills the oldest slot in place, so it is constant time and the buffer
+    never grows. Per-stage latencies are kept for each press: `link_ms` is how old
+    the event was when the pad delivered it, `resolve_ms` finding the action for the
+    key and gesture, and `action_ms` executing it. Written and read on the GUI thread.
+    """
+
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self.slots = [TimelineEvent() for _ in range(capacity)]
+        self.count = 0  # Events recorded so far; the next one goes to count % capacity
+        # Bumped on every record so readers can cheaply tell whether anything changed
+        self.version = 0
+
+    def record(self, kind, key=0, preset="", label="", gesture="",
+               link_ms=0.0, resolve_ms=0.0, action_ms=0.0):
+        ev = self.slots[self.count % self.capacity]
+        ev.t = time.monotonic()
+        ev.kind = kind
+        ev.key = key
+        ev.preset = preset
+        ev.label = label
+        ev.gesture = gesture
+        ev.link_ms = link_ms
+        ev.resolve_ms = resolve_ms
+        ev.action_ms = action_ms
+        self.count += 1
+        self.version += 1
+
+    def latest(self):
+        return self.slots[(self.count - 1) % self.capacity] if self.count else None
+
+    def since(self, t0):
+        """Yields the events recorded at or after monotonic time `t0`, newest first."""
+        for i in range(self.count - 1, max(self.count - self.capacity, 0) - 1, -1):
+            ev = self.slots[i % self.capacity]
+            if ev.t < t0:
+                return
+            yield ev
@@ -0,0 +1,217 @@
+# core/launcher.py
+
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+
+from core.log import get_logger
+
+log = get_logger("launcher")
+
+
+class PosixBackend:
+    """Launching on Linux/macOS: argv without a shell unless the command needs one."""
+
+    # Anything that only a shell can interpret
+    SHELL_CHARS = set("|&;<>()$`\\\"'*?[]{}~#!\n")
+
+    def split(self, command):
+        """Returns an argv for commands that need no shell, otherwise None."""
+        if any(c in self.SHELL_CHARS for c in command):
+            return None
+        return shlex.split(command)
+
+    def command_argv(self, command):
+        argv = self.split(command)
+        return argv if argv else ["/bin/sh", "-c", command]
+
+    def popen_kwargs(self):
+        # Detach from our process group so children survive and ignore our signals
+        return {"start_new_session": True, "stdin": subprocess.DEVNULL,
+                "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+
+    def session_argv(self):
+        return ["/bin/sh"]
+
+    def session_kwargs(self):
+        return {"start_new_session": True, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+
+    def session_line(self, command):
+        return f"({command}) </dev/null >/dev/null 2>&1 &\n"
+
+
+class WindowsBackend:
+    """Launching on Windows: run_command keeps its own console window, as before."""
+
+    CREATE_NEW_CONSOLE = 0x00000010
+    CREATE_NO_WINDOW = 0x08000000
+
+    def split(self, command):
+        # Keep Windows paths intact (no backslash escapes), then drop the quotes around the program.
+        # Raises ValueError on unbalanced quotes.
+        parts = shlex.split(command, posix=False)
+        if parts:
+            parts[0] = parts[0].strip('"')
+        return parts
+
+    def command_argv(self, command):
+        # One process instead of `cmd /c start cmd /k`. A raw command line, not a list:
+        # list2cmdline would escape inner quotes as \", which cmd doesn't understand.
+        # cmd strips the outer pair of quotes and runs the command exactly as typed.
+        return f'cmd /k "{command}"'
+
+    def popen_kwargs(self):
+        return {"creationflags": self.CREATE_NEW_CONSOLE}
+
+    def session_argv(self):
+        return ["cmd", "/q", "/k"]
+
+    def session_kwargs(self):
+        return {"creationflags": self.CREATE_NO_WINDOW}
+
+    def session_line(self, command):
+        return f'start "" cmd /k "{command}"\r\n'
+
+
+class Launcher:
+    """Starts apps and commands for actions, reaping and capping the processes it spawns.
+
+    The cap only applies to launches still starting up: a child that is still running
+    `settle_s` after launch (an app, a `cmd /k` console) is reaped but no longer counted,
+    so long-lived windows never block new launches. It guards against a burst of
+    presses spawning processes faster than they start.
+
+    Resolved executables are cached per action value. With `warm_shell` enabled
+    ("warm_shell": true in settings.json), commands that have been run `warm_after`
+    times go through one long-lived shell session instead of paying for a new shell
+    every time.
+    """
+
+    def __init__(self, backend=None, max_children=32, warm_shell=False, warm_after=3, reap_interval=2.0,
+                 settle_s=10.0):
+        self.backend = backend or (WindowsBackend() if os.name == "nt" else PosixBackend())
+        self.max_children = max_children
+        self.warm_shell = warm_shell
+        self.warm_after = warm_after
+        self.reap_interval = reap_interval
+        self.settle_s = settle_s
+        self.children = []   # (Popen, start time) of launches still settling, counted against the cap
+        self.detached = []   # Long-running children, only kept to reap them
+        self.command_uses = {}
+        self.session = None
+        self._resolved = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def resolve(self, value):
+        """Returns the argv for an executable path or name, or None if it cannot be found.
+
+        Raises ValueError if the value can't be parsed (unbalanced quotes).
+        """
+        cached = self._resolved.get(value)
+        if cached and os.path.exists(cached[0]):
+            return cached
+
+        expanded = os.path.expandvars(os.path.expanduser(value.strip()))
+        if os.path.isfile(expanded.strip('"')):
+            argv = [expanded.strip('"')]
+        else:
+            argv = self.backend.split(expanded) or [expanded]
+            exe = shutil.which(argv[0])
+            if not exe:
+                return None
+            argv = [exe] + argv[1:]
+        self._resolved[value] = argv
+        return argv
+
+    def open_app(self, value):
+        try:
+            argv = self.resolve(value)
+        except ValueError as e:
+            log.error("Can't launch %s: %s", value, e)
+            return None
+        if not argv:
+            log.error("Application not found: %s", value)
+            return None
+        return self.spawn(argv)
+
+    def run_command(self, value):
+        uses = self.command_uses.get(value, 0) + 1
+        self.command_uses[value] = uses
+        if self.warm_shell and uses >= self.warm_after and self._run_in_session(value):
+            return None
+        return self.spawn(self.backend.command_argv(value))
+
+    def spawn(self, argv):
+        """Starts argv (a list, or a command line string on Windows) as a supervised child process.
+
+        Returns the Popen or None.
+        """
+        with self._lock:
+            self._reap_locked()
+            if len(self.children) >= self.max_children:
+                log.error("Launch refused: %d launches still starting", len(self.children))
+                return None
+            try:
+                proc = subprocess.Popen(argv, **self.backend.popen_kwargs())
+            except OSError as e:
+                log.error("Failed to launch %s: %s", argv if isinstance(argv, str) else argv[0], e)
+                return None
+            self.children.append((proc, time.monotonic()))
+        self._ensure_reaper()
+        return proc
+
+    def _run_in_session(self, command):
+        """Hands a command to the persistent shell, restarting it if it died."""
+        with self._lock:
+            if self.session is None or self.session.poll() is not None:
+                try:
+                    self.session = subprocess.Popen(
+                        self.backend.session_argv(), stdin=subprocess.PIPE,
+                        text=True, **self.backend.session_kwargs())
+                except OSError:
+                    self.session = None
+                    return False
+            try:
+                self.session.stdin.write(self.backend.session_line(command))
+                self.session.stdin.flush()
+            except (OSError, ValueError):
+                self.session = None
+                return False
+        return True
+
+    def _reap_locked(self):
+        settled = time.monotonic() - self.settle_s
+        self.detached = [p for p in self.detached if p.poll() is None]
+        running = [(p, t) for p, t in self.children if p.poll() is None]
+        self.children = [(p, t) for p, t in running if t > settled]
+        self.detached += [p for p, t in running if t <= settled]
+
+    def reap(self):
+        """Collects finished children so they don't linger as zombies; returns how many still run."""
+        with self._lock:
+            self._reap_locked()
+            return len(self.children) + len(self.detached)
+
+    def _ensure_reaper(self):
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        # Exits once nothing is left to supervise; the next launch restarts it
+        while self.reap():
+            time.sleep(self.reap_interval)
+
+    def shutdown(self):
+        """Closes the warm shell session. Launched apps keep running."""
+        with self._lock:
+            if self.session and self.session.poll() is None:
+                try:
+                    self.session.stdin.close()
+                except OSError:
+                    pass
+            self.session = None
@@ -0,0 +1,122 @@
+# core/log.py
+
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+from core.metrics import SUPPRESSED_ERRORS
+
+ROOT = "macropad"
+# Loggers the app uses, one per subsystem; each can have its own level
+SUBSYSTEMS = ("app", "actions", "launcher", "serial", "presets", "scheduler", "metrics", "ui", "theme", "watchdog")
+
+
+def get_logger(subsystem):
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+def suppressed(log, what):
+    """Counts an error that is deliberately ignored; call from the `except` block.
+
+    The count is always kept (and exported as a metric); the traceback is only
+    logged when the subsystem is at DEBUG.
+    """
+    SUPPRESSED_ERRORS.inc(log.name.rpartition(".")[2])
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Suppressed error in %s", what, exc_info=True)
+
+
+class _Enqueue(QueueHandler):
+    """Puts records on the queue untouched; all formatting happens on the writer thread."""
+
+    def prepare(self, record):
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line. Values passed as `extra={"fields": {...}}` become keys."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "subsystem": record.name.rpartition(".")[2],
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LogPipeline:
+    """Asynchronous logging for every subsystem.
+
+    Callers only build a LogRecord and put it on a queue; a QueueListener thread
+    formats it and writes it to a rotating JSON-lines file (and WARNING and above to
+    stderr, where the old print() diagnostics went). Levels are set per subsystem and
+    can be changed while running. Before start(), records fall through to Python's
+    default last-resort handler.
+    """
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.listener = None
+        self.path = None
+
+    def start(self, log_dir, levels=None, max_bytes=1_000_000, backups=5):
+        self.stop()
+        log_dir = Path(log_dir)
+        log_dir.mkdir(parents=True, exist_ok=True)
+        self.path = log_dir / "macropad.jsonl"
+
+        file_handler = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        console = logging.StreamHandler(sys.stderr)
+        console.setLevel(logging.WARNING)
+        console.setFormatter(logging.Formatter("[%(levelname)s] %(name)s: %(message)s"))
+
+        root = logging.getLogger(ROOT)
+        root.setLevel(logging.INFO)
+        root.propagate = False
+        root.handlers = [_Enqueue(self.queue)]
+        self.listener = QueueListener(self.queue, file_handler, console, respect_handler_level=True)
+        self.listener.start()
+        if levels and not isinstance(levels, dict):
+            get_logger("app").error("log_levels must map subsystems to levels, ignored: %r", levels)
+            levels = None
+        for subsystem, level in (levels or {}).items():
+            if not self.set_level(subsystem, level):
+                get_logger("app").error("Ignoring log level %r for subsystem %r", level, subsystem)
+
+    def stop(self):
+        """Writes out everything still queued and closes the file."""
+        if self.listener is not None:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+
+    def set_level(self, subsystem, level):
+        """Sets a subsystem's level ("debug", "INFO", 20...); returns False if either is unknown."""
+        if subsystem not in SUBSYSTEMS:
+            return False
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        if not isinstance(level, int) or isinstance(level, bool):
+            return False
+        get_logger(subsystem).setLevel(level)
+        return True
+
+    def levels(self):
+        return {s: logging.getLevelName(get_logger(s).getEffectiveLevel()) for s in SUBSYSTEMS}
+
+
+# Shared instance, started by the main window
+pipeline = LogPipeline()
@@ -0,0 +1,249 @@
+# core/metrics.py
+
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.memory import rss_bytes
+
+# core.log counts suppressed errors here, so this module takes its logger directly
+log = logging.getLogger("macropad.metrics")
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class _Shards:
+    """Per-thread storage for one metric.
+
+    Every thread that records gets its own dict of cells and is the only writer to it,
+    so recording takes no lock; the GIL keeps each `+=` on a cell whole. Readers sum
+    the cells of all threads, including threads that have exited.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._all = []
+
+    def mine(self):
+        try:
+            return self._local.cells
+        except AttributeError:
+            cells = self._local.cells = {}
+            self._all.append(cells)  # Once per thread; list.append is atomic
+            return cells
+
+    def snapshot(self):
+        """[(labels, cell)] of every thread; copying a dict's items is atomic under the GIL."""
+        return [item for cells in list(self._all) for item in list(cells.items())]
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _num(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count, optionally split by label values."""
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._shards = _Shards()
+
+    def inc(self, *values, amount=1):
+        cells = self._shards.mine()
+        cell = cells.get(values)
+        if cell is None:
+            cell = cells[values] = [0]
+        cell[0] += amount
+
+    def value(self, *values):
+        return sum(cell[0] for labels, cell in self._shards.snapshot() if labels == values)
+
+    def samples(self):
+        totals = {}
+        for labels, cell in self._shards.snapshot():
+            totals[labels] = totals.get(labels, 0) + cell[0]
+        for labels, total in sorted(totals.items()):
+            yield f"{self.name}_total{_labels(self.labels, labels)} {total}"
+
+
+class Histogram:
+    """Distribution of observed values over fixed bucket upper bounds."""
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _Shards()
+
+    def observe(self, value, *values):
+        cells = self._shards.mine()
+        cell = cells.get(values)
+        if cell is None:
+            # Per-bucket counts (the last one is +Inf), then the sum
+            cell = cells[values] = [[0] * (len(self.buckets) + 1), 0.0]
+        cell[0][bisect.bisect_left(self.buckets, value)] += 1
+        cell[1] += value
+
+    def samples(self):
+        totals = {}
+        for labels, (counts, total) in self._shards.snapshot():
+            acc = totals.setdefault(labels, [[0] * len(counts), 0.0])
+            acc[0] = [a + c for a, c in zip(acc[0], counts)]
+            acc[1] += total
+        for labels, (counts, total) in sorted(totals.items()):
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                le = f'le="{le}"'
+                yield f"{self.name}_bucket{_labels(self.labels, labels, le)} {running}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {running}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {_num(total)}"
+
+
+class Gauge:
+    """Current value, read from a function when scraped rather than recorded."""
+    kind = "gauge"
+
+    def __init__(self, name, help, read):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def samples(self):
+        yield f"{self.name} {_num(self.read())}"
+
+
+class MetricsRegistry:
+    """The metrics the app exposes, rendered in the OpenMetrics text format."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric, unit=""):
+        metric.unit = unit
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            samples = list(metric.samples())
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if metric.unit:
+                lines.append(f"# UNIT {metric.name} {metric.unit}")
+            lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            lines.extend(samples)
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+# Shared instance; the metrics are recorded from the GUI, serial reader and server threads
+metrics = MetricsRegistry()
+
+KEY_PRESSES = metrics.add(Counter(
+    "macropad_key_presses", "Key presses handled, by action type (none when unmapped, function for APP/LAYER/PREV/NEXT).",
+    ("type",)))
+ACTION_LATENCY = metrics.add(Histogram(
+    "macropad_action_latency_seconds", "Time to run a key's action on the GUI thread, by action type.",
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0), ("type",)), "seconds")
+ACTION_ERRORS = metrics.add(Counter(
+    "macropad_action_errors", "Actions whose plugin raised while running, by action type.", ("type",)))
+STALE_PRESSES = metrics.add(Counter(
+    "macropad_stale_presses", "Presses dropped because the pad delivered them too late."))
+SCHEDULED_RUNS = metrics.add(Counter(
+    "macropad_scheduled_runs", "Keys run by the scheduler, by whether the run was late.", ("late",)))
+PRESET_SWITCHES = metrics.add(Counter(
+    "macropad_preset_switches", "Preset changes: direct, PREV/NEXT steps, or a pad's bound preset.", ("source",)))
+SERIAL_RECONNECTS = metrics.add(Counter(
+    "macropad_serial_reconnects", "Times a pad's serial link came back after being up before.", ("device",)))
+DECODE_ERRORS = metrics.add(Counter(
+    "macropad_serial_decode_errors", "Malformed or over-long lines received from a pad.", ("device",)))
+EVENTS_RECEIVED = metrics.add(Counter(
+    "macropad_key_events_received", "Key events the serial reader passed on to the GUI thread."))
+EVENTS_HANDLED = metrics.add(Counter(
+    "macropad_key_events_handled", "Key events the GUI thread has handled."))
+metrics.add(Gauge(
+    "macropad_key_event_queue_depth", "Key events received but not yet handled by the GUI thread.",
+    lambda: max(EVENTS_RECEIVED.value() - EVENTS_HANDLED.value(), 0)))
+SUPPRESSED_ERRORS = metrics.add(Counter(
+    "macropad_suppressed_errors", "Errors caught and deliberately ignored, by subsystem.", ("subsystem",)))
+WATCHDOG_STALLS = metrics.add(Counter(
+    "macropad_watchdog_stalls", "Times the GUI event loop stopped turning for longer than the watchdog threshold."))
+URLS_QUEUED = metrics.add(Counter(
+    "macropad_urls_queued", "URLs handed to the background URL opener."))
+URLS_OPENED = metrics.add(Counter(
+    "macropad_urls_opened", "URLs the background URL opener has taken off its queue."))
+metrics.add(Gauge(
+    "macropad_url_queue_depth", "URLs waiting to be opened.",
+    lambda: max(URLS_QUEUED.value() - URLS_OPENED.value(), 0)))
+metrics.add(Gauge(
+    "process_resident_memory_bytes", "Resident set size of the controller process.", rss_bytes), "bytes")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # One line per scrape would only add noise
+
+
+class MetricsServer:
+    """Serves GET /metrics on localhost from a background thread.
+
+    Only binds to the loopback interface, so the counters can be scraped by an agent on
+    the same machine but never from the network.
+    """
+
+    DEFAULT_PORT = 9477
+
+    def __init__(self, registry=metrics, port=DEFAULT_PORT, host="127.0.0.1"):
+        self.registry = registry
+        self.port = port
+        self.host = host
+        self.httpd = None
+
+    def start(self):
+        """Starts serving; returns False (and stays off) if the port can't be bound."""
+        try:
+            self.httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        except OSError as e:
+            log.error("Metrics endpoint unavailable on %s:%s: %s", self.host, self.port, e)
+            return False
+        self.httpd.daemon_threads = True
+        self.httpd.registry = self.registry
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return True
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
@@ -0,0 +1,171 @@
+# core/preset.py
+
+import sys
+from types import MappingProxyType
+
+# Field names with their own slot; anything else an action carries goes to `extra`
+ACTION_FIELDS = ("type", "value", "label", "icon")
+
+
+def _intern(value):
+    # Types, icons and common values repeat across keys and presets; share one copy
+    return sys.intern(value) if type(value) is str else value
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, (Action, Preset)):
+        return value.to_dict()
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+class _Frozen:
+    """Base for snapshots: attributes are set once in __init__ and never again."""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, s) == getattr(other, s) for s in self.__slots__)
+
+    def __ne__(self, other):
+        return not self == other
+
+    # Read access like the dicts these replace
+    def __getitem__(self, field):
+        value = self.get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field):
+        return self.get(field) is not None
+
+    def items(self):
+        return self.to_dict().items()
+
+
+class Action(_Frozen):
+    """One configured action: a key, a gesture on a key, or a chord."""
+    __slots__ = ("type", "value", "label", "icon", "gestures", "extra")
+
+    def __init__(self, type="none", value=None, label=None, icon=None, gestures=None, extra=None):
+        set_ = object.__setattr__
+        set_(self, "type", type)
+        set_(self, "value", value)
+        set_(self, "label", label)
+        set_(self, "icon", icon)
+        set_(self, "gestures", gestures)
+        set_(self, "extra", extra)
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, Action):
+            return data
+        data = data or {}
+        gestures = data.get("gestures")
+        if gestures:
+            gestures = MappingProxyType({k: cls.from_dict(v) for k, v in gestures.items()})
+        extra = {k: _freeze(v) for k, v in data.items() if k not in ACTION_FIELDS and k != "gestures"}
+        return cls(_intern(data.get("type", "none")), _intern(data.get("value")),
+                   _intern(data.get("label")), _intern(data.get("icon")),
+                   gestures or None, MappingProxyType(extra) if extra else None)
+
+    def get(self, field, default=None):
+        if field in ACTION_FIELDS or field == "gestures":
+            value = getattr(self, field)
+        elif self.extra is not None:
+            value = self.extra.get(field)
+        else:
+            value = None
+        return default if value is None else value
+
+    def to_dict(self):
+        data = {f: getattr(self, f) for f in ACTION_FIELDS if getattr(self, f) is not None}
+        if self.extra:
+            data.update(_thaw(self.extra))
+        if self.gestures:
+            data["gestures"] = _thaw(self.gestures)
+        return data
+
+    def __hash__(self):
+        return hash((self.type, self.value, self.label, self.icon))
+
+    def __repr__(self):
+        return f"Action({self.to_dict()!r})"
+
+
+EMPTY_ACTION = Action("none", "", "")
+
+
+class Preset(_Frozen):
+    """Immutable snapshot of a preset.
+
+    Edits return a new snapshot, which PresetManager swaps in with a single assignment,
+    so any thread holding a snapshot sees one consistent version without locking.
+    """
+    __slots__ = ("name", "keys", "chords", "extra")
+
+    def __init__(self, name, keys=(), chords=(), extra=None):
+        set_ = object.__setattr__
+        set_(self, "name", name)
+        set_(self, "keys", tuple(keys))
+        set_(self, "chords", tuple(chords))
+        set_(self, "extra", extra)
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, Preset):
+            return data
+        extra = {k: _freeze(v) for k, v in data.items() if k not in ("name", "keys", "chords")}
+        return cls(data.get("name"),
+                   (Action.from_dict(k) for k in data.get("keys", [])),
+                   (Action.from_dict(c) for c in data.get("chords", [])),
+                   MappingProxyType(extra) if extra else None)
+
+    def get(self, field, default=None):
+        if field in self.__slots__ and field != "extra":
+            value = getattr(self, field)
+        elif self.extra is not None:
+            value = self.extra.get(field)
+        else:
+            value = None
+        return default if value is None else value
+
+    def to_dict(self):
+        data = {"name": self.name, "keys": [k.to_dict() for k in self.keys]}
+        if self.chords:
+            data["chords"] = [c.to_dict() for c in self.chords]
+        if self.extra:
+            data.update(_thaw(self.extra))
+        return data
+
+    def with_key(self, index, action):
+        """Returns a copy with key `index` (0-based) replaced, padding with empty keys."""
+        keys = list(self.keys)
+        while len(keys) <= index:
+            keys.append(EMPTY_ACTION)
+        keys[index] = Action.from_dict(action)
+        return Preset(self.name, keys, self.chords, self.extra)
+
+    def with_name(self, name):
+        return Preset(name, self.keys, self.chords, self.extra)
+
+    def __repr__(self):
+        return f"Preset({self.name!r}, {len(self.keys)} keys)"
@@ -0,0 +1,135 @@
+# core/preset_index.py
+
+import re
+from bisect import bisect_left, insort
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Prefixes up to this length are looked up directly; longer ones scan the sorted tokens
+SHORT_PREFIX = 3
+
+# Positions of the set bits in every byte value, for walking result bitmaps
+_BYTE_BITS = [tuple(b for b in range(8) if v >> b & 1) for v in range(256)]
+
+
+def tokenize(text):
+    return _WORD.findall(str(text).lower())
+
+
+def preset_tokens(name, data):
+    """Words a preset can be found by: its name, and every action's label, value and icon."""
+    tokens = set(tokenize(name))
+    keys = list((data or {}).get("keys", []))
+    actions = keys + list((data or {}).get("chords", []))
+    for key in keys:
+        actions += (key.get("gestures") or {}).values()
+    for action in actions:
+        for field in ("label", "value", "icon"):
+            if action.get(field):
+                tokens.update(tokenize(action[field]))
+    return tokens
+
+
+def _prefixes(token):
+    return {token[:n] for n in range(1, min(len(token), SHORT_PREFIX) + 1)}
+
+
+class PresetIndex:
+    """In-memory inverted index from words to preset names, updated one preset at a time.
+
+    Each preset gets a slot number and every posting list is an int used as a bitmap
+    over the slots, so matching a query is a handful of big-int ANDs/ORs no matter how
+    many presets match. Every query term is matched as a word prefix and all terms must
+    match, so results can be shown while the user is still typing. Matches come back in
+    slot order, i.e. the order presets were added.
+    """
+
+    def __init__(self):
+        self.postings = {}   # token -> bitmap of slots
+        self.prefixes = {}   # short prefix -> bitmap of slots
+        self.tokens = []     # Sorted tokens, for longer prefixes
+        self.slots = {}      # preset name -> slot
+        self.names = []      # slot -> preset name (None once removed)
+        self.indexed = {}    # preset name -> its tokens
+        self.all = 0         # Bitmap of live slots
+
+    def __len__(self):
+        return len(self.slots)
+
+    def update(self, name, data):
+        if name in self.slots:
+            self.remove(name, keep_slot=True)
+            slot = self.slots[name]
+        else:
+            slot = self.slots[name] = len(self.names)
+            self.names.append(name)
+        bit = 1 << slot
+        tokens = preset_tokens(name, data)
+        self.indexed[name] = tokens
+        self.all |= bit
+        for token in tokens:
+            mask = self.postings.get(token)
+            if mask is None:
+                mask = 0
+                insort(self.tokens, token)
+            self.postings[token] = mask | bit
+        for prefix in set().union(*map(_prefixes, tokens)):
+            self.prefixes[prefix] = self.prefixes.get(prefix, 0) | bit
+
+    def remove(self, name, keep_slot=False):
+        tokens = self.indexed.pop(name, None)
+        if tokens is None:
+            return
+        slot = self.slots[name]
+        bit = 1 << slot
+        self.all &= ~bit
+        for token in tokens:
+            mask = self.postings[token] & ~bit
+            if mask:
+                self.postings[token] = mask
+            else:
+                del self.postings[token]
+                del self.tokens[bisect_left(self.tokens, token)]
+        for prefix in set().union(*map(_prefixes, tokens)):
+            mask = self.prefixes[prefix] & ~bit
+            if mask:
+                self.prefixes[prefix] = mask
+            else:
+                del self.prefixes[prefix]
+        if not keep_slot:
+            # Slots aren't reused, so the order of the remaining presets stays put
+            del self.slots[name]
+            self.names[slot] = None
+
+    def _match(self, term):
+        if len(term) <= SHORT_PREFIX:
+            return self.prefixes.get(term, 0)
+        mask = 0
+        i = bisect_left(self.tokens, term)
+        while i < len(self.tokens) and self.tokens[i].startswith(term):
+            mask |= self.postings[self.tokens[i]]
+            i += 1
+        return mask
+
+    def match(self, query):
+        """Returns the bitmap of presets matching every word in `query`."""
+        mask = self.all
+        for term in tokenize(query):
+            mask &= self._match(term)
+            if not mask:
+                break
+        return mask
+
+    def iter_names(self, mask):
+        """Yields the names in a bitmap lazily, a byte of slots at a time."""
+        data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        names = self.names
+        for i, byte in enumerate(data):
+            if byte:
+                base = i * 8
+                for b in _BYTE_BITS[byte]:
+                    yield names[base + b]
+
+    def search(self, query):
+        """Returns the names of presets matching every word in `query`."""
+        return list(self.iter_names(self.match(query)))
@@ -1,27 +1,134 @@
 import json
+import os
+import threading
 from pathlib import Path
 
+from core.log import get_logger
+from core.preset import Preset
+from core.preset_index import PresetIndex
+
+log = get_logger("presets")
+
+
 class PresetManager:
-    """Manages loading, saving, and modification of key presets."""
+    """Manages loading, saving, and modification of key presets.
+
+    Presets are immutable Preset snapshots. Edits build a new snapshot and swap it in
+    with a single assignment, so readers on other threads need no lock: they take
+    `current_preset_data` once and keep using that object.
+    """
 
     def __init__(self, folder):
         self.folder = Path(folder)
         self.folder.mkdir(exist_ok=True)
         self.current_preset = "default"
-        self.current_preset_data = {"name": "default", "keys": []}
+        self.current_preset_data = Preset("default")
+        # Parsed presets keyed by name: (signature, data)
+        self._cache = {}
+        # Last seen (mtime, size) of every preset file, to spot external edits without parsing
+        self._signatures = {}
+        for path in self.folder.glob("*.json"):
+            try:
+                self._signatures[path.stem] = self._signature(path)
+            except OSError:
+                continue
+        # Search index, built by build_index() (or else on the first search) and then kept up to date
+        self.index = None
+        self._builder = None
+        self._built = None
+        self._pending = set()  # Presets changed while the index was being built
+
+    @staticmethod
+    def _signature(path):
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read(self, name, cache=True):
+        """Parses a preset file and caches it. Returns None if it can't be read."""
+        path = self.folder / f"{name}.json"
+        try:
+            sig = self._signature(path)
+            with open(path, "r", encoding="utf-8") as f:
+                data = Preset.from_dict(json.load(f))
+        except (json.JSONDecodeError, OSError, AttributeError, TypeError) as e:
+            log.error("Failed to read preset '%s': %s", name, e)
+            return None
+        if cache:
+            self._cache[name] = (sig, data)
+            self._signatures[name] = sig
+        return data
+
+    def _reindex(self, name, data=None):
+        if self.index is None:
+            if self._builder is not None:
+                self._pending.add(name)
+            return
+        if data is None:
+            data = self.peek_preset_data(name)
+        if data is not None:
+            self.index.update(name, data)
+
+    def _unindex(self, name):
+        if self.index is not None:
+            self.index.remove(name)
+        elif self._builder is not None:
+            self._pending.add(name)
+
+    def build_index(self):
+        """Starts building the search index on a background thread.
+
+        Indexing reads every preset file once, which takes seconds with thousands of
+        presets; doing it here, when presets load, keeps that off the first keystroke.
+        """
+        if self.index is None and self._builder is None:
+            self._builder = threading.Thread(target=self._build, name="preset-index", daemon=True)
+            self._builder.start()
+
+    def _build(self):
+        # Only reads files; presets edited meanwhile are queued in _pending and redone after
+        index = PresetIndex()
+        for name in self.list_presets():
+            if not (self.folder / f"{name}.json").exists():
+                continue  # Deleted or renamed since the listing; _pending has it
+            data = self._read(name, cache=False)
+            if data is not None:
+                index.update(name, data)
+        self._built = index
+
+    def _ready_index(self):
+        if self._builder is not None:
+            self._builder.join()  # Only waits when a search comes before the build is done
+            self.index, self._builder, self._built = self._built, None, None
+            present = set(self.list_presets()) if self._pending else ()
+            for name in self._pending:
+                if name in present:
+                    self._reindex(name)
+                else:
+                    self.index.remove(name)
+            self._pending.clear()
+        elif self.index is None:
+            # Nobody called build_index(): index on this thread
+            self.index = PresetIndex()
+            for name in self.list_presets():
+                self._reindex(name)
+        return self.index
+
+    def search(self, query):
+        """Yields the names of presets whose name, labels, values or icons match `query`.
+
+        Names are produced lazily, so callers showing a page of results don't pay for the rest.
+        """
+        index = self._ready_index()
+        return index.iter_names(index.match(query))
 
     def count_total_mapped_keys(self):
         """Counts total mapped keys across all presets."""
         total = 0
-        for p_file in self.folder.glob("*.json"):
-            try:
-                with open(p_file, "r") as f:
-                    data = json.load(f)
-                    keys = data.get("keys", [])
-                    # Count keys where type is not "none"
-                    total += sum(1 for k in keys if k.get("type") != "none")
-            except (json.JSONDecodeError, OSError):
-                continue
+        for name in self.list_presets():
+            data = self.get_preset_data(name)
+            if data:
+                # Count keys where type is not "none"
+                total += sum(1 for k in data.get("keys", []) if k.get("type") != "none")
         return total
 
     def ensure_default_preset(self):
@@ -31,22 +138,96 @@ class PresetManager:
 
     def load_preset(self, name):
         """Loads a preset by name."""
-        path = self.folder / f"{name}.json"
-        if path.exists():
-            with open(path, "r", encoding="utf-8") as f:
-                self.current_preset_data = json.load(f)
+        data = self._cached_or_read(name)
+        if data is not None:
+            self.current_preset_data = data
             self.current_preset = name
         return self.current_preset_data
 
+    def get_preset_data(self, name):
+        """Returns a preset's data without making it the active preset."""
+        if name == self.current_preset:
+            return self.current_preset_data
+        return self._cached_or_read(name)
+
+    def peek_preset_data(self, name):
+        """Like get_preset_data(), but a preset that isn't in memory is read without caching it."""
+        if name == self.current_preset:
+            return self.current_preset_data
+        cached = self._cache.get(name)
+        return cached[1] if cached else self._read(name, cache=False)
+
+    def _cached_or_read(self, name):
+        try:
+            sig = self._signature(self.folder / f"{name}.json")
+        except OSError:
+            return None
+        cached = self._cache.get(name)
+        if cached and cached[0] == sig:
+            return cached[1]
+        return self._read(name)
+
+    def reload_changed(self):
+        """Picks up preset files added, edited or deleted outside the app.
+
+        Only files whose (mtime, size) changed are looked at, and only the ones held in
+        memory are re-parsed; the rest are read when next used. The active preset's data
+        is replaced in a single assignment, never edited in place.
+        Returns (changed, removed) lists of preset names.
+        """
+        changed = []
+        seen = set()
+        for path in self.folder.glob("*.json"):
+            name = path.stem
+            seen.add(name)
+            try:
+                sig = self._signature(path)
+            except OSError:
+                continue
+            if self._signatures.get(name) == sig:
+                continue
+            self._signatures[name] = sig
+            if name == self.current_preset or name in self._cache:
+                data = self._read(name)
+                if data is None:
+                    continue  # Keep the last good version, e.g. while a sync is half-written
+                if name == self.current_preset:
+                    self.current_preset_data = data
+            self._reindex(name)
+            changed.append(name)
+
+        removed = [name for name in self._signatures if name not in seen]
+        for name in removed:
+            del self._signatures[name]
+            self._cache.pop(name, None)
+            self._unindex(name)
+        return changed, removed
+
     def create_preset(self, name):
         """Creates a new preset with default empty keys."""
         data = {"name": name, "keys": [{"type": "none", "value": "", "label": ""} for _ in range(12)]}
         self.save_data(name, data)
 
     def save_data(self, name, data):
-        """Saves preset data to disk."""
-        with open(self.folder / f"{name}.json", "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        """Saves preset data (a Preset or a plain dict) to disk."""
+        data = Preset.from_dict(data)
+        path = self.folder / f"{name}.json"
+        # Write a temp file and swap it in, so watchers never see a half-written preset
+        tmp = path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data.to_dict(), f, indent=4)
+        os.replace(tmp, path)
+        # Our own writes are already in memory and shouldn't come back as external edits
+        sig = self._signature(path)
+        self._cache[name] = (sig, data)
+        self._signatures[name] = sig
+        self._reindex(name, data)
+        if name == self.current_preset:
+            self.current_preset_data = data
+
+    def update_key(self, index, action):
+        """Replaces one key (0-based) of the active preset and saves it."""
+        self.save_data(self.current_preset, self.current_preset_data.with_key(index, action))
 
     def list_presets(self):
         """Returns a list of all preset names."""
@@ -59,28 +240,41 @@ class PresetManager:
         
         if old_path.exists():
             old_path.rename(new_path)
+            self._cache.pop(old_name, None)
+            self._signatures.pop(old_name, None)
+            self._signatures[new_name] = self._signature(new_path)
+            self._unindex(old_name)
+            self._reindex(new_name)
             # Update the internal tracking if this was the active preset
             if self.current_preset == old_name:
                 self.current_preset = new_name
                 # Also update the 'name' key inside the JSON data
-                self.current_preset_data["name"] = new_name
-                self.save_data(new_name, self.current_preset_data)
+                self.save_data(new_name, self.current_preset_data.with_name(new_name))
 
     def delete_preset(self, name):
         """Deletes a preset file."""
         path = self.folder / f"{name}.json"
         if path.exists():
             path.unlink() # This deletes the actual file
+        self._cache.pop(name, None)
+        self._signatures.pop(name, None)
+        self._unindex(name)
         
         # Reset internal memory if we deleted the active one
         if self.current_preset == name:
             self.current_preset = "default"
             self.load_preset("default")
 
-    def get_next_preset(self):
+    def get_relative_preset(self, name, step):
+        """Returns the preset `step` positions away from `name`, wrapping around."""
         p = self.list_presets()
-        return p[(p.index(self.current_preset) + 1) % len(p)] if p else None
+        if not p:
+            return None
+        idx = p.index(name) if name in p else 0
+        return p[(idx + step) % len(p)]
+
+    def get_next_preset(self):
+        return self.get_relative_preset(self.current_preset, 1)
 
     def get_prev_preset(self):
-        p = self.list_presets()
-        return p[(p.index(self.current_preset) - 1) % len(p)] if p else None
\ No newline at end of file
+        return self.get_relative_preset(self.current_preset, -1)
\ No newline at end of file
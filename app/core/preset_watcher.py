@@ -0,0 +1,44 @@
+# core/preset_watcher.py
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+
+class PresetWatcher(QObject):
+    """Notices preset files changed outside the app (scripts, sync tools) and reloads them.
+
+    File system events are debounced, since editors and sync clients often write a file
+    in several steps, and the actual diffing is left to PresetManager.reload_changed().
+    """
+
+    # changed preset names, removed preset names
+    presets_changed = Signal(list, list)
+
+    def __init__(self, preset_manager, debounce_ms=300, parent=None):
+        super().__init__(parent)
+        self.preset_manager = preset_manager
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule)
+        self.watcher.fileChanged.connect(self.schedule)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self.scan)
+        self._watch()
+
+    def _watch(self):
+        # Atomic saves replace the file, which drops its watch, so re-add what is missing
+        folder = self.preset_manager.folder
+        paths = {str(folder)} | {str(p) for p in folder.glob("*.json")}
+        missing = paths - set(self.watcher.files()) - set(self.watcher.directories())
+        if missing:
+            self.watcher.addPaths(sorted(missing))
+
+    def schedule(self, _path=None):
+        self.timer.start()
+
+    def scan(self):
+        self._watch()
+        changed, removed = self.preset_manager.reload_changed()
+        if changed or removed:
+            self.presets_changed.emit(changed, removed)
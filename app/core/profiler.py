@@ -0,0 +1,171 @@
+# core/profiler.py
+
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+class _NullSpan:
+    """Shared no-op context returned while profiling is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.profiler.add_event(self.name, self.start, end, threading.get_ident(), self.args)
+        return False
+
+
+class Profiler:
+    """Records instrumented spans (and optional samples or cProfile data) as a Chrome trace.
+
+    While disabled, `span()` returns a shared no-op context and `traced` wrappers only
+    check a flag, so the hooks can stay in hot paths.
+    """
+
+    MODES = ("spans", "sample", "cprofile")
+
+    def __init__(self, sample_interval=0.005):
+        self.enabled = False
+        self.mode = "spans"
+        self.out_dir = Path("profiles")
+        self.sample_interval = sample_interval
+        self.events = []
+        self._origin = 0.0
+        self._cprofile = None
+        self._sampler = None
+        self._main_ident = threading.main_thread().ident
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def traced(self, name):
+        """Decorator form of span() for whole functions."""
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*a, **kw):
+                if not self.enabled:
+                    return fn(*a, **kw)
+                with _Span(self, name, None):
+                    return fn(*a, **kw)
+            return inner
+        return wrap
+
+    def add_event(self, name, start, end, tid, args=None, cat="span"):
+        # list.append is atomic, so any thread may record without a lock
+        event = {"name": name, "cat": cat, "ph": "X", "pid": os.getpid(), "tid": tid,
+                 "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def start(self, mode="spans"):
+        """Starts recording. `mode` adds a stack sampler ("sample") or cProfile ("cprofile") to the spans."""
+        if self.enabled:
+            return
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiler mode: {mode}")
+        self.mode = mode
+        self.events = []
+        self._origin = time.perf_counter()
+        if mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self.enabled = True
+        if mode == "sample":
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        """Stops recording and writes the trace. Returns the trace path, or None if not running.
+
+        Raises OSError if the files can't be written; recording is stopped either way.
+        """
+        if not self.enabled:
+            return None
+        self.enabled = False
+        if self._sampler:
+            self._sampler.join()
+            self._sampler = None
+        cprofile, self._cprofile = self._cprofile, None
+        if cprofile:
+            cprofile.disable()
+        events, self.events = self.events, []
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+        if cprofile:
+            cprofile.dump_stats(self.out_dir / f"profile-{stamp}.prof")
+
+        names = {t.ident: t.name for t in threading.enumerate()}
+        meta = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                 "args": {"name": names.get(tid, str(tid))}}
+                for tid in {e["tid"] for e in events}]
+        path = self.out_dir / f"trace-{stamp}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": meta + events, "displayTimeUnit": "ms"}, f)
+        return path
+
+    def toggle(self, mode="spans"):
+        """Starts or stops recording. Returns the trace path when it stops."""
+        if self.enabled:
+            return self.stop()
+        self.start(mode)
+        return None
+
+    def _sample_loop(self):
+        """Samples the main thread's stack and folds unchanged frames into flame-chart spans."""
+        open_frames = []  # [(label, start)] from the outermost frame inwards
+        while self.enabled:
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self._main_ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.reverse()
+
+            depth = 0
+            while depth < len(open_frames) and depth < len(stack) and open_frames[depth][0] == stack[depth]:
+                depth += 1
+            for label, start in reversed(open_frames[depth:]):
+                self.add_event(label, start, now, self._main_ident, cat="sample")
+            open_frames = open_frames[:depth] + [(label, now) for label in stack[depth:]]
+            time.sleep(self.sample_interval)
+
+        now = time.perf_counter()
+        for label, start in reversed(open_frames):
+            self.add_event(label, start, now, self._main_ident, cat="sample")
+
+
+# Shared instance so any module can add spans without threading it through constructors
+profiler = Profiler()
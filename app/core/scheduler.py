@@ -0,0 +1,206 @@
+# core/scheduler.py
+
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from core.log import get_logger
+
+log = get_logger("scheduler")
+
+# A run this late is still a normal run (timer jitter, a busy event loop)
+GRACE_S = 60
+# Longest the timer sleeps before re-checking the wall clock, so clock changes and
+# resume from sleep are noticed even when the next run is hours away
+MAX_SLEEP_S = 60
+
+MISSED_POLICIES = ("once", "skip")
+
+
+def _local_midnight(ts):
+    day = datetime.fromtimestamp(ts).replace(hour=0, minute=0, second=0, microsecond=0)
+    return day.timestamp(), (day + timedelta(days=1)).timestamp()
+
+
+def next_daily(at, after):
+    """Next wall-clock time after `after` at local time of day `at` ("HH:MM" or "HH:MM:SS")."""
+    parts = [int(p) for p in at.split(":")]
+    h, m, s = (parts + [0, 0])[:3]
+    base = datetime.fromtimestamp(after)
+    when = base.replace(hour=h, minute=m, second=s, microsecond=0)
+    if when.timestamp() <= after:
+        when = (base + timedelta(days=1)).replace(hour=h, minute=m, second=s, microsecond=0)
+    return when.timestamp()
+
+
+def next_interval(every, after):
+    """Next multiple of `every` seconds since local midnight after `after`; the grid restarts each day."""
+    midnight, next_midnight = _local_midnight(after)
+    due = midnight + (int((after - midnight) // every) + 1) * every
+    return min(due, next_midnight)
+
+
+class Schedule:
+    """One trigger from a preset's "schedules" list."""
+    __slots__ = ("preset", "key", "at", "every", "after_key", "delay", "missed", "generation")
+
+    def __init__(self, preset, key, at=None, every=None, after_key=None, delay=0.0, missed="once", generation=0):
+        self.preset = preset
+        self.key = key
+        self.at = at
+        self.every = every
+        self.after_key = after_key
+        self.delay = delay
+        self.missed = missed
+        self.generation = generation
+
+    @classmethod
+    def from_dict(cls, preset, entry, generation):
+        """Validates one entry; raises ValueError with the reason if it can't be used."""
+        key = int(entry.get("key", 0))
+        if not 1 <= key <= 12:
+            raise ValueError(f"key must be 1-12, not {key}")
+        missed = entry.get("missed", "once")
+        if missed not in MISSED_POLICIES:
+            raise ValueError(f"missed must be one of {', '.join(MISSED_POLICIES)}")
+        sched = cls(preset, key, missed=missed, generation=generation)
+        if "at" in entry:
+            sched.at = str(entry["at"])
+            next_daily(sched.at, time.time())  # Raises on a malformed time
+        elif "every" in entry:
+            sched.every = float(entry["every"])
+            if not 1 <= sched.every <= 86400:
+                # Slots restart at midnight, so anything longer would silently run daily
+                raise ValueError("every must be 1-86400 seconds (use at for daily runs)")
+        elif "after_key" in entry:
+            sched.after_key = int(entry["after_key"])
+            if not 1 <= sched.after_key <= 12:
+                raise ValueError(f"after_key must be 1-12, not {sched.after_key}")
+            sched.delay = float(entry.get("delay", 0))
+            if not sched.delay >= 0:
+                raise ValueError("delay must be 0 or more seconds")
+        else:
+            raise ValueError("needs one of at, every or after_key")
+        return sched
+
+    def next_due(self, after):
+        if self.at is not None:
+            return next_daily(self.at, after)
+        if self.every is not None:
+            return next_interval(self.every, after)
+        return None  # Delayed triggers only run when their key is pressed
+
+
+class Scheduler(QObject):
+    """Runs preset keys at times of day, on intervals, or a delay after another key.
+
+    Every pending run of every preset sits in one heap ordered by wall-clock due time,
+    and a single-shot QTimer is armed for the earliest one, so the number of timers
+    doesn't grow with the number of schedules. Reloading a preset bumps its generation;
+    heap entries from older generations are dropped when they surface.
+
+    Missed runs are decided the same way whatever the cause (sleep, a stalled loop, a
+    clock change): a run more than GRACE_S late runs once ("missed": "once", default) or
+    not at all ("skip"), and a recurring schedule then continues from its next slot
+    after now; missed slots are never replayed one by one.
+    """
+
+    # (preset, key, late) for every run; `late` is True when it was a missed run
+    fired = Signal(str, int, bool)
+
+    def __init__(self, preset_manager, parent=None):
+        super().__init__(parent)
+        self.preset_manager = preset_manager
+        self.heap = []             # (due, seq, Schedule)
+        self.seq = itertools.count()
+        self.generations = {}      # preset -> current generation
+        self.delayed = {}          # preset -> {after_key: [Schedule]}
+        self.counts = {}           # preset -> number of schedules
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run_due)
+
+    def load_all(self):
+        for name in self.preset_manager.list_presets():
+            self._load(name, self.preset_manager.peek_preset_data(name))
+        self._arm()
+
+    def reload(self, *names):
+        """Re-reads the schedules of presets that changed, were renamed or were deleted."""
+        present = set(self.preset_manager.list_presets())
+        for name in names:
+            self._load(name, self.preset_manager.peek_preset_data(name) if name in present else None)
+        self._arm()
+
+    def _load(self, name, data):
+        generation = self.generations.get(name, 0) + 1
+        self.generations[name] = generation
+        self.delayed.pop(name, None)
+
+        now = time.time()
+        count = 0
+        for entry in (data or {}).get("schedules", ()):
+            try:
+                sched = Schedule.from_dict(name, entry, generation)
+            except (ValueError, TypeError, AttributeError) as e:
+                log.error("Ignoring schedule in preset '%s': %s", name, e)
+                continue
+            count += 1
+            if sched.after_key is not None:
+                self.delayed.setdefault(name, {}).setdefault(sched.after_key, []).append(sched)
+            else:
+                heapq.heappush(self.heap, (sched.next_due(now), next(self.seq), sched))
+        if count:
+            self.counts[name] = count
+        else:
+            self.counts.pop(name, None)
+
+        # Drop dead entries once they make up most of the heap
+        if len(self.heap) > 2 * max(len(self), 16):
+            self.heap = [e for e in self.heap if e[2].generation == self.generations.get(e[2].preset)]
+            heapq.heapify(self.heap)
+
+    def __len__(self):
+        """Number of live schedules."""
+        return sum(self.counts.values())
+
+    def key_pressed(self, preset, key):
+        """Starts the delayed schedules that follow `key` in `preset`."""
+        waiting = self.delayed.get(preset, {}).get(key)
+        if not waiting:
+            return
+        now = time.time()
+        for sched in waiting:
+            heapq.heappush(self.heap, (now + sched.delay, next(self.seq), sched))
+        self._arm()
+
+    def _arm(self):
+        while self.heap and self.heap[0][2].generation != self.generations.get(self.heap[0][2].preset):
+            heapq.heappop(self.heap)
+        if not self.heap:
+            self.timer.stop()
+            return
+        wait = min(max(self.heap[0][0] - time.time(), 0.0), MAX_SLEEP_S)
+        self.timer.start(int(wait * 1000))
+
+    def run_due(self):
+        now = time.time()
+        while self.heap and self.heap[0][0] <= now:
+            due, _, sched = heapq.heappop(self.heap)
+            if sched.generation != self.generations.get(sched.preset):
+                continue  # The preset was reloaded since this run was queued
+            late = now - due > GRACE_S
+            if not late or sched.missed == "once":
+                self.fired.emit(sched.preset, sched.key, late)
+            nxt = sched.next_due(now)
+            if nxt is not None:
+                heapq.heappush(self.heap, (nxt, next(self.seq), sched))
+        self._arm()
+
+    def pending(self):
+        """(due, preset, key) of queued runs, soonest first."""
+        return sorted((due, s.preset, s.key) for due, _, s in self.heap
+                      if s.generation == self.generations.get(s.preset))
@@ -1,46 +1,61 @@
 # serial_manager.py
-import serial
-import threading
-import time
 from PySide6.QtCore import QObject, Signal
 
+from core.device_manager import DeviceManager
+
 class SerialManager(QObject):
-    """Manages the serial connection to the macropad hardware."""
+    """Manages the serial connection to a single macropad.
+
+    Thin wrapper around DeviceManager for callers that only care about one port.
+    """
     connection_status = Signal(bool)
     key_pressed = Signal(int)  # Signal to safely send data to main thread
 
+    DEVICE_ID = "default"
+
     def __init__(self, port, callback, baudrate=115200):
         super().__init__()
         self.port = port
         self.baudrate = baudrate
-        self.running = False
-        self.ser = None
+        self.manager = DeviceManager(baudrate)
+        self.manager.add_device(self.DEVICE_ID, port)
+        self.manager.connection_status.connect(self._on_status)
+        self.manager.key_pressed.connect(self._on_key)
+        self.manager.key_event.connect(self._on_event)
         # Connect the signal to your callback so it executes on the main thread
         self.key_pressed.connect(callback)
 
+    @property
+    def running(self):
+        return self.manager.running
+
+    @property
+    def ser(self):
+        return self.manager.devices[self.DEVICE_ID].ser
+
+    @property
+    def config(self):
+        """Firmware settings as last reported by the pad."""
+        return self.manager.devices[self.DEVICE_ID].config
+
+    def configure(self, **settings):
+        """Tunes the firmware live (scan rate, debounce, mode, batch, pins). See DeviceManager.configure."""
+        self.manager.configure(self.DEVICE_ID, **settings)
+
     def start(self):
         """Starts the serial listening thread."""
-        self.running = True
-        threading.Thread(target=self._run, daemon=True).start()
-
-    def _run(self):
-        """Internal loop to read from serial port."""
-        while self.running:
-            try:
-                if not self.ser:
-                    self.ser = serial.Serial(self.port, self.baudrate, timeout=0.1)
-                    self.connection_status.emit(True)
-                
-                line = self.ser.readline().decode().strip()
-                if line.startswith("KEY:"):
-                    # Emit signal instead of calling callback directly
-                    self.key_pressed.emit(int(line.split(":")[1]))
-            except (OSError, serial.SerialException, ValueError):
-                if self.ser:
-                    try:
-                        self.ser.close()
-                    except Exception:
-                        pass
-                    self.ser = None
-                self.connection_status.emit(False)
-                time.sleep(2)
\ No newline at end of file
+        self.manager.start()
+
+    def stop(self):
+        self.manager.stop()
+
+    def _on_status(self, device_id, connected):
+        self.connection_status.emit(connected)
+
+    def _on_key(self, device_id, key_index):
+        self.key_pressed.emit(key_index)
+
+    def _on_event(self, device_id, key_index, pressed, ts, age_ms):
+        # Plain single-port callers only care about presses
+        if pressed:
+            self.key_pressed.emit(key_index)
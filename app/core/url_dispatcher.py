@@ -0,0 +1,107 @@
+# core/url_dispatcher.py
+
+import os
+import queue
+import shlex
+import threading
+import time
+import webbrowser
+
+from core.log import get_logger
+from core.metrics import URLS_OPENED, URLS_QUEUED
+
+log = get_logger("actions")
+
+
+class UrlDispatcher:
+    """Opens URLs off the GUI thread through a browser controller resolved once at startup.
+
+    URLs requested within `batch_window` seconds of each other are opened together,
+    in a single browser invocation when the browser accepts several URLs at once.
+    """
+
+    # Browsers whose command line takes any number of URLs and opens each in a tab
+    MULTI_URL_BROWSERS = {
+        "chrome", "google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+        "firefox", "msedge", "microsoft-edge", "brave", "brave-browser", "vivaldi", "opera",
+    }
+
+    def __init__(self, launcher=None, batch_window=0.05):
+        self.launcher = launcher
+        self.batch_window = batch_window
+        self.controller = None
+        self.browser = None  # Executable of the default browser, when it can be found
+        self.ready = threading.Event()
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def open(self, url):
+        """Queues a URL; returns immediately."""
+        URLS_QUEUED.inc()
+        self._queue.put(url)
+
+    def _resolve(self):
+        # Probing for a browser can take a while, so it happens here rather than on first use
+        try:
+            self.controller = webbrowser.get()
+        except webbrowser.Error:
+            self.controller = None
+        if os.name == "nt":
+            # webbrowser's WindowsDefault only knows os.startfile(), one URL per call
+            self.browser = self._windows_default_browser()
+        else:
+            self.browser = getattr(self.controller, "name", None)
+        self.ready.set()
+
+    @staticmethod
+    def _windows_default_browser():
+        """Executable registered for http:// links for the current user, or None."""
+        import winreg
+        try:
+            key = r"Software\Microsoft\Windows\Shell\Associations\UrlAssociations\http\UserChoice"
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, key) as k:
+                prog_id = winreg.QueryValueEx(k, "ProgId")[0]
+            with winreg.OpenKey(winreg.HKEY_CLASSES_ROOT, prog_id + r"\shell\open\command") as k:
+                command = winreg.QueryValueEx(k, "")[0]
+            # e.g. "C:\Program Files\Google\Chrome\Application\chrome.exe" --single-argument %1
+            exe = shlex.split(command, posix=False)[0].strip('"')
+        except (OSError, ValueError, IndexError) as e:
+            log.debug("Default browser not found, URLs open one by one: %s", e)
+            return None
+        return exe if os.path.isfile(exe) else None
+
+    def _run(self):
+        self._resolve()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            URLS_OPENED.inc(amount=len(batch))
+            self._open_batch(list(dict.fromkeys(batch)))
+
+    def _multi_url_argv(self, urls):
+        name = self.browser or ""
+        browser = os.path.splitext(os.path.basename(name))[0].lower()
+        if browser in self.MULTI_URL_BROWSERS and self.launcher is not None:
+            return [name] + urls
+        return None
+
+    def _open_batch(self, urls):
+        argv = self._multi_url_argv(urls) if len(urls) > 1 else None
+        if argv and self.launcher.spawn(argv):
+            return
+        for url in urls:
+            try:
+                if self.controller is not None:
+                    self.controller.open(url, new=2)
+                else:
+                    webbrowser.open(url)
+            except Exception as e:
+                log.error("Failed to open %s: %s", url, e)
@@ -0,0 +1,86 @@
+# core/usage_stats.py
+
+import heapq
+import json
+import os
+from pathlib import Path
+
+from core.log import get_logger
+
+log = get_logger("app")
+
+
+class UsageStats:
+    """Keeps per-preset, per-key press counters and latency aggregates in memory."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        # {preset: {key_index: [count, total_ms, max_ms, label]}}
+        self.data = {}
+        # Bumped on every record so readers can cheaply tell whether anything changed
+        self.version = 0
+        self._flushed_version = 0
+        self.load()
+
+    def record(self, preset, key_index, latency_ms, label=""):
+        """Records a single key press. Constant work, no I/O."""
+        keys = self.data.get(preset)
+        if keys is None:
+            keys = self.data[preset] = {}
+        entry = keys.get(key_index)
+        if entry is None:
+            entry = keys[key_index] = [0, 0.0, 0.0, label]
+        entry[0] += 1
+        entry[1] += latency_ms
+        if latency_ms > entry[2]:
+            entry[2] = latency_ms
+        if label:
+            entry[3] = label
+        self.version += 1
+
+    def _rows(self):
+        for preset, keys in self.data.items():
+            for key_index, (count, total, peak, label) in keys.items():
+                yield preset, key_index, count, total, peak, label
+
+    def top_keys(self, n=5):
+        """Returns the n most pressed keys as (preset, key_index, label, count)."""
+        rows = heapq.nlargest(n, self._rows(), key=lambda r: r[2])
+        return [(p, k, label, count) for p, k, count, _, _, label in rows]
+
+    def slowest_actions(self, n=5):
+        """Returns the n keys with the highest average latency as (preset, key_index, label, avg_ms, max_ms)."""
+        rows = heapq.nlargest(n, self._rows(), key=lambda r: r[3] / r[2] if r[2] else 0.0)
+        return [(p, k, label, total / count if count else 0.0, peak) for p, k, count, total, peak, label in rows]
+
+    def load(self):
+        """Loads previously flushed counters, ignoring a missing or corrupt file."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                rows = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        for row in rows:
+            try:
+                preset, key_index, count, total, peak, label = row
+                self.data.setdefault(preset, {})[int(key_index)] = [int(count), float(total), float(peak), label]
+            except (TypeError, ValueError):
+                continue
+
+    def flush(self):
+        """Writes the counters to disk if they changed since the last flush."""
+        if self.version == self._flushed_version:
+            return False
+        # One flat row per key keeps the file small: [preset, key, count, total_ms, max_ms, label]
+        rows = [[p, k, c, round(t, 2), round(m, 2), label] for p, k, c, t, m, label in self._rows()]
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(rows, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.error("Failed to save usage stats: %s", e)
+            return False
+        self._flushed_version = self.version
+        return True
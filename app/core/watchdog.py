@@ -0,0 +1,69 @@
+# core/watchdog.py
+
+import sys
+import threading
+import time
+import traceback
+
+from core.log import get_logger
+from core.metrics import WATCHDOG_STALLS
+
+
+class StallWatchdog:
+    """Watches the GUI event loop from a background thread and logs where it stalls.
+
+    The main thread calls `tick()` from a repeating timer. When no tick arrives within
+    `threshold` seconds, the main thread's current Python stack is captured with
+    sys._current_frames() and logged; the total duration is logged once it recovers.
+    Records go through the "watchdog" logger of the log pipeline, and every stall is
+    counted in the macropad_watchdog_stalls metric.
+    """
+
+    def __init__(self, threshold=0.25):
+        self.threshold = threshold
+        self.last_tick = time.monotonic()
+        self.running = False
+        # Metrics
+        self.stall_count = 0
+        self.longest_stall = 0.0
+        self._main_ident = threading.main_thread().ident
+        self.logger = get_logger("watchdog")
+
+    def tick(self):
+        """Called on the main thread; proves the event loop is still turning."""
+        self.last_tick = time.monotonic()
+
+    def start(self):
+        self.running = True
+        self.last_tick = time.monotonic()
+        threading.Thread(target=self._run, name="stall-watchdog", daemon=True).start()
+
+    def stop(self):
+        self.running = False
+
+    def _main_stack(self):
+        frame = sys._current_frames().get(self._main_ident)
+        return traceback.extract_stack(frame) if frame is not None else []
+
+    def _run(self):
+        stall_started = None
+        while self.running:
+            time.sleep(self.threshold / 4)
+            last_tick = self.last_tick
+            lag = time.monotonic() - last_tick
+
+            if stall_started is None and lag > self.threshold:
+                stall_started = last_tick
+                self.stall_count += 1
+                WATCHDOG_STALLS.inc()
+                stack = self._main_stack()
+                where = f"{stack[-1].filename}:{stack[-1].lineno} in {stack[-1].name}" if stack else "unknown"
+                self.logger.warning(
+                    "Main loop stalled for %.0f ms at %s", lag * 1000, where,
+                    extra={"fields": {"stack": "".join(traceback.format_list(stack)).rstrip()}})
+            elif stall_started is not None and last_tick != stall_started:
+                duration = last_tick - stall_started
+                self.longest_stall = max(self.longest_stall, duration)
+                self.logger.info("Main loop recovered after %.0f ms", duration * 1000,
+                                 extra={"fields": {"stall_ms": round(duration * 1000)}})
+                stall_started = None
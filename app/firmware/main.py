@@ -1,30 +1,270 @@
 from machine import Pin
+import json
+import math
+import random
+import sys
 import time
 
+# Defaults, overridden by config.json in flash and by CFG frames from the host
 # Your actual GPIO pins (1–20, skipping 15, 17, 19)
-button_pins = [
+DEFAULT_PINS = [
     1, 2, 3, 4,
     5, 6, 7, 8,
     9, 10, 11, 12,
     13, 14, 18, 22
 ]
+# The host tracks at most this many keys
+MAX_KEYS = 16
 
-# Create input pins with pull-up resistors
-buttons = [Pin(p, Pin.IN, Pin.PULL_UP) for p in button_pins]
+config = {
+    "pins": list(DEFAULT_PINS),
+    "scan_ms": 1,          # Delay between scans right after activity
+    "idle_scan_ms": 10,    # Delay between scans once the pad is idle
+    "idle_after_ms": 500,  # Quiet time (no edges, no key held) before backing off
+    "debounce_ms": 0,      # A new level must be stable this long before it is reported
+    "batch": 8,            # Max events packed into one frame (1 = one line per event)
+}
+CONFIG_FILE = "config.json"
 
-# Track previous state to detect new presses
-last_state = [1] * 16
+# How often the host gets a heartbeat with the scan-loop timing summary
+HEARTBEAT_MS = 500
 
-print("Macropad firmware started")
+# Unacknowledged events are kept (oldest dropped first) and resent at this interval
+QUEUE_SIZE = 64
+RESEND_MS = 200
 
-while True:
+
+def check_config(update):
+    """Raises ValueError (or TypeError) if any setting in `update` can't be applied."""
+    if not isinstance(update, dict):
+        raise TypeError("settings must be an object")
+    for key, value in update.items():
+        if key not in config:
+            raise ValueError("unknown setting " + key)
+        if key in ("scan_ms", "idle_scan_ms", "idle_after_ms", "debounce_ms") and not 0 <= int(value) <= 10000:
+            raise ValueError("bad " + key)
+        if key == "batch" and not 1 <= int(value) <= 16:
+            raise ValueError("bad batch")
+        if key == "pins" and not isinstance(value, list):
+            raise ValueError("pins must be a list")
+
+
+def load_config():
+    try:
+        with open(CONFIG_FILE) as f:
+            stored = json.load(f)
+        # Older firmware stored a reporting mode; presses and releases are now always sent
+        if isinstance(stored, dict):
+            stored.pop("mode", None)
+        check_config(stored)
+    except (OSError, ValueError, TypeError):
+        return  # Missing or invalid (e.g. written by an older firmware): keep the defaults
+    config.update(stored)
+
+
+def save_config():
+    with open(CONFIG_FILE, "w") as f:
+        json.dump(config, f)
+
+
+def make_buttons(pins):
+    """Input pins with pull-up resistors; raises ValueError if the list can't be used."""
+    if not isinstance(pins, list) or not 1 <= len(pins) <= MAX_KEYS:
+        raise ValueError("pins must be a list of 1-%d pins" % MAX_KEYS)
+    buttons = []
+    for p in pins:
+        if not isinstance(p, int) or isinstance(p, bool):
+            raise ValueError("bad pin " + repr(p))
+        try:
+            buttons.append(Pin(p, Pin.IN, Pin.PULL_UP))
+        except Exception:
+            raise ValueError("bad pin " + repr(p))
+    return buttons
+
+
+def setup_pins(new_buttons=None):
+    global buttons, last_state, last_change
+    buttons = new_buttons if new_buttons is not None else make_buttons(config["pins"])
+    # Track previous state to detect presses and releases
+    last_state = [1] * len(buttons)
+    last_change = [0] * len(buttons)
+
+
+load_config()
+try:
+    setup_pins()
+except ValueError:
+    # Never leave the pad unusable at boot: go back to the wiring it shipped with
+    config["pins"] = list(DEFAULT_PINS)
+    setup_pins()
+
+# Scan-loop timing since the last heartbeat
+loop_count = 0
+period_sum = 0
+period_sq_sum = 0
+period_max = 0
+last_loop_us = time.ticks_us()
+last_beat = time.ticks_ms()
+
+# Last time a key changed or was held, drives the adaptive scan rate
+last_activity = time.ticks_ms()
+
+# Events waiting for a host ACK: [seq, key, edge, ticks_ms]
+# The boot id lets the host tell a restart (sequence back to 1) from a resend
+BOOT_ID = random.getrandbits(16)
+pending = []
+seq = 0
+last_send = time.ticks_ms()
+
+
+def write(line):
+    # One write per frame: print() can split the text and the newline into two USB packets
+    sys.stdout.write(line + "\n")
+
+
+def scan(now):
+    """Reads every key once and returns the new events, also queued for resending."""
+    global seq, last_activity
+    events = []
+    held = False
     for i, b in enumerate(buttons):
         val = b.value()
 
-        # Button pressed (active low)
-        if val == 0 and last_state[i] == 1:
-            print(f"KEY:{i+1}")
+        # Report both edges (active low) with the device timestamp,
+        # the host uses them to tell taps, double-taps and long-presses apart
+        if val == 0:
+            held = True
+        if val == last_state[i]:
+            last_change[i] = now
+        elif time.ticks_diff(now, last_change[i]) >= config["debounce_ms"]:
+            last_state[i] = val
+            last_change[i] = now
+            held = True
+            seq += 1
+            event = [seq, i + 1, "D" if val == 0 else "U", now]
+            if len(pending) >= QUEUE_SIZE:
+                pending.pop(0)
+            pending.append(event)
+            events.append(event)
+    if held:
+        last_activity = now
+    return events
+
+
+def scan_interval(now):
+    """Scans fast while keys are in use and backs off once the pad has been idle."""
+    if time.ticks_diff(now, last_activity) < config["idle_after_ms"]:
+        return config["scan_ms"]
+    return config["idle_scan_ms"]
+
+
+def send_events(events, now):
+    if config["batch"] <= 1:
+        # EVT:<boot>:<seq>:<key>:<D|U>:<ticks_ms>:<age_ms>
+        for e in events:
+            write(f"EVT:{BOOT_ID}:{e[0]}:{e[1]}:{e[2]}:{e[3]}:{time.ticks_diff(now, e[3])}")
+        return
+    # EVTS:<boot>:<seq>,<key>,<D|U>,<ticks_ms>,<age_ms>|... up to `batch` events per line,
+    # so edges found in the same scan (chords, rolls) share one USB transfer
+    size = config["batch"]
+    for start in range(0, len(events), size):
+        chunk = events[start:start + size]
+        body = "|".join(f"{e[0]},{e[1]},{e[2]},{e[3]},{time.ticks_diff(now, e[3])}" for e in chunk)
+        write(f"EVTS:{BOOT_ID}:{body}")
+
+
+def apply_config(update):
+    # Validate everything, and open the new pins, before touching the live config
+    check_config(update)
+    new_buttons = None
+    if "pins" in update and update["pins"] != config["pins"]:
+        new_buttons = make_buttons(update["pins"])
+    config.update(update)
+    if new_buttons is not None:
+        setup_pins(new_buttons)
+    save_config()
+
+
+def handle_host_line(line):
+    global pending
+    if line.startswith("ACK:"):
+        try:
+            acked = int(line[4:])
+        except ValueError:
+            return
+        pending = [e for e in pending if e[0] > acked]
+    elif line == "CFG?":
+        write("CFGOK:" + json.dumps(config))
+    elif line.startswith("CFG:"):
+        # CFG:<json object with the settings to change>, answered with the full config
+        try:
+            apply_config(json.loads(line[4:]))
+        except (ValueError, TypeError) as e:
+            write(f"CFGERR:{e}")
+            return
+        write("CFGOK:" + json.dumps(config))
+
+
+def heartbeat(now):
+    global loop_count, period_sum, period_sq_sum, period_max, last_beat
+    # HB:<uptime_ms>:<scan_hz>:<jitter_us>:<max_loop_us>
+    elapsed = time.ticks_diff(now, last_beat)
+    scan_hz = loop_count * 1000 // elapsed
+    jitter = 0
+    if loop_count:
+        mean = period_sum / loop_count
+        jitter = int(math.sqrt(max(0, period_sq_sum / loop_count - mean * mean)))
+    write(f"HB:{now}:{scan_hz}:{jitter}:{period_max}")
+    loop_count = period_sum = period_sq_sum = period_max = 0
+    last_beat = now
+
+
+def main():
+    global last_send, last_loop_us, loop_count, period_sum, period_sq_sum, period_max
+    import select
+
+    # Host -> device lines arrive on stdin, read without blocking the scan loop
+    poller = select.poll()
+    poller.register(sys.stdin, select.POLLIN)
+    host_line = ""
+
+    write("Macropad firmware started")
+
+    while True:
+        now = time.ticks_ms()
+        events = scan(now)
+        if events:
+            send_events(events, now)
+            last_send = now
+
+        while poller.poll(0):
+            ch = sys.stdin.read(1)
+            if ch == "\n":
+                handle_host_line(host_line.strip())
+                host_line = ""
+            elif len(host_line) < 512:
+                host_line += ch
+
+        # Keep resending until the host acknowledges, so presses survive reconnects
+        if pending and time.ticks_diff(now, last_send) >= RESEND_MS:
+            send_events(pending, now)
+            last_send = now
+
+        if time.ticks_diff(now, last_beat) >= HEARTBEAT_MS:
+            heartbeat(now)
+
+        time.sleep_ms(scan_interval(now))
+
+        loop_us = time.ticks_us()
+        period = time.ticks_diff(loop_us, last_loop_us)
+        last_loop_us = loop_us
+        loop_count += 1
+        period_sum += period
+        period_sq_sum += period * period
+        if period > period_max:
+            period_max = period
 
-        last_state[i] = val
 
-    time.sleep(0.01)
\ No newline at end of file
+# MicroPython runs main.py as __main__; the host-side benchmark imports it instead
+if __name__ == "__main__":
+    main()
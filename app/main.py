@@ -1,18 +1,36 @@
 import sys
 import ctypes
+import json
 import os
+import time
 from pathlib import Path
 
 from PySide6.QtWidgets import QApplication, QMainWindow, QSystemTrayIcon, QMenu
-from PySide6.QtCore import Qt, Signal, QEvent
-from PySide6.QtGui import QAction, QIcon
+from PySide6.QtCore import Qt, Signal, QEvent, QTimer
+from PySide6.QtGui import QAction, QIcon, QPixmapCache
 from PySide6.QtNetwork import QLocalServer, QLocalSocket
 
 from ui.main_window import MainView
 from ui.overlay import OverlayWindow
+from ui.theme import theme
 from core.preset_manager import PresetManager
-from core.serial_manager import SerialManager
+from core.preset_watcher import PresetWatcher
+from core.device_manager import DeviceManager
 from core.action_executor import ActionExecutor
+from core.launcher import Launcher
+from core.usage_stats import UsageStats
+from core.key_timeline import KeyTimeline, PRESS, FIXED, STALE, CONNECT, DISCONNECT
+from core.scheduler import Scheduler
+from core.metrics import (MetricsServer, KEY_PRESSES, ACTION_LATENCY, STALE_PRESSES, SCHEDULED_RUNS,
+                          PRESET_SWITCHES, EVENTS_HANDLED)
+from core.profiler import profiler
+from core.watchdog import StallWatchdog
+from core.log import get_logger, pipeline
+from core.icon_store import icon_store
+from core.memory import rss_bytes, release_heap
+from core.gestures import GestureEngine, TAP, find_chord, gesture_options, resolve_action
+
+log = get_logger("app")
 
 # Windows Taskbar Icon Fix
 try:
@@ -23,6 +41,16 @@ except Exception:
 class MainWindow(QMainWindow):
     show_ui_signal = Signal()
 
+    # PREV/NEXT presses retarget at once; the UI and notification follow once presses stop this long
+    PRESET_SETTLE_MS = 250
+
+    # Heavy UI resources are released after the window has been hidden this long
+    TRIM_AFTER_MS = 60000
+
+    # Presses replayed after a reconnect are dropped once they are this much later than the
+    # slowest reconnect (see DeviceManager.reconnect_latency)
+    STALE_MARGIN_MS = 1000
+
     def __init__(self):
         super().__init__()
         
@@ -30,39 +58,154 @@ class MainWindow(QMainWindow):
         os.chdir(self.base_path)
         icon_path = str(self.base_path / "icon.png")
         self.app_icon = QIcon(icon_path)
+        self.settings_path = self.base_path / "settings.json"
+
+        # Structured logs: records are queued here and written as JSON lines by a
+        # background thread; "log_levels" in settings.json sets levels per subsystem
+        pipeline.start(self.base_path / "logs", levels=self.setting("log_levels", {}))
+        QApplication.instance().aboutToQuit.connect(pipeline.stop)
 
         self.test_mode = False
         self.overlay = None
+        profiler.out_dir = self.base_path / "profiles"
 
         self.setFixedSize(1000, 800)
         self.setWindowTitle("Macropad Controller")
         self.setWindowIcon(self.app_icon)
         self.setWindowFlags(self.windowFlags() & ~Qt.WindowMaximizeButtonHint)
 
+        # Event-loop stall watchdog: a timer ticks on the GUI thread, a thread checks the ticks
+        self.watchdog = StallWatchdog()
+        self.watchdog_timer = QTimer(self)
+        self.watchdog_timer.setInterval(100)
+        self.watchdog_timer.timeout.connect(self.watchdog.tick)
+        self.watchdog_timer.start()
+        # Only start watching once the event loop runs, startup work is not a stall
+        QTimer.singleShot(0, self.watchdog.start)
+
         # Managers
         self.presets = PresetManager(self.base_path / "presets")
         self.presets.ensure_default_preset()
+        # Pick up presets generated by scripts or synced from other machines
+        self.preset_watcher = PresetWatcher(self.presets, parent=self)
+        self.preset_watcher.presets_changed.connect(self.on_presets_changed)
         self.presets.load_preset("default")
-        self.executor = ActionExecutor()
+        # Presets written before the icon store point at image files by absolute path;
+        # move those icons into the store once
+        if not self.setting("icons_migrated", False):
+            migrated = icon_store.migrate_presets(self.presets)
+            if migrated:
+                log.info("Moved the icons of %d presets into the icon store", len(migrated))
+            self.save_setting("icons_migrated", True)
+        # Index presets for the search box now, in the background, rather than on the first keystroke
+        self.presets.build_index()
+        # "warm_shell": true in settings.json runs repeated commands through one shell session
+        self.executor = ActionExecutor(Launcher(warm_shell=self.setting("warm_shell", False) is True))
+        QApplication.instance().aboutToQuit.connect(self.executor.launcher.shutdown)
+        # Import the action types the active preset uses once the window is up
+        QTimer.singleShot(0, self.preload_actions)
+        QTimer.singleShot(0, self.prefetch_neighbours)
+
+        # Usage analytics are kept in memory and flushed to disk periodically
+        self.stats = UsageStats(self.base_path / "usage_stats.json")
+        self.stats_flush_timer = QTimer(self)
+        self.stats_flush_timer.setInterval(30000)
+        self.stats_flush_timer.timeout.connect(self.stats.flush)
+        self.stats_flush_timer.start()
+        QApplication.instance().aboutToQuit.connect(self.stats.flush)
+        # Recent key events for the dashboard timeline, in a fixed-size ring buffer
+        self.timeline = KeyTimeline()
+        # Last connection state per pad; the reader reports every failed retry, the timeline
+        # only records changes
+        self.link_states = {}
+
+        # Scheduled keys from every preset share one heap and one timer; read once the window is up
+        self.scheduler = Scheduler(self.presets, parent=self)
+        self.scheduler.fired.connect(self.run_scheduled)
+        QTimer.singleShot(0, self.scheduler.load_all)
+
+        # Theme: one compiled style sheet for the whole application, set before any
+        # widget exists so nothing gets polished twice
+        theme.apply(theme.load_choice(self.settings_path))
+
+        # OpenMetrics endpoint for monitoring agents, on localhost only; "metrics_port": 0
+        # in settings.json turns it off
+        self.metrics_server = None
+        port = self.setting("metrics_port", MetricsServer.DEFAULT_PORT)
+        try:
+            port = int(port)
+            if not 0 <= port <= 65535:
+                raise ValueError("out of range")
+        except (TypeError, ValueError) as e:
+            log.error("Bad metrics_port %r in settings.json, using %s: %s", port, MetricsServer.DEFAULT_PORT, e)
+            port = MetricsServer.DEFAULT_PORT
+        if port:
+            self.metrics_server = MetricsServer(port=port)
+            self.metrics_server.start()
+            QApplication.instance().aboutToQuit.connect(self.metrics_server.stop)
 
         # UI Initialization
         self.view = MainView(self.presets, self)
         self.setCentralWidget(self.view)
 
-        # Load Stylesheet
-        css_path = self.base_path / "styles" / "main.css"
-        if css_path.exists():
-            with open(css_path, "r") as f:
-                self.setStyleSheet(f.read())
+        # Gesture recognition runs per pad; one timer resolves pending decisions
+        self.gestures = {}
+        self.gesture_timer = QTimer(self)
+        self.gesture_timer.setSingleShot(True)
+        self.gesture_timer.timeout.connect(self.poll_gestures)
 
-        # Serial Connection
-        self.serial = SerialManager(port="COM6", callback=self.handle_key_press)
-        self.serial.connection_status.connect(self.view.update_connection_state)
-        self.serial.start()
+        # Serial Connection: every pad listed in devices.json shares one reader thread
+        self.devices = DeviceManager()
+        self.devices.load_config(self.base_path / "devices.json", default_port="COM6")
+        self.stale_after_ms = int(self.devices.reconnect_latency() * 1000) + self.STALE_MARGIN_MS
+        self.devices.key_pressed.connect(self.handle_device_key)
+        self.devices.key_event.connect(self.handle_device_event)
+        self.devices.connection_status.connect(self.on_device_connection)
+        self.devices.health_updated.connect(self.view.update_device_health)
+        self.devices.start()
+
+        # Low-memory tray mode
+        self.ui_released = False
+        self.last_trim = None  # (rss_before, rss_after) in bytes
+        self.trim_timer = QTimer(self)
+        self.trim_timer.setSingleShot(True)
+        self.trim_timer.setInterval(self.TRIM_AFTER_MS)
+        self.trim_timer.timeout.connect(self.release_ui_resources)
+
+        # Coalesced PREV/NEXT cycling
+        self.pending_preset = None
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(self.PRESET_SETTLE_MS)
+        self.settle_timer.timeout.connect(self.settle_preset)
 
         self.show_ui_signal.connect(self.show_interface)
         self.setup_tray(icon_path)
 
+    def setting(self, key, default=None):
+        """A value from settings.json, or `default` if it isn't set."""
+        try:
+            with open(self.settings_path, "r", encoding="utf-8") as f:
+                return json.load(f).get(key, default)
+        except (OSError, json.JSONDecodeError, AttributeError):
+            return default
+
+    def save_setting(self, key, value):
+        """Stores one value in settings.json, keeping the others."""
+        try:
+            with open(self.settings_path, "r", encoding="utf-8") as f:
+                settings = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            settings = {}
+        if not isinstance(settings, dict):
+            settings = {}
+        settings[key] = value
+        try:
+            with open(self.settings_path, "w", encoding="utf-8") as f:
+                json.dump(settings, f, indent=4)
+        except OSError as e:
+            log.error("Failed to save settings: %s", e)
+
     def setup_tray(self, icon_path):
         self.tray = QSystemTrayIcon(self.app_icon, self)
         self.tray.setIcon(QIcon(icon_path))
@@ -71,6 +214,18 @@ class MainWindow(QMainWindow):
         menu = QMenu()
         menu.addAction("Show Grid", self.show_interface)
         menu.addSeparator()
+        theme_menu = menu.addMenu("Theme")
+        self.theme_actions = {}
+        for name in theme.names():
+            action = theme_menu.addAction(theme.label(name))
+            action.setCheckable(True)
+            action.setChecked(name == theme.name)
+            action.triggered.connect(lambda _, n=name: self.set_theme(n))
+            self.theme_actions[name] = action
+        self.profile_action = menu.addAction("Profiling")
+        self.profile_action.setCheckable(True)
+        self.profile_action.triggered.connect(lambda: self.toggle_profiling())
+        menu.addSeparator()
         menu.addAction("Exit", QApplication.quit)
         
         self.tray.setContextMenu(menu)
@@ -78,7 +233,83 @@ class MainWindow(QMainWindow):
         self.tray.activated.connect(lambda r: self.show_interface() if r == QSystemTrayIcon.DoubleClick else None)
 
 
+    def toggle_profiling(self, mode="spans"):
+        """Starts or stops the profiler, reporting where the trace was written."""
+        try:
+            path = profiler.toggle(mode)
+        except ValueError as e:
+            log.error("%s", e)
+            return
+        except OSError as e:
+            # Recording has stopped, but the trace couldn't be written (read-only folder, disk full)
+            log.error("Failed to save the profile to %s: %s", profiler.out_dir, e)
+            path = None
+        if hasattr(self, 'profile_action'):
+            self.profile_action.setChecked(profiler.enabled)
+        if hasattr(self, 'tray'):
+            if profiler.enabled:
+                self.tray.showMessage("Profiling", f"Recording ({profiler.mode})", QSystemTrayIcon.Information, 1500)
+            elif path:
+                self.tray.showMessage("Profiling", f"Trace saved to {path}", QSystemTrayIcon.Information, 3000)
+
+    def set_theme(self, name):
+        """Switches the theme and remembers it for the next start."""
+        theme.apply(name)
+        theme.save_choice(self.settings_path)
+        for n, action in self.theme_actions.items():
+            action.setChecked(n == theme.name)
+
+    def handle_ipc_command(self, command):
+        """Commands sent by a second instance: "show", "profile[:mode]" or "log:<subsystem>=<level>"."""
+        if command.startswith("profile"):
+            _, _, mode = command.partition(":")
+            self.toggle_profiling(mode or "spans")
+        elif command.startswith("log:"):
+            self.set_log_level(command[4:])
+        else:
+            self.show_interface()
+
+    def set_log_level(self, spec):
+        """Applies "<subsystem>=<level>" (e.g. "serial=debug") to the running log pipeline."""
+        subsystem, _, level = spec.partition("=")
+        if pipeline.set_level(subsystem.strip(), level.strip()):
+            log.info("Log level of %s set to %s", subsystem.strip(), level.strip().upper())
+        else:
+            log.error("Invalid log level setting: %s", spec)
+
+    def release_ui_resources(self):
+        """Drops pages, the 3D model view, the hidden overlay and cached pixmaps while in the tray."""
+        if self.isVisible() or self.ui_released:
+            return
+        before = rss_bytes()
+        self.view.release_pages()
+        if self.overlay and not self.overlay.isVisible():
+            self.overlay.deleteLater()
+            self.overlay = None
+        QPixmapCache.clear()
+        # deleteLater() needs a trip through the event loop before the memory is really gone
+        QTimer.singleShot(0, lambda: self._finish_release(before))
+        self.ui_released = True
+
+    def _finish_release(self, before):
+        release_heap()
+        after = rss_bytes()
+        self.last_trim = (before, after)
+        log.info("Released UI while hidden: RSS %.1f MB -> %.1f MB", before / 2**20, after / 2**20,
+                 extra={"fields": {"rss_before": before, "rss_after": after}})
+
+    def restore_ui_resources(self):
+        if self.ui_released:
+            self.ui_released = False
+            self.view.restore_pages()
+
+    def hideEvent(self, event):
+        self.trim_timer.start()
+        super().hideEvent(event)
+
     def show_interface(self):
+        self.trim_timer.stop()
+        self.restore_ui_resources()
         self.showNormal()
         self.activateWindow()
         self.raise_()
@@ -102,8 +333,16 @@ class MainWindow(QMainWindow):
 
     def switch_preset(self, name):
         if not name: return
+        # A direct switch supersedes any PREV/NEXT still settling
+        self.settle_timer.stop()
+        self.pending_preset = None
         self.presets.load_preset(name)
-        
+        PRESET_SWITCHES.inc("direct")
+        self.apply_preset_ui(name)
+
+    @profiler.traced("preset.switch")
+    def apply_preset_ui(self, name):
+        """The heavy part of a preset switch: notification, overlay and pages."""
         # New notification logic
         if self.isHidden() and hasattr(self, 'tray'):
             self.tray.showMessage(
@@ -113,40 +352,208 @@ class MainWindow(QMainWindow):
                 500  # Duration in milliseconds
             )
 
+        QTimer.singleShot(0, self.preload_actions)
+
         if self.overlay: self.overlay.refresh()
-        self.view.reload_all_pages()
+        # Released pages are rebuilt with the current preset on show_interface()
+        if not self.ui_released:
+            self.view.reload_all_pages()
         
         # Fix for the "Offline" bug: update connection state after reloading UI
-        is_connected = False
-        if hasattr(self, 'serial') and self.serial.ser and self.serial.ser.is_open:
-            is_connected = True
+        is_connected = hasattr(self, 'devices') and self.devices.any_connected()
         self.view.update_connection_state(is_connected)
 
+        QTimer.singleShot(0, self.prefetch_neighbours)
+
+    @profiler.traced("preset.step")
+    def step_preset(self, step):
+        """PREV/NEXT: keys map to the target preset at once, the UI catches up when presses settle."""
+        base = self.pending_preset or self.presets.current_preset
+        name = self.presets.get_relative_preset(base, step)
+        if not name:
+            return
+        self.pending_preset = name
+        self.presets.load_preset(name)
+        PRESET_SWITCHES.inc("step")
+        self.settle_timer.start()
+
+    def settle_preset(self):
+        name, self.pending_preset = self.pending_preset, None
+        if name:
+            self.apply_preset_ui(name)
+
+    def prefetch_neighbours(self):
+        """Parses and pre-renders the presets PREV/NEXT lead to, so cycling to them is instant."""
+        current = self.presets.current_preset
+        names = {self.presets.get_relative_preset(current, step) for step in (-1, 1)}
+        names = [n for n in names if n and n != current]
+        for name in names:
+            self.presets.get_preset_data(name)
+        if not self.ui_released:
+            self.view.prerender_keys_pages(names)
+
+    def on_presets_changed(self, changed, removed):
+        """Applies presets edited on disk, touching only the keys that differ."""
+        self.scheduler.reload(*changed, *removed)
+        current = self.presets.current_preset
+        if current in removed:
+            self.switch_preset("default")
+            return
+        if current in changed:
+            QTimer.singleShot(0, self.preload_actions)
+            if self.overlay: self.overlay.refresh()
+        if not self.ui_released:
+            self.view.apply_preset_changes()
+
+    def preload_actions(self):
+        self.executor.registry.preload(self.presets.current_preset_data)
+
     def next_preset(self):
-        n = self.presets.get_next_preset()
-        if n: self.switch_preset(n)
+        self.step_preset(1)
 
     def prev_preset(self):
-        n = self.presets.get_prev_preset()
-        if n: self.switch_preset(n)
+        self.step_preset(-1)
+
+    def on_device_connection(self, device_id, connected):
+        if self.link_states.get(device_id, False) != connected:
+            self.timeline.record(CONNECT if connected else DISCONNECT, preset=device_id)
+        self.link_states[device_id] = connected
+        # The sidebar shows a single state: ACTIVE while any pad is connected
+        self.view.update_connection_state(self.devices.any_connected())
+        if not connected:
+            self.view.update_device_health(device_id, {})
+
+    def handle_device_key(self, device_id, key_index):
+        EVENTS_HANDLED.inc()
+        dev = self.devices.devices.get(device_id)
+        self.handle_key_press(key_index, device=dev)
+
+    def preset_data_for(self, device):
+        """Returns (name, data) of the preset a pad's keys currently map to."""
+        preset = device.preset if device and device.preset else self.presets.current_preset
+        return preset, self.presets.get_preset_data(preset) or {}
+
+    def gesture_engine(self, device_id):
+        engine = self.gestures.get(device_id)
+        if engine is None:
+            device = self.devices.devices.get(device_id)
+            engine = GestureEngine(
+                lambda key: gesture_options(self.preset_data_for(device)[1], key),
+                lambda a, b: find_chord(self.preset_data_for(device)[1], a, b) is not None,
+            )
+            self.gestures[device_id] = engine
+        return engine
+
+    def is_stale(self, device, key_index, age_ms):
+        """Staleness policy for presses replayed after a link hiccup.
+
+        Macro keys may override the limit with "max_age_ms" (0 never expires).
+        """
+        limit = self.stale_after_ms
+        if key_index <= 12:
+            keys = self.preset_data_for(device)[1].get("keys", [])
+            if key_index <= len(keys):
+                limit = keys[key_index - 1].get("max_age_ms", limit)
+        return limit > 0 and age_ms > limit
+
+    def handle_device_event(self, device_id, key_index, pressed, ts, age_ms):
+        EVENTS_HANDLED.inc()
+        engine = self.gesture_engine(device_id)
+        if pressed:
+            if self.is_stale(self.devices.devices.get(device_id), key_index, age_ms):
+                self.timeline.record(STALE, key_index, link_ms=age_ms)
+                STALE_PRESSES.inc()
+                return  # The matching release finds no press and is ignored too
+            fired = engine.press(key_index, ts, age_ms)
+        else:
+            fired = engine.release(key_index, ts, age_ms)
+        self.dispatch_gestures(device_id, fired)
+
+    def poll_gestures(self):
+        for device_id, engine in list(self.gestures.items()):
+            self.dispatch_gestures(device_id, engine.poll())
+
+    def dispatch_gestures(self, device_id, fired):
+        device = self.devices.devices.get(device_id)
+        # Each gesture carries the delivery delay of the press that started it
+        for gesture, key_index, other, age_ms in fired:
+            self.handle_key_press(key_index, device=device, gesture=gesture, other=other, age_ms=age_ms)
 
-    def handle_key_press(self, key_index):
+        # Wake up exactly when the earliest pending decision is due
+        waits = [w for w in (e.ms_until_deadline() for e in self.gestures.values()) if w is not None]
+        if waits:
+            self.gesture_timer.start(min(waits))
+        else:
+            self.gesture_timer.stop()
+
+    def cycle_device_preset(self, dev, step):
+        """Moves a pad with a bound preset to the neighbouring preset."""
+        name = self.presets.get_relative_preset(dev.preset, step)
+        if name:
+            dev.preset = name
+            PRESET_SWITCHES.inc("pad")
+            if self.isHidden() and hasattr(self, 'tray'):
+                self.tray.showMessage(
+                    "Preset Switched",
+                    f"{dev.device_id.upper()}: {name.upper()}",
+                    QSystemTrayIcon.Information,
+                    500
+                )
+
+    @profiler.traced("key.handle")
+    def handle_key_press(self, key_index, device=None, gesture=TAP, other=None, age_ms=0):
         idx = key_index - 1
+        bound = device.preset if device else None
         if idx >= 12:
+            self.timeline.record(FIXED, key_index, link_ms=age_ms)
+            KEY_PRESSES.inc("function")
             cmd = idx - 12
             if cmd == 0: 
                 self.show_ui_signal.emit()
             elif cmd == 1: 
                 self.show_overlay()
             elif cmd == 2: 
-                self.prev_preset()
+                if bound: self.cycle_device_preset(device, -1)
+                else: self.prev_preset()
             elif cmd == 3: 
-                self.next_preset()
+                if bound: self.cycle_device_preset(device, 1)
+                else: self.next_preset()
         else:
-            keys = self.presets.current_preset_data.get("keys", [])
-            if 0 <= idx < len(keys):
+            started = time.perf_counter()
+            preset, data = self.preset_data_for(device)
+            action = resolve_action(data, key_index, gesture, other)
+            resolved = time.perf_counter()
+            latency_ms = 0.0
+            action_type = action.get("type", "none") if action else "none"
+            if action:
                 # Ensure we pass the dictionary to the executor
-                self.executor.execute(keys[idx], force=True)
+                self.executor.execute(action, force=True)
+                latency_ms = (time.perf_counter() - resolved) * 1000.0
+                self.stats.record(preset, idx, latency_ms, action.get("label", ""))
+                if action_type != "none":
+                    ACTION_LATENCY.observe(latency_ms / 1000.0, action_type)
+            KEY_PRESSES.inc(action_type)
+            label = ""
+            if action and action.get("type", "none") != "none":
+                label = action.get("label") or action.get("type").replace("_", " ").title()
+            self.timeline.record(PRESS, key_index, preset, label, gesture,
+                                 age_ms, (resolved - started) * 1000.0, latency_ms)
+            self.scheduler.key_pressed(preset, key_index)
+
+    def run_scheduled(self, preset, key_index, late):
+        """Runs a key of any preset (not only the active one) for the scheduler."""
+        keys = (self.presets.get_preset_data(preset) or {}).get("keys", [])
+        action = keys[key_index - 1] if key_index <= len(keys) else None
+        if not action or action.get("type", "none") == "none":
+            return
+        started = time.perf_counter()
+        self.executor.execute(action, force=True)
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        SCHEDULED_RUNS.inc("true" if late else "false")
+        ACTION_LATENCY.observe(latency_ms / 1000.0, action.get("type"))
+        label = action.get("label") or action.get("type").replace("_", " ").title()
+        self.timeline.record(PRESS, key_index, preset, label, "scheduled_late" if late else "scheduled",
+                             action_ms=latency_ms)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -155,11 +562,23 @@ if __name__ == "__main__":
     app.setApplicationName("Macropad Controller")
     app.setApplicationDisplayName("Macropad Controller")
 
+    # Command for an already running instance: --profile-toggle[=sample|cprofile],
+    # --log-level=<subsystem>=<level>, or show
+    ipc_command = "show"
+    for arg in sys.argv[1:]:
+        if arg.startswith("--profile-toggle"):
+            ipc_command = "profile" + arg[len("--profile-toggle"):].replace("=", ":")
+        elif arg.startswith("--log-level="):
+            ipc_command = "log:" + arg[len("--log-level="):]
+
     # Single Instance Check
     socket = QLocalSocket()
     socket.connectToServer("MacropadControllerV3")
     if socket.waitForConnected(500):
-        # Notify the existing instance to show itself
+        # Notify the existing instance (show itself, toggle the profiler, or change a log level)
+        socket.write(ipc_command.encode() + b"\n")
+        socket.waitForBytesWritten(500)
+        socket.disconnectFromServer()
         sys.exit(0)
     
     # Create server to reserve the instance name
@@ -173,13 +592,23 @@ if __name__ == "__main__":
     # Attach server and logic to bring window to front if launched again
     window.local_server = local_server
     def on_new_connection():
-        # Accept the connection to clear the queue, then show window
+        # Accept the connection to clear the queue, then run the command it sent
         nxt_sock = local_server.nextPendingConnection()
+        command = "show"
         if nxt_sock:
+            if nxt_sock.bytesAvailable() or nxt_sock.waitForReadyRead(200):
+                command = bytes(nxt_sock.readAll()).decode(errors="replace").strip() or "show"
             nxt_sock.close()
-        window.show_interface()
+        window.handle_ipc_command(command)
     local_server.newConnection.connect(on_new_connection)
 
+    # --profile[=sample|cprofile] records from startup; --log-level applies to this instance too
+    for arg in sys.argv[1:]:
+        if arg == "--profile" or arg.startswith("--profile="):
+            window.toggle_profiling(arg.partition("=")[2] or "spans")
+        elif arg.startswith("--log-level="):
+            window.set_log_level(arg[len("--log-level="):])
+
     # Check if we should start visible (default is minimized to tray now)
     should_start_visible = "--show" in sys.argv
     
@@ -188,6 +617,7 @@ if __name__ == "__main__":
         window.show()
     else:
         window.hide()
+        window.trim_timer.start()
         # Ensure the tray icon is definitely visible
         if hasattr(window, 'tray'):
             window.tray.show()
@@ -9,6 +9,13 @@ from PySide6.QtGui import QIcon, QPixmap
 import os
 import qtawesome as qta
 
+from core.action_registry import registry
+from core.icon_store import icon_store
+from core.log import get_logger, suppressed
+from ui.theme import theme
+
+log = get_logger("ui")
+
 # Organized Icon Library by Categories
 ICON_LIBRARY = {
     "Brands": {
@@ -195,6 +202,49 @@ class KeyRecorder(QLineEdit):
             self.active_keys = []
 
 
+class ActionForm(QWidget):
+    """Input form generated from an action type's schema."""
+    def __init__(self, schema, parent=None):
+        super().__init__(parent)
+        lyt = QVBoxLayout(self); lyt.setContentsMargins(0,0,0,0)
+        self.schema = schema
+        self.fields = {}
+        for field, spec in schema.items():
+            kind = spec.get("type", "text")
+            if len(schema) > 1:
+                lyt.addWidget(QLabel(spec.get("label", field.replace("_", " ").title()) + ":"))
+            edit = KeyRecorder() if kind == "keys" else QLineEdit()
+            if spec.get("placeholder"):
+                edit.setPlaceholderText(spec["placeholder"])
+            if kind == "file":
+                row = QHBoxLayout()
+                btn = QPushButton("BROWSE"); btn.clicked.connect(lambda _=False, e=edit: self.browse(e))
+                row.addWidget(edit); row.addWidget(btn)
+                lyt.addLayout(row)
+            else:
+                lyt.addWidget(edit)
+            self.fields[field] = edit
+
+    def browse(self, edit):
+        file_filter = "Executable (*.exe)" if os.name == "nt" else "All Files (*)"
+        path, _ = QFileDialog.getOpenFileName(self, "Select App", "", file_filter)
+        if path: edit.setText(path)
+
+    def set_values(self, action):
+        for field, edit in self.fields.items():
+            edit.setText(str(action.get(field, "")))
+
+    def values(self):
+        return {field: edit.text() for field, edit in self.fields.items()}
+
+    def missing(self):
+        """Returns the first required field left empty, or None."""
+        for field, edit in self.fields.items():
+            if self.schema[field].get("required") and not edit.text().strip():
+                return edit
+        return None
+
+
 class IconPickerDialog(QDialog):
     """Dialog for selecting icons from categorized library."""
     def __init__(self, parent=None):
@@ -259,12 +309,12 @@ class IconPickerDialog(QDialog):
             # Load FontAwesome icons first
             for icon_name, icon_id in ICON_LIBRARY[category].items():
                 try:
-                    icon = qta.icon(icon_id, color="#e0e0e0")
+                    icon = qta.icon(icon_id, color=theme.colors.get("text", "#e0e0e0"))
                     list_item = QListWidgetItem(icon, icon_name)
                     list_item.setData(Qt.UserRole, icon_id)
                     self.icon_list.addItem(list_item)
-                except:
-                    pass
+                except Exception:
+                    suppressed(log, "IconPickerDialog.load_icons")
             
             # Add custom icons from this category if they exist
             if category in self.custom_icons:
@@ -277,8 +327,8 @@ class IconPickerDialog(QDialog):
                             list_item = QListWidgetItem(icon, icon_name)
                             list_item.setData(Qt.UserRole, icon_path)  # Store path for custom icons
                             self.icon_list.addItem(list_item)
-                    except:
-                        pass
+                    except Exception:
+                        suppressed(log, "IconPickerDialog.load_icons")
         
         # Set icon size
         self.icon_list.setIconSize(QSize(32, 32))
@@ -306,7 +356,7 @@ class ActionEditor(QDialog):
 
         # Header
         header = QLabel(f"Editing Preset: {preset_name}")
-        header.setStyleSheet("color: #10b981; font-weight: 800; font-size: 14px; border: none;")
+        header.setObjectName("editorHeader")
         layout.addWidget(header)
 
         # 2. Display Name
@@ -321,11 +371,11 @@ class ActionEditor(QDialog):
         
         self.icon_preview = QLabel("No Icon")
         self.icon_preview.setFixedSize(40, 40)
-        self.icon_preview.setStyleSheet("border: 1px solid #444; background: #222; color: #888;")
+        self.icon_preview.setObjectName("iconPreview")
         self.icon_preview.setAlignment(Qt.AlignCenter)
         icon_row.addWidget(self.icon_preview)
 
-        self.icon_path = "" # Store the path
+        self.icon_path = "" # Stored icon reference or qtawesome id
         self.icon_id = None  # Store the icon ID
 
         # Icon Library Button
@@ -346,38 +396,25 @@ class ActionEditor(QDialog):
         # 3. Action Type
         layout.addWidget(QLabel("Action Type:"))
         self.type_box = QComboBox()
-        self.type_box.addItems(["None", "Open Website", "Open App", "Run Command", "Key Combo", "Type Text"])
+        self.type_box.addItem("None", "none")
+        for name in registry.names():
+            self.type_box.addItem(registry.label(name), name)
         layout.addWidget(self.type_box)
 
-        # 4. Input Stack
+        # 4. Input Stack, with each type's form built the first time it is selected
         self.input_stack = QStackedWidget()
+        self.input_stack.addWidget(QLabel("No configuration needed."))
+        self.forms = {}
+        self.current = {}
         layout.addWidget(self.input_stack)
-        self.setup_inputs()
-        self.type_box.currentIndexChanged.connect(self.input_stack.setCurrentIndex)
+        self.type_box.currentIndexChanged.connect(self.show_form)
 
         # 5. Buttons
         btn_row = QHBoxLayout()
         
         remove_btn = QPushButton("Remove Config")
         remove_btn.setCursor(Qt.PointingHandCursor)
-        remove_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #111;
-                border: 1px solid #333;
-                border-radius: 6px;
-                padding: 8px 16px;
-                color: #ef4444;
-                font-weight: 600;
-            }
-            QPushButton:hover {
-                border: 1px solid #ef4444;
-                background-color: #290a0a;
-            }
-            QPushButton:pressed {
-                background-color: #ef4444;
-                color: white;
-            }
-        """)
+        remove_btn.setObjectName("dangerButton")
         remove_btn.clicked.connect(self.remove_config)
         btn_row.addWidget(remove_btn)
         
@@ -396,40 +433,33 @@ class ActionEditor(QDialog):
     def remove_config(self):
         keys = self.preset_manager.current_preset_data.get("keys", [])
         if self.key_index < len(keys):
-            keys[self.key_index] = {
+            self.preset_manager.update_key(self.key_index, {
                 "type": "none",
                 "value": "",
                 "label": "",
                 "icon": ""
-            }
-            self.preset_manager.save_data(self.preset_manager.current_preset, self.preset_manager.current_preset_data)
+            })
         self.accept()
 
-    def setup_inputs(self):
-        # 0: None
-        self.input_stack.addWidget(QLabel("No configuration needed."))
-        # 1: Website
-        self.web_in = QLineEdit(); self.web_in.setPlaceholderText("https://...")
-        self.input_stack.addWidget(self.web_in)
-        # 2: App
-        app_w = QWidget(); app_l = QHBoxLayout(app_w); app_l.setContentsMargins(0,0,0,0)
-        self.app_in = QLineEdit()
-        btn = QPushButton("BROWSE"); btn.clicked.connect(self.browse_app)
-        app_l.addWidget(self.app_in); app_l.addWidget(btn)
-        self.input_stack.addWidget(app_w)
-        # 3: Command
-        self.cmd_in = QLineEdit()
-        self.input_stack.addWidget(self.cmd_in)
-        # 4: Key Combo
-        self.recorder = KeyRecorder()
-        self.input_stack.addWidget(self.recorder)
-        # 5: Type Text
-        self.text_in = QLineEdit()
-        self.input_stack.addWidget(self.text_in)
-
-    def browse_app(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Select App", "", "Executable (*.exe)")
-        if path: self.app_in.setText(path)
+    def form_for(self, name):
+        if name not in self.forms:
+            plugin = registry.get(name)
+            if plugin is None:
+                form = QLabel(f"The '{name}' action type is not installed.")
+            elif hasattr(plugin, "create_editor"):
+                form = plugin.create_editor()
+            else:
+                form = ActionForm(plugin.schema)
+            self.input_stack.addWidget(form)
+            self.forms[name] = form
+        return self.forms[name]
+
+    def show_form(self, index):
+        name = self.type_box.itemData(index)
+        if name == "none":
+            self.input_stack.setCurrentIndex(0)
+        else:
+            self.input_stack.setCurrentWidget(self.form_for(name))
 
     def select_library_icon(self):
         """Open categorized icon picker dialog."""
@@ -439,7 +469,7 @@ class ActionEditor(QDialog):
                 self.update_icon(dialog.selected_icon_id)
 
     def select_icon_file(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Select Icon", "", "Images (*.png *.svg *.jpg *.ico)")
+        path, _ = QFileDialog.getOpenFileName(self, "Select Icon", "", "Images (*.png *.svg *.jpg *.jpeg *.ico *.webp)")
         if path:
             self.update_icon(path)
 
@@ -450,11 +480,13 @@ class ActionEditor(QDialog):
         self.icon_preview.setText("No Icon")
 
     def update_icon(self, icon_source):
+        # A picked image file stays a plain path until save(), so cancelling copies nothing
         self.icon_path = icon_source
-        
-        # 1. Check for File Path
-        if os.path.exists(icon_source):
-            pix = QPixmap(icon_source)
+
+        # 1. Check for a stored icon or an image file
+        path = icon_store.path(icon_source, 32) if icon_store.is_ref(icon_source) else icon_source
+        if path and os.path.exists(path):
+            pix = QPixmap(str(path))
             if not pix.isNull():
                 self.icon_preview.setPixmap(pix.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation))
                 self.icon_preview.setText("")
@@ -463,14 +495,14 @@ class ActionEditor(QDialog):
         # 2. Check for FontAwesome ID
         try:
             if icon_source:
-                icon = qta.icon(icon_source, color="white")
+                icon = qta.icon(icon_source, color=theme.colors.get("text_bright", "white"))
                 pix = icon.pixmap(32, 32)
                 if not pix.isNull():
                     self.icon_preview.setPixmap(pix)
                     self.icon_preview.setText("")
                     return
-        except:
-            pass
+        except Exception:
+            suppressed(log, "ActionEditor.update_icon")
 
         self.icon_preview.setText("Err")
 
@@ -478,6 +510,7 @@ class ActionEditor(QDialog):
         keys = self.preset_manager.current_preset_data.get("keys", [])
         if self.key_index < len(keys):
             curr = keys[self.key_index]
+            self.current = curr
             self.label_input.setText(curr.get("label", ""))
             
             icon = curr.get("icon", "")
@@ -485,32 +518,45 @@ class ActionEditor(QDialog):
                 self.update_icon(icon)
                 self.icon_id = icon  # Store the icon ID
             
-            # Map saved snake_case to UI Display Names
-            mapping = {"none": 0, "open_website": 1, "open_app": 2, "run_command": 3, "key_combo": 4, "type_text": 5}
-            idx = mapping.get(curr.get("type", "none"), 0)
+            name = curr.get("type", "none")
+            idx = self.type_box.findData(name)
+            if idx < 0:
+                # Keep types whose plugin is missing, so saving doesn't lose them
+                self.type_box.addItem(registry.label(name), name)
+                idx = self.type_box.count() - 1
             self.type_box.setCurrentIndex(idx)
             
-            val = curr.get("value", "")
-            if idx == 1: self.web_in.setText(val)
-            elif idx == 2: self.app_in.setText(val)
-            elif idx == 3: self.cmd_in.setText(val)
-            elif idx == 4: self.recorder.setText(val)
-            elif idx == 5: self.text_in.setText(val)
+            if name != "none":
+                form = self.form_for(name)
+                if hasattr(form, "set_values"):
+                    form.set_values(curr)
 
     def save(self):
-        idx = self.type_box.currentIndex()
-        mapping = ["none", "open_website", "open_app", "run_command", "key_combo", "type_text"]
-        vals = ["", self.web_in.text(), self.app_in.text(), self.cmd_in.text(), self.recorder.text(), self.text_in.text()]
-        
-        keys = self.preset_manager.current_preset_data.get("keys", [])
-        while len(keys) <= self.key_index:
-            keys.append({"type": "none", "value": "", "label": ""})
-            
-        keys[self.key_index] = {
-            "type": mapping[idx],
-            "value": vals[idx],
-            "label": self.label_input.text(),
-            "icon": self.icon_path
-        }
-        self.preset_manager.save_data(self.preset_manager.current_preset, self.preset_manager.current_preset_data)
-        self.accept()
\ No newline at end of file
+        name = self.type_box.currentData()
+        form = self.forms.get(name)
+        if name == "none":
+            values = {"value": ""}
+        elif hasattr(form, "values"):
+            empty = form.missing() if hasattr(form, "missing") else None
+            if empty is not None:
+                empty.setFocus()
+                return
+            values = form.values()
+        else:
+            # No editor for this type: keep whatever the key had
+            values = {k: v for k, v in self.current.items() if k not in ("type", "label", "icon", "gestures")}
+
+        # Keep the fields the editor doesn't show (gestures, max_age_ms, plugin extras);
+        # when the type changes, the old type's own values go with it
+        owned = {"type", "value", "label", "icon"}
+        old_type = self.current.get("type", "none")
+        if old_type not in (name, "none"):
+            owned.update(getattr(registry.get(old_type), "schema", None) or {})
+        entry = {k: v for k, v in self.current.items() if k not in owned}
+        icon = self.icon_path
+        if icon and not icon_store.is_ref(icon) and os.path.isfile(icon):
+            # Image files are copied into the icon store and referred to by hash
+            icon = icon_store.import_file(icon) or icon
+        entry.update({"type": name, **values, "label": self.label_input.text(), "icon": icon})
+        self.preset_manager.update_key(self.key_index, entry)
+        self.accept()
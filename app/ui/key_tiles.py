@@ -0,0 +1,266 @@
+# ui/key_tiles.py
+
+import os
+
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QPainter, QPen, QColor, QFont, QPixmap, QPixmapCache, QStaticText, QTextOption
+from PySide6.QtCore import Qt, QRect, QRectF, QPointF, Signal
+import qtawesome as qta
+
+from core.icon_store import icon_store
+from core.log import get_logger, suppressed
+from ui.theme import theme
+
+log = get_logger("ui")
+
+# Tile looks: per kind of tile, the (background, border, border width, text) colors for each
+# state, plus shape and font. States missing from a kind fall back to "normal". Colors
+# name entries of the current theme's colors and are resolved by theme.look().
+GRID_LOOK = {
+    "radius": 4, "font_px": 13, "small_px": 10,
+    "kinds": {
+        "empty": {"normal": ("$raised", "$border_strong", 1, "$key_text"),
+                  "hover": ("$key_hover", "$accent", 1, "$accent"),
+                  "pressed": ("$accent", "$accent", 1, "$on_accent")},
+        "configured": {"normal": ("$raised", "$accent", 2, "$accent"),
+                       "hover": ("$key_hover", "$accent_light", 2, "$accent_light"),
+                       "pressed": ("$accent", "$accent", 2, "$on_accent")},
+        "configured-no-label": {"normal": ("$raised", "$accent", 3, "$key_text"),
+                                "hover": ("$key_hover", "$accent_light", 3, "$accent"),
+                                "pressed": ("$accent", "$accent", 3, "$on_accent")},
+        "fixed": {"normal": ("$fixed_bg", "$accent_deep", 1, "$accent_light"),
+                  "hover": ("$accent_deep", "$accent_deep", 1, "$text_bright"),
+                  "bold": True},
+    },
+}
+
+OVERLAY_LOOK = {
+    "radius": 12, "font_px": 12, "small_px": 10,
+    "kinds": {
+        "empty": {"normal": ("$overlay_empty", "$overlay_empty_border", 1, "$overlay_empty_text"), "small": True},
+        "configured": {"normal": ("$overlay_key", "$overlay_key_border", 1, "$overlay_text"),
+                       "hover": ("$overlay_key_hover", "$overlay_key_hover_border", 1, "$overlay_text"),
+                       "title": "$overlay_title"},
+        "missing": {"normal": ("$overlay_missing", "$overlay_missing_border", 1, "$overlay_border"), "small": True},
+        "fixed": {"normal": ("$overlay_fixed", "$overlay_border", 1, "$overlay_fixed_text"),
+                  "dashed": True, "bold": True, "small": True},
+    },
+}
+
+
+def tile_icon(source, size, color="#e0e0e0"):
+    """Returns a pixmap for a stored icon, an icon file or a qtawesome id, cached across tiles and refreshes."""
+    if not source:
+        return None
+    key = f"tile:{source}:{size}:{color}"
+    pix = QPixmap()
+    if QPixmapCache.find(key, pix):
+        return pix
+    pix = None
+    if icon_store.is_ref(source):
+        # Stored icons come pre-scaled to the sizes the UI uses
+        path = icon_store.path(source, size)
+        loaded = QPixmap(str(path)) if path else QPixmap()
+        if not loaded.isNull():
+            pix = loaded if max(loaded.width(), loaded.height()) <= size else loaded.scaled(
+                size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    elif os.path.exists(source):
+        # Icon paths from presets that haven't been migrated to the store yet
+        loaded = QPixmap(source)
+        if not loaded.isNull():
+            pix = loaded.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    elif "fa" in source or "." in source:
+        try:
+            loaded = qta.icon(source, color=color).pixmap(size, size)
+            if not loaded.isNull():
+                pix = loaded
+        except Exception:
+            suppressed(log, "tile_icon")
+    if pix is not None:
+        QPixmapCache.insert(key, pix)
+    return pix
+
+
+class _Tile:
+    __slots__ = ("content", "kind", "caption", "title", "icon")
+
+    def __init__(self, content, kind, caption, title, icon, width, font, title_font):
+        self.content = content
+        self.kind = kind
+        self.icon = icon
+        self.caption = self._text(caption, width, font)
+        self.title = self._text(title, width, title_font)
+
+    @staticmethod
+    def _text(text, width, font):
+        # QStaticText keeps the laid-out text, so repaints don't re-run text layout
+        if not text:
+            return None
+        st = QStaticText(text)
+        st.setTextWidth(width)
+        option = QTextOption(Qt.AlignHCenter)
+        option.setWrapMode(QTextOption.WrapAtWordBoundaryOrAnywhere)
+        st.setTextOption(option)
+        st.prepare(font=font)
+        return st
+
+
+class KeyTileSurface(QWidget):
+    """Draws a 4x4 block of key tiles with QPainter.
+
+    Tiles are set with set_tile(); a tile whose content didn't change is skipped, and a
+    changed one only invalidates its own rectangle. Paint events draw just the tiles
+    inside the dirty region, from cached fonts, laid-out text and icon pixmaps.
+    """
+
+    clicked = Signal(int)
+
+    def __init__(self, look, tile_size, spacing, interactive=False, hover=False, parent=None):
+        super().__init__(parent)
+        self.template = look
+        self.look = theme.look(look)
+        self.tile_size = tile_size
+        self.spacing = spacing
+        self.interactive = interactive
+        self.track_hover = interactive or hover
+        self.tiles = [None] * 16
+        self.hover = -1
+        self.pressed = -1
+
+        self.font = QFont(self.font())
+        self.font.setPixelSize(look["font_px"])
+        self.font.setWeight(QFont.DemiBold)
+        self.bold_font = QFont(self.font)
+        self.bold_font.setWeight(QFont.Bold)
+        self.small_font = QFont(self.font)
+        self.small_font.setPixelSize(look["small_px"])
+        self.small_bold_font = QFont(self.small_font)
+        self.small_bold_font.setWeight(QFont.Bold)
+        self.small_bold_font.setLetterSpacing(QFont.AbsoluteSpacing, 1)
+
+        side = 4 * tile_size + 3 * spacing
+        self.setFixedSize(side, side)
+        self.setAttribute(Qt.WA_OpaquePaintEvent, False)
+        if self.track_hover:
+            self.setMouseTracking(True)
+        if interactive:
+            self.setCursor(Qt.PointingHandCursor)
+        theme.theme_changed.connect(self.on_theme_changed)
+
+    def on_theme_changed(self, name):
+        # Fonts and text layout don't depend on the theme, only colors do
+        self.look = theme.look(self.template)
+        self.update()
+
+    def sizeHint(self):
+        return self.size()
+
+    def tile_rect(self, i):
+        row, col = divmod(i, 4)
+        step = self.tile_size + self.spacing
+        return QRect(col * step, row * step, self.tile_size, self.tile_size)
+
+    def tile_at(self, pos):
+        step = self.tile_size + self.spacing
+        col, row = int(pos.x()) // step, int(pos.y()) // step
+        if 0 <= col < 4 and 0 <= row < 4 and self.tile_rect(row * 4 + col).contains(pos.toPoint()):
+            return row * 4 + col
+        return -1
+
+    def _fonts(self, kind):
+        spec = self.look["kinds"][kind]
+        if spec.get("small"):
+            return self.small_bold_font if spec.get("bold") else self.small_font
+        return self.bold_font if spec.get("bold") else self.font
+
+    def set_tile(self, i, kind, caption="", title=None, icon=None):
+        """Sets what tile `i` shows. Returns True if it changed and will be repainted."""
+        content = (kind, caption, title, icon.cacheKey() if icon is not None else None)
+        tile = self.tiles[i]
+        if tile is not None and tile.content == content:
+            return False
+        width = self.tile_size - 12
+        font = self._fonts(kind)
+        self.tiles[i] = _Tile(content, kind, caption, title, icon, width, font, self.small_font)
+        self.update(self.tile_rect(i))
+        return True
+
+    def _colors(self, i, kind):
+        states = self.look["kinds"][kind]
+        state = "normal"
+        if self.interactive and i == self.pressed and "pressed" in states:
+            state = "pressed"
+        elif self.track_hover and i == self.hover and "hover" in states:
+            state = "hover"
+        return states[state]
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        dirty = event.region()
+        radius = self.look["radius"]
+        for i, tile in enumerate(self.tiles):
+            rect = self.tile_rect(i)
+            if tile is None or not dirty.intersects(rect):
+                continue
+            spec = self.look["kinds"][tile.kind]
+            bg, border, width, text = self._colors(i, tile.kind)
+
+            pen = QPen(QColor(border), width)
+            if spec.get("dashed"):
+                pen.setStyle(Qt.DashLine)
+            painter.setPen(pen)
+            painter.setBrush(QColor(bg))
+            half = width / 2
+            painter.drawRoundedRect(QRectF(rect).adjusted(half, half, -half, -half), radius, radius)
+
+            if tile.icon is not None:
+                size = tile.icon.size() / tile.icon.devicePixelRatio()
+                painter.drawPixmap(rect.center().x() - size.width() // 2 + 1,
+                                   rect.center().y() - size.height() // 2 + 1, tile.icon)
+                continue
+
+            blocks = []
+            if tile.title is not None:
+                blocks.append((tile.title, self.small_font, spec.get("title", text)))
+            if tile.caption is not None:
+                blocks.append((tile.caption, self._fonts(tile.kind), text))
+            total = sum(b[0].size().height() for b in blocks)
+            y = rect.top() + (rect.height() - total) / 2
+            for st, font, color in blocks:
+                painter.setFont(font)
+                painter.setPen(QColor(color))
+                painter.drawStaticText(QPointF(rect.left() + 6, y), st)
+                y += st.size().height()
+
+    # Mouse handling for the interactive (grid) surface
+    def _set_hover(self, i):
+        if i != self.hover:
+            for old in (self.hover, i):
+                if old >= 0:
+                    self.update(self.tile_rect(old))
+            self.hover = i
+
+    def mouseMoveEvent(self, event):
+        if self.track_hover:
+            self._set_hover(self.tile_at(event.position()))
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self._set_hover(-1)
+        super().leaveEvent(event)
+
+    def mousePressEvent(self, event):
+        if self.interactive and event.button() == Qt.LeftButton:
+            self.pressed = self.tile_at(event.position())
+            if self.pressed >= 0:
+                self.update(self.tile_rect(self.pressed))
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self.interactive and event.button() == Qt.LeftButton and self.pressed >= 0:
+            i, self.pressed = self.pressed, -1
+            self.update(self.tile_rect(i))
+            if self.tile_at(event.position()) == i:
+                self.clicked.emit(i)
+        super().mouseReleaseEvent(event)
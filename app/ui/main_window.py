@@ -1,57 +1,65 @@
+import itertools
 import os
+import zipfile
 
 from PySide6.QtWidgets import (
-    QWidget, QPushButton, QGridLayout, QVBoxLayout, QHBoxLayout,
-    QLabel, QListWidget, QListWidgetItem, QStackedWidget, QFrame,
-    QInputDialog, QMessageBox
+    QWidget, QPushButton, QVBoxLayout, QHBoxLayout,
+    QLabel, QListView, QLineEdit, QStackedWidget, QFrame,
+    QInputDialog, QMessageBox, QFileDialog
 )
-from PySide6.QtCore import Qt, QUrl
+from PySide6.QtCore import Qt, QUrl, QTimer, QAbstractListModel, QModelIndex
 from ui.action_editor import ActionEditor
+from ui.key_tiles import KeyTileSurface, GRID_LOOK
+from ui.theme import set_state
+from ui.timeline import TimelinePanel
+from core.icon_store import icon_store
+from core.profiler import profiler
 
-class MacropadGrid(QWidget):
-    """The 4x4 grid of buttons representing the physical macropad."""
+class MacropadGrid(KeyTileSurface):
+    """The 4x4 grid of keys representing the physical macropad."""
+
+    FIXED_LABELS = ["APP", "LAYER", "PREV", "NEXT"]
     
-    def __init__(self, preset_manager, main_window):
-        super().__init__()
+    def __init__(self, preset_manager, main_window, keys=None):
+        super().__init__(GRID_LOOK, tile_size=120, spacing=10, interactive=True)
         self.preset_manager = preset_manager
         self.main_window = main_window
-        layout = QGridLayout(self)
-        layout.setSpacing(10)
-
-        for i in range(16):
-            row, col = divmod(i, 4)
-            btn = QPushButton()
-            btn.setFixedSize(120, 120)
-            btn.setCursor(Qt.PointingHandCursor)
-
-            if row == 3:
-                labels = ["APP", "LAYER", "PREV", "NEXT"]
-                btn.setText(labels[col])
-                btn.setProperty("class", "fixed-key")
-                if col == 0: btn.clicked.connect(self.main_window.show_interface)
-                elif col == 1: btn.clicked.connect(self.main_window.show_overlay)
-                elif col == 2: btn.clicked.connect(self.main_window.prev_preset)
-                elif col == 3: btn.clicked.connect(self.main_window.next_preset)
-            else:
-                # Get key configuration to display label and indicator
-                keys = self.preset_manager.current_preset_data.get("keys", [])
-                key_config = keys[i] if i < len(keys) else {}
-                key_label = key_config.get("label", "")
-                has_config = key_config.get("type") and key_config.get("type") != "none"
-                
-                # Display label if available, otherwise show key number
-                if key_label:
-                    btn.setText(key_label)
-                    btn.setProperty("class", "macro-key configured")
-                else:
-                    btn.setText(f"{i + 1:02d}")
-                    if has_config:
-                        btn.setProperty("class", "macro-key configured-no-label")
-                    else:
-                        btn.setProperty("class", "macro-key")
-                
-                btn.clicked.connect(lambda _, x=i: self.on_click(x))
-            layout.addWidget(btn, row, col)
+        self.shown = [None] * 12  # Key config each macro tile currently displays
+        self.fixed_actions = [self.main_window.show_interface, self.main_window.show_overlay,
+                              self.main_window.prev_preset, self.main_window.next_preset]
+        for col, text in enumerate(self.FIXED_LABELS):
+            self.set_tile(12 + col, "fixed", text)
+        self.clicked.connect(self.on_tile_clicked)
+
+        if keys is None:
+            keys = self.preset_manager.current_preset_data.get("keys", [])
+        self.apply(keys)
+
+    def apply(self, keys):
+        """Updates only the tiles whose key configuration changed."""
+        for i in range(12):
+            key_config = keys[i] if i < len(keys) else {}
+            if key_config != self.shown[i]:
+                self.update_key(i, key_config)
+
+    def update_key(self, i, key_config):
+        self.shown[i] = key_config  # Snapshots are immutable, no copy needed
+        key_label = key_config.get("label", "")
+        has_config = key_config.get("type") and key_config.get("type") != "none"
+        
+        # Display label if available, otherwise show key number
+        if key_label:
+            self.set_tile(i, "configured", key_label)
+        elif has_config:
+            self.set_tile(i, "configured-no-label", f"{i + 1:02d}")
+        else:
+            self.set_tile(i, "empty", f"{i + 1:02d}")
+
+    def on_tile_clicked(self, index):
+        if index >= 12:
+            self.fixed_actions[index - 12]()
+        else:
+            self.on_click(index)
 
     def on_click(self, index):
         """Handle button click: Execute action in test mode or open editor."""
@@ -64,14 +72,119 @@ class MacropadGrid(QWidget):
                 if self.main_window.overlay:
                      self.main_window.overlay.refresh()
 
+class PresetListModel(QAbstractListModel):
+    """Preset names for the presets page.
+
+    Names are pulled from an iterator in batches as the view scrolls (fetchMore), and
+    the view only asks for the rows it shows, so a broad search stays cheap.
+    """
+
+    BATCH = 100
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = []
+        self.source = iter(())
+        self.exhausted = True
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and 0 <= index.row() < len(self.names):
+            return self.names[index.row()]
+        return None
+
+    def set_names(self, names):
+        self.beginResetModel()
+        self.names = []
+        self.source = iter(names)
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        batch = list(itertools.islice(self.source, self.BATCH))
+        if len(batch) < self.BATCH:
+            self.exhausted = True
+        if batch:
+            self.beginInsertRows(QModelIndex(), len(self.names), len(self.names) + len(batch) - 1)
+            self.names.extend(batch)
+            self.endInsertRows()
+
+    def row_of(self, name):
+        try:
+            return self.names.index(name)
+        except ValueError:
+            return -1
+
+
+class UsagePanel(QFrame):
+    """Dashboard panel listing the most used keys and the slowest actions."""
+
+    def __init__(self, stats, parent=None):
+        super().__init__(parent)
+        self.stats = stats
+        self.shown_version = -1
+        self.setObjectName("usagePanel")
+
+        lyt = QHBoxLayout(self)
+        self.top_lbl = self._column(lyt, "TOP KEYS")
+        self.slow_lbl = self._column(lyt, "SLOWEST ACTIONS")
+
+        # Redraw on a throttled timer instead of on every key press
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+        self.refresh()
+
+    def _column(self, parent_lyt, title):
+        col = QVBoxLayout()
+        hdr = QLabel(title); hdr.setObjectName("infoCardTitle")
+        body = QLabel("No presses yet"); body.setObjectName("usageList")
+        body.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        col.addWidget(hdr); col.addWidget(body, 1)
+        parent_lyt.addLayout(col, 1)
+        return body
+
+    @staticmethod
+    def _key_name(preset, key_index, label):
+        return f"{preset.upper()} / {label or f'KEY {key_index + 1:02d}'}"
+
+    def refresh(self):
+        """Re-renders the lists, skipping the work if nothing changed or the panel is hidden."""
+        if self.stats.version == self.shown_version:
+            return
+        if self.shown_version >= 0 and not self.isVisible():
+            return
+        self.shown_version = self.stats.version
+
+        top = self.stats.top_keys(5)
+        if top:
+            self.top_lbl.setText("\n".join(
+                f"{count:>6}  {self._key_name(p, k, label)}" for p, k, label, count in top))
+        slow = self.stats.slowest_actions(5)
+        if slow:
+            self.slow_lbl.setText("\n".join(
+                f"{avg:>7.1f} ms  {self._key_name(p, k, label)}" for p, k, label, avg, _ in slow))
+
+
 class MainView(QWidget):
     """The main central widget containing sidebar and pages."""
 
+    # Hidden keys pages kept for the presets next to the active one
+    MAX_KEYS_PAGES = 4
+
     def __init__(self, preset_manager, main_window):
         super().__init__()
         self.preset_manager = preset_manager
         self.main_window = main_window
         self.model_widget = None  # Cache the model to prevent reload spinning
+        self.keys_pages = {}  # preset name -> pre-rendered keys page
         
         layout = QHBoxLayout(self)
         layout.setContentsMargins(0,0,0,0)
@@ -95,8 +208,12 @@ class MainView(QWidget):
         side_lyt.addStretch()
         self.status_label = QLabel("OFFLINE"); self.status_label.setObjectName("statusLabel")
         side_lyt.addWidget(self.status_label)
+        self.health_label = QLabel(""); self.health_label.setObjectName("healthLabel")
+        self.health_label.hide()
+        side_lyt.addWidget(self.health_label)
         
         self.is_connected = False
+        self.device_health = {}
 
         self.pages = QStackedWidget()
         layout.addWidget(self.sidebar)
@@ -109,6 +226,7 @@ class MainView(QWidget):
         for i, btn in enumerate(self.nav_btns):
             btn.setChecked(i == index)
 
+    @profiler.traced("ui.reload_all_pages")
     def reload_all_pages(self):
         """Total refresh of all UI components to sync with JSON files."""
         cur_idx = self.pages.currentIndex() if self.pages.count() > 0 else 0
@@ -125,15 +243,16 @@ class MainView(QWidget):
             # Update dashboard cards in place instead of rebuilding
             self.update_dashboard_cards()
             
-            # Remove old keys and presets pages
-            while self.pages.count() > 1:
-                w = self.pages.widget(1)
-                self.pages.removeWidget(w)
-                w.deleteLater()
+            # Swap in the keys page for the active preset, pre-rendered if possible
+            old = self.pages.widget(1)
+            page = self.keys_page_for(self.preset_manager.current_preset, old)
+            if page is not old:
+                self.pages.removeWidget(old)
+                self.pages.insertWidget(1, page)
+                self.retire_keys_page(old)
             
-            # Rebuild keys and presets
-            self.pages.addWidget(self.build_keys())
-            self.pages.addWidget(self.build_presets())
+            # The presets page is kept (with its search text), only its list is refreshed
+            self.refresh_preset_list()
         
         self.switch_page(cur_idx)
         
@@ -142,7 +261,79 @@ class MainView(QWidget):
             keys_page = self.pages.widget(1)
             if hasattr(keys_page, 'preset_lbl'):
                 keys_page.preset_lbl.setText(f"Current Preset: {self.preset_manager.current_preset}")
+
+    def keys_page_for(self, name, current=None):
+        """Returns a keys page showing `name`: the current one, a pre-rendered one or a new one."""
+        if current is not None and current.preset_name == name:
+            page = current
+        else:
+            page = self.keys_pages.pop(name, None) or self.build_keys(name)
+        # Pages may have been built before the preset was last edited; patch what differs
+        data = self.preset_manager.get_preset_data(name) or {}
+        page.grid.apply(data.get("keys", []))
+        page.test_btn.setChecked(self.main_window.test_mode)
+        self.grid = page.grid
+        self.preset_lbl = page.preset_lbl
+        return page
+
+    def retire_keys_page(self, page):
+        # Keep it around in case the user cycles back
+        if page.preset_name in self.keys_pages or len(self.keys_pages) >= self.MAX_KEYS_PAGES:
+            page.deleteLater()
+        else:
+            page.hide()
+            self.keys_pages[page.preset_name] = page
+
+    def prerender_keys_pages(self, names):
+        """Builds hidden keys pages for `names` (the neighbours of the active preset) and drops the rest."""
+        for name in list(self.keys_pages):
+            if name not in names:
+                self.keys_pages.pop(name).deleteLater()
+        for name in names:
+            if name not in self.keys_pages and name != self.preset_manager.current_preset:
+                page = self.build_keys(name)
+                page.setParent(self)
+                page.hide()
+                self.keys_pages[name] = page
     
+    def release_pages(self):
+        """Tears down every page, including the WebEngine model view, while the window is hidden."""
+        while self.pages.count():
+            w = self.pages.widget(0)
+            self.pages.removeWidget(w)
+            w.deleteLater()
+        for page in self.keys_pages.values():
+            page.deleteLater()
+        self.keys_pages = {}
+        # The model view lives inside the dashboard page and goes with it
+        self.model_widget = None
+        for attr in ("dashboard_page", "conn_card", "usage_panel", "timeline_panel", "plist", "psearch", "preset_lbl", "grid"):
+            if hasattr(self, attr):
+                delattr(self, attr)
+
+    def restore_pages(self):
+        """Rebuilds the pages after release_pages()."""
+        if self.pages.count() == 0:
+            self.reload_all_pages()
+            self.update_connection_state(self.is_connected)
+
+    def apply_preset_changes(self):
+        """Patches the pages after presets changed on disk, instead of rebuilding them."""
+        if not hasattr(self, 'grid'):
+            return
+        self.update_dashboard_cards()
+        self.grid.apply(self.preset_manager.current_preset_data.get("keys", []))
+        self.refresh_preset_list()
+
+    def refresh_preset_list(self):
+        query = self.psearch.text().strip()
+        names = self.preset_manager.search(query) if query else self.preset_manager.list_presets()
+        model = self.plist.model()
+        model.set_names(names)
+        row = model.row_of(self.preset_manager.current_preset)
+        if row >= 0:
+            self.plist.setCurrentIndex(model.index(row))
+
     def update_dashboard_cards(self):
         """Update dashboard info cards without rebuilding the entire page."""
         if not hasattr(self, 'dashboard_page'):
@@ -186,15 +377,18 @@ class MainView(QWidget):
         row.addWidget(keys_card)
         
         status = "ACTIVE" if self.is_connected else "OFFLINE"
-        color = "#10b981" if self.is_connected else "#ef4444"
         
         self.conn_card = self.info_card("CONNECTION", status)
         self.conn_card.setObjectName("connCard")
-        self.conn_card.value_label.setStyleSheet(f"color: {color};")
+        set_state(self.conn_card.value_label, state="online" if self.is_connected else "offline")
         row.addWidget(self.conn_card)
 
         lyt.addLayout(row)
         lyt.addSpacing(20)
+        self.usage_panel = UsagePanel(self.main_window.stats)
+        lyt.addWidget(self.usage_panel)
+        self.timeline_panel = TimelinePanel(self.main_window.timeline)
+        lyt.addWidget(self.timeline_panel)
         lyt.addWidget(self.build_model_view(), alignment=Qt.AlignCenter)
         lyt.addStretch()
         return page
@@ -206,17 +400,20 @@ class MainView(QWidget):
         f.value_label = val
         return f
 
-    def build_keys(self):
+    def build_keys(self, name=None):
+        name = name or self.preset_manager.current_preset
+        data = self.preset_manager.get_preset_data(name) or {}
         page = QFrame()
+        page.preset_name = name
         lyt = QVBoxLayout(page); lyt.setContentsMargins(50,50,50,50)
         
         hdr = QHBoxLayout()
         v_lyt = QVBoxLayout()
         title = QLabel("Grid Layout"); title.setObjectName("pageTitle")
         # CURRENT PRESET LABEL BACK IN CONFIG
-        self.preset_lbl = QLabel(f"Current Preset: {self.preset_manager.current_preset}")
-        self.preset_lbl.setStyleSheet("color: #10b981; font-weight: bold; font-size: 14px;")
-        v_lyt.addWidget(title); v_lyt.addWidget(self.preset_lbl)
+        page.preset_lbl = QLabel(f"Current Preset: {name}")
+        page.preset_lbl.setObjectName("presetLabel")
+        v_lyt.addWidget(title); v_lyt.addWidget(page.preset_lbl)
         
         hdr.addLayout(v_lyt); hdr.addStretch()
         
@@ -224,10 +421,15 @@ class MainView(QWidget):
         tbtn.setChecked(self.main_window.test_mode)
         tbtn.clicked.connect(lambda: setattr(self.main_window, 'test_mode', tbtn.isChecked()))
         hdr.addWidget(tbtn)
+        page.test_btn = tbtn
         
         lyt.addLayout(hdr)
-        lyt.addWidget(MacropadGrid(self.preset_manager, self.main_window), alignment=Qt.AlignCenter)
+        page.grid = MacropadGrid(self.preset_manager, self.main_window, data.get("keys", []))
+        lyt.addWidget(page.grid, alignment=Qt.AlignCenter)
         lyt.addStretch()
+        if name == self.preset_manager.current_preset:
+            self.grid = page.grid
+            self.preset_lbl = page.preset_lbl
         return page
 
     def build_presets(self):
@@ -243,33 +445,44 @@ class MainView(QWidget):
         btn_add = QPushButton("+ NEW")
         btn_ren = QPushButton("RENAME")
         btn_del = QPushButton("DELETE")
+        btn_exp = QPushButton("EXPORT")
+        btn_imp = QPushButton("IMPORT")
         
         # Link to the fixed functions
         btn_add.clicked.connect(self.add_preset)
         btn_ren.clicked.connect(self.rename_preset)
         btn_del.clicked.connect(self.delete_preset)
+        btn_exp.clicked.connect(self.export_preset)
+        btn_imp.clicked.connect(self.import_presets)
         
         hdr.addWidget(btn_add)
         hdr.addWidget(btn_ren)
         hdr.addWidget(btn_del)
+        hdr.addWidget(btn_exp)
+        hdr.addWidget(btn_imp)
         lyt.addLayout(hdr)
 
+        # Search over names, key labels, action values and icons
+        self.psearch = QLineEdit()
+        self.psearch.setObjectName("presetSearch")
+        self.psearch.setPlaceholderText("Search presets, labels, commands, icons...")
+        self.psearch.textChanged.connect(self.refresh_preset_list)
+        lyt.addWidget(self.psearch)
+
         # The List
-        self.plist = QListWidget()
+        self.plist = QListView()
         self.plist.setObjectName("presetList")
-        for p in self.preset_manager.list_presets():
-            item = QListWidgetItem(p)
-            self.plist.addItem(item)
-            if p == self.preset_manager.current_preset:
-                item.setSelected(True)
+        self.plist.setUniformItemSizes(True)  # Lets the view lay out only the visible rows
+        self.plist.setModel(PresetListModel(self.plist))
+        self.refresh_preset_list()
         
-        self.plist.itemClicked.connect(self.on_preset_select)
+        self.plist.clicked.connect(self.on_preset_select)
         lyt.addWidget(self.plist)
         return page
 
-    def on_preset_select(self, item):
+    def on_preset_select(self, index):
         """Triggered when clicking a preset in the list."""
-        self.main_window.switch_preset(item.text())
+        self.main_window.switch_preset(self.plist.model().names[index.row()])
         self.switch_page(1) # Jump to key config automatically
 
     def add_preset(self):
@@ -301,6 +514,7 @@ class MainView(QWidget):
         if ok and new_name and new_name.strip() != old_name:
             new_name = new_name.strip()
             self.preset_manager.rename_preset(old_name, new_name)
+            self.main_window.scheduler.reload(old_name, new_name)
             self.main_window.switch_preset(new_name)
             self.switch_page(1)
 
@@ -321,24 +535,66 @@ class MainView(QWidget):
 
         if confirm == QMessageBox.Yes:
             self.preset_manager.delete_preset(target)
+            self.main_window.scheduler.reload(target)
             # Always switch back to default after a deletion
             self.main_window.switch_preset("default")
             self.switch_page(0) # Go to Dashboard to see updated count
 
+    def export_preset(self):
+        # Acts on the CURRENTLY ACTIVE preset: one zip with the preset and its icons
+        name = self.preset_manager.current_preset
+        path, _ = QFileDialog.getSaveFileName(self, "Export Preset", f"{name}.zip", "Preset bundles (*.zip)")
+        if not path:
+            return
+        try:
+            icon_store.export_bundle(self.preset_manager, [name], path)
+        except OSError as e:
+            QMessageBox.warning(self, "Export Failed", f"Could not write the bundle:\n{e}")
+
+    def import_presets(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Presets", "", "Preset bundles (*.zip)")
+        if not path:
+            return
+        try:
+            names = icon_store.import_bundle(self.preset_manager, path)
+        except (OSError, zipfile.BadZipFile) as e:
+            QMessageBox.warning(self, "Import Failed", f"Could not read the bundle:\n{e}")
+            return
+        if not names:
+            QMessageBox.warning(self, "Import Failed", "The bundle contains no presets.")
+            return
+        self.main_window.scheduler.reload(*names)
+        self.main_window.switch_preset(names[0])
+        self.switch_page(1)
+
+    @profiler.traced("ui.connection_state")
     def update_connection_state(self, connected):
         self.is_connected = connected
         status = "ACTIVE" if connected else "OFFLINE"
-        color = "#10b981" if connected else "#ef4444"
+        state = "online" if connected else "offline"
         if hasattr(self, 'status_label'):
-            self.status_label.setText(status); self.status_label.setStyleSheet(f"color: {color};")
+            self.status_label.setText(status); set_state(self.status_label, state=state)
         if hasattr(self, 'conn_card'):
-            self.conn_card.value_label.setText(status); self.conn_card.value_label.setStyleSheet(f"color: {color};")
+            self.conn_card.value_label.setText(status); set_state(self.conn_card.value_label, state=state)
+
+    def update_device_health(self, device_id, health):
+        """Shows the scan rate and jitter each pad reports in its heartbeat. Empty health clears the pad."""
+        if health:
+            self.device_health[device_id] = health
+        else:
+            self.device_health.pop(device_id, None)
+        lines = [
+            f"{dev_id.upper()}  {h['scan_hz']} Hz  ±{h['jitter_us'] / 1000:.1f} ms"
+            for dev_id, h in sorted(self.device_health.items())
+        ]
+        self.health_label.setText("\n".join(lines))
+        self.health_label.setVisible(bool(lines))
 
 
 class RotatingModelWidget(QWidget):
     def __init__(self, model_path, parent=None):
         super().__init__(parent)
-        self.setMinimumSize(520, 320)
+        self.setMinimumSize(520, 260)
 
         from PySide6.QtWebEngineWidgets import QWebEngineView
         from PySide6.QtWebEngineCore import QWebEngineSettings
@@ -348,7 +604,7 @@ class RotatingModelWidget(QWidget):
         self.view.setAttribute(Qt.WA_TransparentForMouseEvents, True)
         self.view.setFocusPolicy(Qt.NoFocus)
         self.view.setContextMenuPolicy(Qt.NoContextMenu)
-        self.view.setStyleSheet("background: transparent;")
+        self.view.setObjectName("modelView")
         self.view.page().setBackgroundColor(Qt.transparent)
 
         settings = self.view.settings()
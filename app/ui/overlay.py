@@ -1,16 +1,23 @@
 # ui/overlay.py
 
 from PySide6.QtWidgets import (
-    QWidget, QGridLayout, QLabel, QFrame, QVBoxLayout, QApplication, 
+    QWidget, QLabel, QFrame, QVBoxLayout, QApplication, 
     QPushButton, QHBoxLayout, QGraphicsDropShadowEffect
 )
-from PySide6.QtGui import QPixmap, QColor
+from PySide6.QtGui import QColor
 from PySide6.QtCore import Qt
-import os
-import qtawesome as qta
+
+from core.profiler import profiler
+from ui.key_tiles import KeyTileSurface, OVERLAY_LOOK, tile_icon
+from ui.theme import theme
+
+# Marks tiles that haven't been drawn yet
+_UNSET = object()
 
 
 class OverlayWindow(QWidget):
+    FIXED_LABELS = ["APP", "LAYER", "PREV", "NEXT"]
+
     def __init__(self, preset_manager):
         super().__init__()
         self.preset_manager = preset_manager
@@ -26,6 +33,12 @@ class OverlayWindow(QWidget):
 
         self.setAttribute(Qt.WA_TranslucentBackground, True)
         self.build_ui()
+        theme.theme_changed.connect(self.on_theme_changed)
+
+    def on_theme_changed(self, name):
+        # Icons are tinted with the theme's text color; re-render the macro tiles
+        self.shown = [_UNSET] * 12
+        self.refresh()
 
     def build_ui(self):
         outer_layout = QVBoxLayout(self)
@@ -33,13 +46,6 @@ class OverlayWindow(QWidget):
         
         frame = QFrame()
         frame.setObjectName("overlayFrame")
-        frame.setStyleSheet("""
-            #overlayFrame {
-                background-color: #1e1e1e;
-                border: 1px solid #333333;
-                border-radius: 16px;
-            }
-        """)
         
         # Add soft shadow for depth
         shadow = QGraphicsDropShadowEffect(self)
@@ -58,152 +64,61 @@ class OverlayWindow(QWidget):
         # Top Bar
         top_bar = QHBoxLayout()
         title_label = QLabel("MACROPAD")
-        title_label.setObjectName("titleLabel")
-        title_label.setStyleSheet("""
-            QLabel#titleLabel {
-                color: #555; 
-                font-weight: 600; 
-                font-size: 10px; 
-                letter-spacing: 0.5px;
-                background: transparent;
-                border: none;
-            }
-        """) 
+        title_label.setObjectName("overlayTitle")
         top_bar.addWidget(title_label)
         
         top_bar.addStretch()
         close_btn = QPushButton("✕")
         close_btn.setFixedSize(24, 24)
         close_btn.setCursor(Qt.PointingHandCursor)
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                color: #666;
-                border: none;
-                border-radius: 12px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #cc0000;
-                color: white;
-            }
-        """)
+        close_btn.setObjectName("overlayClose")
         close_btn.clicked.connect(self.hide)
         top_bar.addWidget(close_btn)
         main_layout.addLayout(top_bar)
 
-        # Grid of Keys
-        grid = QGridLayout()
-        grid.setSpacing(8)
-        main_layout.addLayout(grid)
-
-        self.labels = []
-
-        for row in range(4):
-            for col in range(4):
-                label = QLabel()
-                label.setAlignment(Qt.AlignCenter)
-                label.setWordWrap(True) 
-                label.setFixedSize(76, 76) 
-                label.setContentsMargins(4, 4, 4, 4)
+        # Grid of Keys, painted as one surface
+        self.tiles = KeyTileSurface(OVERLAY_LOOK, tile_size=76, spacing=8, hover=True)
+        main_layout.addWidget(self.tiles)
 
-                grid.addWidget(label, row, col)
-                self.labels.append(label)
+        self.shown = [_UNSET] * 12  # Key config each tile currently displays
+        for i, name in enumerate(self.FIXED_LABELS):
+            self.tiles.set_tile(12 + i, "fixed", name)
 
         self.refresh()
 
+    @profiler.traced("overlay.refresh")
     def refresh(self):
-        """Refresh overlay contents based on current preset."""
+        """Refresh overlay tiles whose key configuration changed since they were drawn."""
         data = self.preset_manager.current_preset_data or {}
         keys = data.get("keys", [])
 
-        for i, label in enumerate(self.labels):
-            # MACRO KEYS (1-12)
-            if i < 12:
-                if i < len(keys):
-                    action = keys[i]
-                    action_type = action.get("type", "none")
-                    icon_path = action.get("icon", "")
-                    
-                    if action_type == "none":
-                        label.clear()
-                        label.setText(f"<span style='color:#3a3a3a; font-size:10px;'>{i+1}</span>")
-                        label.setStyleSheet("""
-                            QLabel {
-                                background-color: #252525;
-                                border: 1px solid #2e2e2e;
-                                border-radius: 12px;
-                            }
-                        """)
-                    else:
-                        label.clear()
-                        icon_set = False
-                        
-                        # 1. Custom File
-                        if icon_path and os.path.exists(icon_path):
-                            pix = QPixmap(icon_path)
-                            if not pix.isNull():
-                                # Smaller icons (24x24) for more breathing room
-                                label.setPixmap(pix.scaled(24, 24, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-                                icon_set = True
-
-                        # 2. FontAwesome Icon
-                        if not icon_set and icon_path:
-                            try:
-                                if "fa" in icon_path or "." in icon_path:
-                                    icon = qta.icon(icon_path, color="#e0e0e0") 
-                                    pix = icon.pixmap(24, 24)
-                                    if not pix.isNull():
-                                        label.setPixmap(pix)
-                                        icon_set = True
-                            except:
-                                pass
-                        
-                        if not icon_set:
-                            display_name = action.get("label") or action_type.replace("_", " ").title()
-                            # Shorten if too long
-                            if len(display_name) > 15:
-                                display_name = display_name[:12] + "..."
-                                
-                            label.setText(f"<html><head/><body><p align='center'>"
-                                          f"<span style='font-size:8pt; font-weight:600; color:#555;'>{i+1}</span><br/>"
-                                          f"<span style='font-size:9pt; font-weight:500; color:#f0f0f0;'>{display_name}</span>"
-                                          f"</p></body></html>")
-                        
-                        label.setStyleSheet("""
-                            QLabel {
-                                background-color: #333333;
-                                border: 1px solid #444444; 
-                                border-radius: 12px;
-                                color: white;
-                            }
-                            QLabel:hover {
-                                background-color: #3d3d3d;
-                                border: 1px solid #555555;
-                            }
-                        """)
-                else:
-                    label.setText(f"<span style='color:#333; font-size:10px;'>{i+1}</span>")
-                    label.setStyleSheet("""
-                            QLabel {
-                                background-color: #202020;
-                                border: 1px solid #2a2a2a;
-                                border-radius: 12px;
-                            }
-                    """)
-            
-            # FUNCTION KEYS (13-16)
-            else:
-                names = ["APP", "LAYER", "PREV", "NEXT"]
-                label.setText(f"<div style='font-size: 9px; font-weight:700; color:#888; letter-spacing:1px;'>{names[i - 12]}</div>")
-                label.setStyleSheet("""
-                    QLabel {
-                        background-color: #222222;
-                        color: #888; 
-                        border: 1px dashed #333;
-                        border-radius: 12px;
-                    }
-                """)
+        # MACRO KEYS (1-12); the function keys (13-16) never change
+        for i in range(12):
+            action = keys[i] if i < len(keys) else None
+            if action != self.shown[i]:
+                self.shown[i] = action  # Snapshots are immutable, no copy needed
+                self.render_macro_key(i, action)
+
+    def render_macro_key(self, i, action):
+        if action is None:
+            self.tiles.set_tile(i, "missing", str(i + 1))
+            return
+        action_type = action.get("type", "none")
+        if action_type == "none":
+            self.tiles.set_tile(i, "empty", str(i + 1))
+            return
+
+        # Custom file or FontAwesome icon, smaller (24x24) for more breathing room
+        icon = tile_icon(action.get("icon", ""), 24, theme.colors.get("overlay_text"))
+        if icon is not None:
+            self.tiles.set_tile(i, "configured", icon=icon)
+            return
+
+        display_name = action.get("label") or action_type.replace("_", " ").title()
+        # Shorten if too long
+        if len(display_name) > 15:
+            display_name = display_name[:12] + "..."
+        self.tiles.set_tile(i, "configured", display_name, title=str(i + 1))
 
     def show_on_primary_bottom_left(self):
         self.adjustSize()
@@ -0,0 +1,148 @@
+# ui/theme.py
+
+import json
+from pathlib import Path
+from string import Template
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QApplication
+
+from core.log import get_logger
+from core.profiler import profiler
+
+log = get_logger("theme")
+
+STYLES_DIR = Path(__file__).resolve().parent.parent / "styles"
+
+# Theme every other theme falls back to for colors it doesn't define
+BASE_THEME = "dark"
+
+
+def set_state(widget, **props):
+    """Sets dynamic properties the theme selects on, re-polishing only `widget` if one changed.
+
+    Use this instead of widget.setStyleSheet() for state changes: the application style
+    sheet stays compiled and only this widget's style is re-resolved.
+    """
+    changed = False
+    for name, value in props.items():
+        if widget.property(name) != value:
+            widget.setProperty(name, value)
+            changed = True
+    if changed:
+        style = widget.style()
+        style.unpolish(widget)
+        style.polish(widget)
+        widget.update()
+    return changed
+
+
+class ThemeManager(QObject):
+    """Compiles styles/main.css with a theme's colors and applies it to the whole application.
+
+    A theme is a JSON file in styles/themes/ with a "label" and a "colors" map. The
+    compiled style sheet is set once on the QApplication, so widgets never carry their
+    own. Painted widgets (key tiles) resolve their looks from the same colors through
+    look() and listen to theme_changed.
+    """
+
+    theme_changed = Signal(str)
+
+    def __init__(self, styles_dir=STYLES_DIR):
+        super().__init__()
+        self.styles_dir = Path(styles_dir)
+        self.name = None
+        self.colors = {}
+        self._compiled = {}  # theme name -> (colors, style sheet)
+        self._looks = {}     # id(look template) -> resolved look, for the current theme
+
+    def names(self):
+        return sorted(p.stem for p in (self.styles_dir / "themes").glob("*.json"))
+
+    def label(self, name):
+        return self._read(name).get("label", name.title())
+
+    def _read(self, name):
+        try:
+            with open(self.styles_dir / "themes" / f"{name}.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            log.error("Failed to load theme '%s': %s", name, e)
+            return {}
+
+    def compile(self, name):
+        """Returns (colors, style sheet) for a theme, compiling it on first use."""
+        if name not in self._compiled:
+            colors = {}
+            if name != BASE_THEME:
+                colors.update(self._read(BASE_THEME).get("colors", {}))
+            colors.update(self._read(name).get("colors", {}))
+            try:
+                with open(self.styles_dir / "main.css", "r", encoding="utf-8") as f:
+                    css = Template(f.read()).safe_substitute(colors)
+            except OSError as e:
+                log.error("Failed to load style sheet: %s", e)
+                css = ""
+            self._compiled[name] = (colors, css)
+        return self._compiled[name]
+
+    @profiler.traced("theme.apply")
+    def apply(self, name):
+        """Switches the whole application to a theme."""
+        if name not in self.names():
+            log.error("Unknown theme: %s", name)
+            name = BASE_THEME
+        self.colors, css = self.compile(name)
+        self.name = name
+        self._looks = {}
+        app = QApplication.instance()
+        if app is not None:
+            app.setStyleSheet(css)
+        self.theme_changed.emit(name)
+
+    def look(self, template):
+        """Resolves "$color" references in a tile look against the current theme."""
+        if not self.colors:
+            # Painted before any theme was applied (e.g. in a benchmark)
+            self.colors = self.compile(BASE_THEME)[0]
+        look = self._looks.get(id(template))
+        if look is None:
+            look = self._looks[id(template)] = self._resolve(template)
+        return look
+
+    def _resolve(self, value):
+        if isinstance(value, dict):
+            return {k: self._resolve(v) for k, v in value.items()}
+        if isinstance(value, tuple):
+            return tuple(self._resolve(v) for v in value)
+        if isinstance(value, str) and value.startswith("$"):
+            return self.colors.get(value[1:], "#ff00ff")
+        return value
+
+    def load_choice(self, path):
+        """Theme saved by save_choice(), or the base theme."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get("theme", BASE_THEME)
+        except (OSError, json.JSONDecodeError, AttributeError):
+            return BASE_THEME
+
+    def save_choice(self, path):
+        """Stores the theme in the settings file, keeping any other settings in it."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                settings = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            settings = {}
+        if not isinstance(settings, dict):
+            settings = {}
+        settings["theme"] = self.name
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(settings, f, indent=4)
+        except OSError as e:
+            log.error("Failed to save theme choice: %s", e)
+
+
+# Shared instance for the application and painted widgets
+theme = ThemeManager()
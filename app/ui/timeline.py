@@ -0,0 +1,175 @@
+# ui/timeline.py
+
+import math
+import time
+
+from PySide6.QtWidgets import QWidget, QFrame, QVBoxLayout, QHBoxLayout, QLabel
+from PySide6.QtGui import QPainter, QColor, QFont
+from PySide6.QtCore import Qt, QTimer, QRectF
+
+from core.key_timeline import PRESS, FIXED, STALE, CONNECT, DISCONNECT
+from ui.theme import theme
+
+
+class TimelinePlot(QWidget):
+    """Plots the last few seconds of a KeyTimeline: one lane per key, latency bars below.
+
+    Repaints on a timer capped at MAX_FPS, and only while the widget is visible and
+    something is on screen that moved or changed since the last frame.
+    """
+
+    WINDOW_S = 10.0
+    MAX_FPS = 20
+    LATENCY_CAP_MS = 100.0  # Top of the latency strip
+    STRIP_H = 30
+    KEYS = 16
+
+    def __init__(self, timeline, parent=None):
+        super().__init__(parent)
+        self.timeline = timeline
+        self.shown_version = -1
+        self.setMinimumHeight(self.KEYS * 4 + self.STRIP_H + 4)
+
+        self.font = QFont(self.font())
+        self.font.setPixelSize(9)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000 // self.MAX_FPS)
+        self.timer.timeout.connect(self.tick)
+        theme.theme_changed.connect(self.update)
+
+    def showEvent(self, event):
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def tick(self):
+        # New events, or old ones still scrolling through the window
+        latest = self.timeline.latest()
+        if self.timeline.version != self.shown_version or (
+                latest is not None and time.monotonic() - latest.t < self.WINDOW_S):
+            self.update()
+
+    def paintEvent(self, event):
+        self.shown_version = self.timeline.version
+        colors = theme.colors
+        now = time.monotonic()
+        t0 = now - self.WINDOW_S
+        w, h = self.width(), self.height()
+        lanes_h = h - self.STRIP_H
+        lane = lanes_h / self.KEYS
+        strip_top = lanes_h + 2
+        scale = w / self.WINDOW_S
+
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(colors.get("surface")))
+
+        # One grid line per second, scrolling with time
+        painter.setPen(QColor(colors.get("divider")))
+        for s in range(int(self.WINDOW_S) + 1):
+            x = w - (now % 1.0 + s) * scale
+            painter.drawLine(int(x), 0, int(x), h)
+        painter.drawLine(0, lanes_h, w, lanes_h)
+
+        events = list(self.timeline.since(t0))
+        events.reverse()  # Oldest first
+
+        # Reconnect gaps: shaded from a disconnect to the next connect (or now)
+        gap_fill = QColor(colors.get("danger"))
+        gap_fill.setAlpha(40)
+        gap_start = None
+        for ev in events:
+            if ev.kind == DISCONNECT:
+                gap_start = ev.t if gap_start is None else gap_start
+            elif ev.kind == CONNECT:
+                start = t0 if gap_start is None else gap_start
+                painter.fillRect(QRectF((start - t0) * scale, 0, (ev.t - start) * scale, h), gap_fill)
+                gap_start = None
+        if gap_start is not None:
+            painter.fillRect(QRectF((gap_start - t0) * scale, 0, (now - gap_start) * scale, h), gap_fill)
+
+        marks = {PRESS: QColor(colors.get("accent")), FIXED: QColor(colors.get("key_text")),
+                 STALE: QColor(colors.get("danger"))}
+        unmapped = QColor(colors.get("text_dim"))
+        gesture = QColor(colors.get("accent_light"))
+        stages = ((QColor(colors.get("border_hover")), "link_ms"),
+                  (QColor(colors.get("accent_dark")), "resolve_ms"),
+                  (QColor(colors.get("accent")), "action_ms"))
+        over = QColor(colors.get("danger"))
+
+        painter.setPen(Qt.NoPen)
+        for ev in events:
+            x = (ev.t - t0) * scale
+            if ev.kind in (CONNECT, DISCONNECT):
+                painter.fillRect(QRectF(x, 0, 1, h), QColor(colors.get("accent" if ev.kind == CONNECT else "danger")))
+                continue
+
+            color = marks[ev.kind]
+            if ev.kind == PRESS and not ev.label:
+                color = unmapped
+            elif ev.kind == PRESS and ev.gesture not in ("", "tap"):
+                color = gesture
+            row = min(max(ev.key, 1), self.KEYS) - 1
+            painter.fillRect(QRectF(x - 1, row * lane + 1, 3, max(lane - 2, 1)), color)
+
+            if ev.kind != PRESS:
+                continue
+            # Stacked latency bar; square-root scale so a 1 ms stage is still visible next to 100 ms
+            total = ev.link_ms + ev.resolve_ms + ev.action_ms
+            bottom = h
+            for stage_color, field in stages:
+                ms = getattr(ev, field)
+                if ms <= 0:
+                    continue
+                height = self._bar(ms, total)
+                painter.fillRect(QRectF(x - 1, bottom - height, 3, height), stage_color)
+                bottom -= height
+            if total > self.LATENCY_CAP_MS:
+                painter.fillRect(QRectF(x - 1, strip_top, 3, 2), over)
+
+        painter.setFont(self.font)
+        painter.setPen(QColor(colors.get("text_dim")))
+        painter.drawText(4, strip_top + 9, f"{self.LATENCY_CAP_MS:.0f} ms")
+        painter.drawText(4, 10, f"-{self.WINDOW_S:.0f} s")
+
+    def _bar(self, ms, total):
+        # Each stage gets its share of the total bar height
+        full = (self.STRIP_H - 2) * math.sqrt(min(total, self.LATENCY_CAP_MS) / self.LATENCY_CAP_MS)
+        return max(full * ms / total, 1.0)
+
+
+class TimelinePanel(QFrame):
+    """Dashboard panel with the live key timeline and details of the latest press."""
+
+    def __init__(self, timeline, parent=None):
+        super().__init__(parent)
+        self.timeline = timeline
+        self.setObjectName("timelinePanel")
+
+        lyt = QVBoxLayout(self)
+        hdr_row = QHBoxLayout()
+        hdr = QLabel("KEY TIMELINE"); hdr.setObjectName("infoCardTitle")
+        self.detail = QLabel(""); self.detail.setObjectName("timelineDetail")
+        self.detail.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        hdr_row.addWidget(hdr); hdr_row.addWidget(self.detail, 1)
+        lyt.addLayout(hdr_row)
+        self.plot = TimelinePlot(timeline)
+        self.plot.timer.timeout.connect(self.refresh_detail)
+        lyt.addWidget(self.plot, 1)
+        self.shown_version = -1
+
+    def refresh_detail(self):
+        if self.timeline.version == self.shown_version:
+            return
+        self.shown_version = self.timeline.version
+        for ev in self.timeline.since(0.0):
+            if ev.kind == PRESS:
+                name = ev.label or "unmapped"
+                gesture = f" {ev.gesture.replace('_', ' ')}" if ev.gesture not in ("", "tap") else ""
+                self.detail.setText(
+                    f"{ev.preset.upper()} / KEY {ev.key:02d}{gesture}  {name}   "
+                    f"link {ev.link_ms:.0f}  resolve {ev.resolve_ms:.2f}  action {ev.action_ms:.1f} ms")
+                return
@@ -0,0 +1,173 @@
+"""Host-side simulation of the firmware scan loop.
+
+Runs app/firmware/main.py against a virtual clock and simulated key wiring, and
+compares event latency, scan wake-ups and USB transfers per second for the legacy
+fixed 100 Hz loop, the adaptive scheduler, and the adaptive scheduler with batching.
+
+    python benchmarks/bench_firmware_scan.py [--seconds 120] [--seed 1]
+"""
+
+import argparse
+import importlib.util
+import random
+import statistics
+import sys
+import types
+from pathlib import Path
+
+FIRMWARE = Path(__file__).resolve().parent.parent / "app" / "firmware" / "main.py"
+
+CONFIGS = {
+    "fixed 100 Hz, 1 event/frame": {"scan_ms": 10, "idle_scan_ms": 10, "batch": 1},
+    "adaptive, 1 event/frame": {"scan_ms": 1, "idle_scan_ms": 10, "batch": 1},
+    "adaptive, batched": {"scan_ms": 1, "idle_scan_ms": 10, "batch": 8},
+}
+
+
+class VirtualClock(types.ModuleType):
+    """Stands in for MicroPython's time module."""
+
+    def __init__(self):
+        super().__init__("time")
+        self.now = 0
+
+    def ticks_ms(self):
+        return self.now
+
+    def ticks_us(self):
+        return self.now * 1000
+
+    def ticks_diff(self, a, b):
+        return a - b
+
+    def sleep_ms(self, ms):
+        self.now += ms
+
+
+def fake_machine(levels):
+    """A machine module whose pins read from the simulated key levels."""
+    machine = types.ModuleType("machine")
+
+    class Pin:
+        IN = PULL_UP = 0
+        pin_map = {}
+
+        def __init__(self, pin, mode=None, pull=None):
+            self.key = Pin.pin_map.setdefault(pin, len(Pin.pin_map))
+
+        def value(self):
+            return levels[self.key]
+
+    machine.Pin = Pin
+    return machine
+
+
+def load_firmware(clock, levels):
+    saved = {name: sys.modules.get(name) for name in ("time", "machine")}
+    sys.modules["time"] = clock
+    sys.modules["machine"] = fake_machine(levels)
+    try:
+        spec = importlib.util.spec_from_file_location("firmware_sim", FIRMWARE)
+        fw = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(fw)
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+    fw.save_config = lambda: None
+    return fw
+
+
+def workload(seconds, seed):
+    """Physical edges as (time_ms, key, level): typing bursts, rolls, chords and idle gaps."""
+    rng = random.Random(seed)
+    edges = []
+    t = 500.0
+    end = seconds * 1000.0
+    while t < end:
+        kind = rng.random()
+        if kind < 0.5:
+            # Typing burst with overlapping (rolled) presses
+            for _ in range(rng.randint(4, 12)):
+                key = rng.randrange(12)
+                hold = rng.uniform(40, 120)
+                edges += [(t, key, 0), (t + hold, key, 1)]
+                t += rng.uniform(60, 160)
+        elif kind < 0.8:
+            # Chord: 2-4 keys within a couple of milliseconds, released together
+            keys = rng.sample(range(12), rng.randint(2, 4))
+            hold = rng.uniform(80, 200)
+            for key in keys:
+                offset = rng.uniform(0, 2)
+                edges += [(t + offset, key, 0), (t + hold + offset / 2, key, 1)]
+            t += hold + 50
+        else:
+            # Long press
+            key = rng.randrange(16)
+            hold = rng.uniform(500, 1200)
+            edges += [(t, key, 0), (t + hold, key, 1)]
+            t += hold
+        t += rng.expovariate(1 / 2500.0)  # Idle gap
+    edges.sort()
+    return edges
+
+
+def simulate(settings, edges, seconds):
+    clock = VirtualClock()
+    levels = [1] * 16
+    fw = load_firmware(clock, levels)
+    fw.config.update(settings)
+
+    frames = []
+    fw.write = frames.append
+    edge_time = [0.0] * 16
+    latencies = []
+    scans = 0
+    i = 0
+    end = seconds * 1000
+    while clock.now < end:
+        now = clock.now
+        while i < len(edges) and edges[i][0] <= now:
+            t, key, level = edges[i]
+            levels[key] = level
+            edge_time[key] = t
+            i += 1
+        events = fw.scan(now)
+        scans += 1
+        if events:
+            fw.send_events(events, now)
+            fw.pending.clear()  # The host acks immediately in this simulation
+            latencies += [now - edge_time[e[1] - 1] for e in events]
+        clock.sleep_ms(fw.scan_interval(now))
+
+    latencies.sort()
+    return {
+        "events": len(latencies),
+        "mean_ms": statistics.mean(latencies),
+        "p99_ms": latencies[int(len(latencies) * 0.99)],
+        "max_ms": latencies[-1],
+        "scans_s": scans / seconds,
+        "frames_s": len(frames) / seconds,
+        "frames_per_event": len(frames) / len(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    edges = workload(args.seconds, args.seed)
+    print(f"{len(edges)} physical edges over {args.seconds} s\n")
+    print(f"{'configuration':<30}{'mean ms':>9}{'p99 ms':>9}{'max ms':>9}{'scans/s':>10}{'USB tx/s':>10}{'tx/event':>10}")
+    for name, settings in CONFIGS.items():
+        r = simulate(settings, edges, args.seconds)
+        print(f"{name:<30}{r['mean_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}"
+              f"{r['scans_s']:>10.1f}{r['frames_s']:>10.2f}{r['frames_per_event']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
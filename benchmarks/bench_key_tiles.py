@@ -0,0 +1,172 @@
+"""Cost of refreshing the overlay's key tiles: painted surface vs. the old QLabel grid.
+
+Builds the overlay twice against the same fake preset manager: once as it is now
+(one KeyTileSurface) and once as it was (16 QLabels, each given rich text and its own
+style sheet on every change). Alternates between two presets whose 12 keys all differ,
+timing the refresh alone and the refresh plus the repaint it causes, and then times a
+refresh where nothing changed. The overlay's drop shadow is switched off so both sides
+repaint just the grid; with it, every repaint also re-blurs the whole frame.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_key_tiles.py [--rounds 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from qt_refs import pin_singletons  # noqa: E402
+
+pin_singletons()
+
+from PySide6.QtWidgets import QApplication, QFrame, QGridLayout, QLabel, QWidget  # noqa: E402
+from PySide6.QtCore import Qt  # noqa: E402
+import qtawesome as qta  # noqa: E402
+
+from core.preset import Preset  # noqa: E402
+from ui.overlay import OverlayWindow  # noqa: E402
+
+_UNSET = object()
+
+class FakePresets:
+    def __init__(self, data):
+        self.current_preset_data = data
+
+
+def make_preset(name, icons):
+    keys = []
+    for i in range(12):
+        if i % 5 == 4:
+            keys.append({"type": "none", "value": "", "label": ""})
+        elif icons and i % 3 == 0:
+            keys.append({"type": "open_website", "value": "https://example.com",
+                         "label": f"{name} {i}", "icon": icons[i % len(icons)]})
+        else:
+            keys.append({"type": "run_command", "value": f"echo {name}{i}",
+                         "label": f"{name} action number {i}"})
+    return Preset.from_dict({"name": name, "keys": keys})
+
+
+class LegacyOverlay(QWidget):
+    """The overlay's key grid before it was custom painted, trimmed to the grid."""
+
+    def __init__(self, preset_manager):
+        super().__init__()
+        self.preset_manager = preset_manager
+        grid = QGridLayout(self)
+        grid.setSpacing(8)
+        self.labels = []
+        self.shown = [_UNSET] * 16
+        for row in range(4):
+            for col in range(4):
+                label = QLabel()
+                label.setAlignment(Qt.AlignCenter)
+                label.setWordWrap(True)
+                label.setFixedSize(76, 76)
+                label.setContentsMargins(4, 4, 4, 4)
+                grid.addWidget(label, row, col)
+                self.labels.append(label)
+        self.refresh()
+
+    def refresh(self):
+        keys = (self.preset_manager.current_preset_data or {}).get("keys", [])
+        for i, label in enumerate(self.labels):
+            if i < 12:
+                action = keys[i] if i < len(keys) else None
+                if action != self.shown[i]:
+                    self.shown[i] = action
+                    self.render_macro_key(i, label, keys)
+            elif self.shown[i] is _UNSET:
+                self.shown[i] = True
+                label.setText(f"<div style='font-size: 9px; font-weight:700; color:#888; letter-spacing:1px;'>"
+                              f"{['APP', 'LAYER', 'PREV', 'NEXT'][i - 12]}</div>")
+                label.setStyleSheet("QLabel { background-color: #222222; color: #888; "
+                                    "border: 1px dashed #333; border-radius: 12px; }")
+
+    def render_macro_key(self, i, label, keys):
+        if i >= len(keys):
+            label.setText(f"<span style='color:#333; font-size:10px;'>{i+1}</span>")
+            label.setStyleSheet("QLabel { background-color: #202020; border: 1px solid #2a2a2a; border-radius: 12px; }")
+            return
+        action = keys[i]
+        action_type = action.get("type", "none")
+        icon_path = action.get("icon", "")
+        label.clear()
+        if action_type == "none":
+            label.setText(f"<span style='color:#3a3a3a; font-size:10px;'>{i+1}</span>")
+            label.setStyleSheet("QLabel { background-color: #252525; border: 1px solid #2e2e2e; border-radius: 12px; }")
+            return
+        icon_set = False
+        if icon_path:
+            pix = qta.icon(icon_path, color="#e0e0e0").pixmap(24, 24)
+            if not pix.isNull():
+                label.setPixmap(pix)
+                icon_set = True
+        if not icon_set:
+            display_name = action.get("label") or action_type.replace("_", " ").title()
+            if len(display_name) > 15:
+                display_name = display_name[:12] + "..."
+            label.setText(f"<html><head/><body><p align='center'>"
+                          f"<span style='font-size:8pt; font-weight:600; color:#555;'>{i+1}</span><br/>"
+                          f"<span style='font-size:9pt; font-weight:500; color:#f0f0f0;'>{display_name}</span>"
+                          f"</p></body></html>")
+        label.setStyleSheet("QLabel { background-color: #333333; border: 1px solid #444444; "
+                            "border-radius: 12px; color: white; } "
+                            "QLabel:hover { background-color: #3d3d3d; border: 1px solid #555555; }")
+
+
+def time_refreshes(app, widget, presets, sequence, rounds, paint):
+    samples = []
+    for r in range(rounds):
+        presets.current_preset_data = sequence[r % len(sequence)]
+        start = time.perf_counter()
+        widget.refresh()
+        if paint:
+            app.processEvents()
+        samples.append(time.perf_counter() - start)
+    app.processEvents()
+    return samples
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"  {name:<10} median {statistics.median(samples) * 1e6:8.0f} us   p95 {p95 * 1e6:8.0f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    icons = ["fa5b.github", "fa5s.terminal", "fa5s.music"]
+    a, b = make_preset("alpha", icons), make_preset("beta", icons[::-1])
+
+    presets = FakePresets(a)
+    painted = OverlayWindow(presets)
+    painted.findChild(QFrame, "overlayFrame").setGraphicsEffect(None)
+    widgets = {"legacy": LegacyOverlay(presets), "painted": painted}
+    for widget in widgets.values():
+        widget.show()
+    app.processEvents()
+
+    cases = (("switch, refresh only", [b, a], False),
+             ("switch, refresh + paint", [b, a], True),
+             ("unchanged, refresh + paint", [a], True))
+    for title, sequence, paint in cases:
+        print(f"{title} ({args.rounds} rounds):")
+        for name, widget in widgets.items():
+            # Warm up caches (icons, fonts, style sheets) before timing
+            time_refreshes(app, widget, presets, sequence, 10, paint)
+            report(name, time_refreshes(app, widget, presets, sequence, args.rounds, paint))
+        print()
+
+
+if __name__ == "__main__":
+    main()
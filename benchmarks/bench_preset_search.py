@@ -0,0 +1,111 @@
+"""Per-keystroke latency of the preset search index.
+
+Builds a PresetIndex over synthetic presets shaped like the real ones (12 keys with
+labels, URLs, commands and icons) and times every prefix of a set of queries, as if
+typed one character at a time. A keystroke is what the presets page does: match the
+query and pull the first page of names. Full materialization and incremental updates
+are timed too, and so is the first keystroke through a PresetManager over the same
+presets on disk: with the index built on that keystroke, and after build_index() has
+built it in the background at load time.
+
+    python benchmarks/bench_preset_search.py [--presets 10000] [--seed 1]
+"""
+
+import argparse
+import itertools
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from core.preset_index import PresetIndex  # noqa: E402
+from core.preset_manager import PresetManager  # noqa: E402
+
+WORDS = ("github discord spotify obs scene mute camera deploy build test stream chat mail "
+         "volume zoom record screenshot terminal browser editor review docs slack jira notes "
+         "lights music pause play next previous layer macro snippet format backup sync").split()
+ICONS = ["fa5b.github", "fa5b.discord", "fa5s.terminal", "fa5s.music", "fa5s.video", "fa5s.cog"]
+PAGE = 100  # PresetListModel.BATCH
+QUERIES = ["github", "obs scene", "deploy prod", "fa5b", "vol", "preset 42", "zzz", "s"]
+
+
+def make_preset(rng, i):
+    keys = []
+    for _ in range(12):
+        kind = rng.choice(("open_website", "run_command", "key_combo", "none"))
+        words = rng.sample(WORDS, 2)
+        keys.append({
+            "type": kind,
+            "label": " ".join(words).title(),
+            "value": f"https://{words[0]}.example.com/{rng.randrange(1000)}" if kind == "open_website"
+                     else f"{words[1]} --env prod{rng.randrange(50)}" if kind == "run_command" else "ctrl+shift+a",
+            "icon": rng.choice(ICONS),
+        })
+    return f"preset {i} {rng.choice(WORDS)}", {"keys": keys}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--presets", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    presets = [make_preset(rng, i) for i in range(args.presets)]
+
+    index = PresetIndex()
+    start = time.perf_counter()
+    for name, data in presets:
+        index.update(name, data)
+    print(f"indexed {len(index)} presets, {len(index.postings)} words in {time.perf_counter() - start:.2f} s\n")
+
+    print(f"{'query':<14}{'results':>9}{'mean us':>10}{'max us':>10}{'all names us':>14}")
+    worst = []
+    for query in QUERIES:
+        times = []
+        for n in range(1, len(query) + 1):
+            start = time.perf_counter()
+            for _ in range(20):
+                page = list(itertools.islice(index.iter_names(index.match(query[:n])), PAGE))
+            times.append((time.perf_counter() - start) / 20 * 1e6)
+        worst.append(max(times))
+        start = time.perf_counter()
+        results = index.search(query)
+        full = (time.perf_counter() - start) * 1e6
+        print(f"{query:<14}{len(results):>9}{statistics.mean(times):>10.1f}{max(times):>10.1f}{full:>14.1f}")
+
+    start = time.perf_counter()
+    for name, data in rng.sample(presets, 200):
+        data["keys"][0]["label"] = rng.choice(WORDS)
+        index.update(name, data)
+    print(f"\nincremental update: {(time.perf_counter() - start) / 200 * 1e6:.1f} us per preset")
+    print(f"slowest keystroke: {max(worst):.1f} us")
+
+    with tempfile.TemporaryDirectory() as folder:
+        for i, (name, data) in enumerate(presets):
+            with open(Path(folder) / f"p{i}.json", "w", encoding="utf-8") as f:
+                json.dump({"name": name, **data}, f)
+
+        manager = PresetManager(folder)
+        start = time.perf_counter()
+        next(manager.search(QUERIES[0][0]), None)
+        print(f"\nfirst keystroke, index built on demand: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        manager = PresetManager(folder)
+        start = time.perf_counter()
+        manager.build_index()
+        manager._builder.join()  # The app keeps running meanwhile; wait here to time the keystroke alone
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        next(manager.search(QUERIES[0][0]), None)
+        print(f"first keystroke after build_index(): {(time.perf_counter() - start) * 1000:.2f} ms "
+              f"(background build took {built:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Cost of the key scheduler with many schedules.
+
+Loads synthetic presets carrying time-of-day, interval and after-key schedules into
+one Scheduler and times the load, a single-preset reload (as after an edit on disk),
+and running a backlog of due schedules, as after waking from sleep. Checks that all
+of it runs on the one timer the scheduler owns.
+
+    python benchmarks/bench_scheduler.py [--schedules 10000] [--per-preset 10]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from qt_refs import pin_singletons  # noqa: E402
+
+pin_singletons()
+
+from PySide6.QtCore import QCoreApplication, QTimer  # noqa: E402
+
+import core.scheduler as scheduler_module  # noqa: E402
+from core.scheduler import Scheduler  # noqa: E402
+
+
+class FakePresets:
+    """The two PresetManager methods the scheduler reads presets through."""
+
+    def __init__(self, presets):
+        self.presets = presets
+
+    def list_presets(self):
+        return list(self.presets)
+
+    def peek_preset_data(self, name):
+        return self.presets.get(name)
+
+
+def make_presets(rng, schedules, per_preset):
+    presets = {}
+    for i in range((schedules + per_preset - 1) // per_preset):
+        entries = []
+        for _ in range(min(per_preset, schedules - i * per_preset)):
+            kind = rng.randrange(3)
+            key = rng.randrange(1, 13)
+            if kind == 0:
+                entries.append({"key": key, "at": f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"})
+            elif kind == 1:
+                entries.append({"key": key, "every": rng.choice((60, 300, 900, 3600))})
+            else:
+                entries.append({"key": key, "after_key": rng.randrange(1, 13), "delay": rng.randrange(1, 60)})
+        presets[f"preset{i}"] = {"keys": [], "schedules": entries}
+    return presets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schedules", type=int, default=10000)
+    parser.add_argument("--per-preset", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    rng = random.Random(args.seed)
+    presets = make_presets(rng, args.schedules, args.per_preset)
+    sched = Scheduler(FakePresets(presets))
+    fired = []
+    sched.fired.connect(lambda preset, key, late: fired.append(late))
+
+    start = time.perf_counter()
+    sched.load_all()
+    print(f"loaded {len(sched)} schedules from {len(presets)} presets in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms, {len(sched.heap)} queued")
+
+    names = list(presets)
+    start = time.perf_counter()
+    for name in rng.sample(names, min(200, len(names))):
+        sched.reload(name)
+    print(f"reload of one preset: {(time.perf_counter() - start) / min(200, len(names)) * 1e6:.1f} us "
+          f"(heap {len(sched.heap)} entries)")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        sched.key_pressed(rng.choice(names), rng.randrange(1, 13))
+    print(f"key press with delayed schedules: {(time.perf_counter() - start) / 1000 * 1e6:.1f} us")
+
+    # Wake up a day later: every queued run is due at once and late
+    real_time = scheduler_module.time.time
+    scheduler_module.time.time = lambda: real_time() + 86400 * 2
+    try:
+        start = time.perf_counter()
+        sched.run_due()
+        elapsed = time.perf_counter() - start
+    finally:
+        scheduler_module.time.time = real_time
+    print(f"backlog after a long sleep: {len(fired)} runs ({sum(fired)} late) in {elapsed * 1000:.1f} ms, "
+          f"{elapsed / max(len(fired), 1) * 1e6:.1f} us per run")
+
+    timers = sched.findChildren(QTimer)
+    print(f"timers: {len(timers)}")
+    return 0 if len(timers) == 1 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
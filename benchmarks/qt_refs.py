@@ -0,0 +1,17 @@
+"""Keeps long benchmark runs alive on PySide6 builds that leak reference releases.
+
+Some PySide6 builds release a reference to None on every call to a void method, and
+to True/False when they pass through a signal. These objects are only immortal from
+Python 3.12; before that, the tens of thousands of calls a benchmark makes drive
+their count to zero and the interpreter aborts freeing them. The scripts here call
+pin_singletons() before touching Qt to add references that are never released.
+"""
+
+import ctypes
+import sys
+
+
+def pin_singletons():
+    if sys.version_info < (3, 12):
+        for obj in (None, True, False):
+            ctypes.c_ssize_t.from_address(id(obj)).value += 1 << 40
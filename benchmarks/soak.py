@@ -0,0 +1,245 @@
+"""Soak test: drives the whole app for a long session and fails if memory keeps growing.
+
+Runs MainWindow on the offscreen Qt platform against a throwaway copy of app/ (so
+presets, stats, logs and settings on disk are never touched) and replays a long
+session: key presses, PREV/NEXT bursts, direct preset switches, overlay toggles,
+editor saves, theme switches and hide/show cycles that release and rebuild the UI.
+Actions are recorded instead of run. Every --sample-every presses it records
+Python heap (tracemalloc), live QObjects and RSS. Growth is measured from the first
+sample after --warmup presses to the end; going past any --max-* limit prints the
+biggest Python allocation sites and QObject classes that grew, and exits with 1.
+
+The 3D model view is replaced by an empty widget unless --webengine is given; its
+renderer lives in a separate process that this harness doesn't measure anyway.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/soak.py [--presses 200000] [--csv soak.csv]
+"""
+
+import argparse
+import collections
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+APP = Path(__file__).resolve().parent.parent / "app"
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from qt_refs import pin_singletons  # noqa: E402
+
+pin_singletons()
+
+ICONS = ["fa5b.github", "fa5s.terminal", "fa5s.music", "fa5s.video", ""]
+
+
+class RecordingLauncher:
+    """Stands in for Launcher and UrlDispatcher: counts what would have been run."""
+
+    def __init__(self):
+        self.calls = collections.Counter()
+
+    def open_app(self, value):
+        self.calls["open_app"] += 1
+
+    def run_command(self, value):
+        self.calls["run_command"] += 1
+
+    def open(self, value):
+        self.calls["open_website"] += 1
+
+    def shutdown(self):
+        pass
+
+
+class NoKeys:
+    """Key combo / type text plugin that doesn't touch the real keyboard."""
+    label = "Keys (soak)"
+    schema = {"value": {"type": "keys", "required": True}}
+
+    def execute(self, action, executor):
+        executor.launcher.calls[action.get("type")] += 1
+
+
+def make_sandbox(presets):
+    """Copies app/ to a temp dir, with `presets` extra presets and no pads configured."""
+    root = Path(tempfile.mkdtemp(prefix="macropad-soak-"))
+    shutil.copytree(APP, root / "app", ignore=shutil.ignore_patterns(
+        "__pycache__", "profiles", "logs", "usage_stats.json", "settings.json"))
+    (root / "app" / "devices.json").write_text("[]", encoding="utf-8")
+    rng = random.Random(1)
+    for i in range(presets):
+        keys = []
+        for k in range(12):
+            kind = rng.choice(("open_website", "run_command", "key_combo", "none"))
+            keys.append({"type": kind, "value": f"soak-{i}-{k}", "label": f"Soak {i}.{k}",
+                         "icon": rng.choice(ICONS)})
+        with open(root / "app" / "presets" / f"soak{i:02d}.json", "w", encoding="utf-8") as f:
+            json.dump({"name": f"soak{i:02d}", "keys": keys}, f)
+    return root
+
+
+def qobject_counts(app, QObject):
+    counts = collections.Counter()
+    roots = list(app.topLevelWidgets()) + [app]
+    for root in roots:
+        counts[type(root).__name__] += 1
+        for child in root.findChildren(QObject):
+            counts[type(child).__name__] += 1
+    return counts
+
+
+def settle(app, QCoreApplication, QEvent):
+    # Let deleteLater() and queued work run, then collect Python garbage
+    for _ in range(3):
+        app.processEvents()
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    gc.collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--presses", type=int, default=200000)
+    parser.add_argument("--presets", type=int, default=12, help="extra presets to cycle through")
+    parser.add_argument("--warmup", type=int, default=20000, help="presses before the baseline sample")
+    parser.add_argument("--sample-every", type=int, default=10000)
+    parser.add_argument("--max-py-growth", type=float, default=4.0, help="MB of Python heap")
+    parser.add_argument("--max-qobject-growth", type=int, default=100)
+    parser.add_argument("--max-rss-growth", type=float, default=48.0, help="MB")
+    parser.add_argument("--csv", help="write the samples to this file")
+    parser.add_argument("--webengine", action="store_true", help="keep the real 3D model view")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="keep the sandbox directory")
+    args = parser.parse_args()
+
+    sandbox = make_sandbox(args.presets)
+    sys.path.insert(0, str(sandbox / "app"))
+
+    from PySide6.QtWidgets import QApplication, QWidget
+    from PySide6.QtCore import QCoreApplication, QEvent, QObject
+
+    app = QApplication(sys.argv)
+
+    import main as app_main
+    from core.action_executor import ActionExecutor
+    from core.action_registry import ActionRegistry, BUILTIN_ACTIONS
+    from core.memory import rss_bytes
+    from ui.action_editor import ActionEditor
+    from ui.theme import theme
+    import ui.main_window
+
+    if not args.webengine:
+        ui.main_window.RotatingModelWidget = lambda model_path: QWidget()
+
+    window = app_main.MainWindow()
+    launcher = RecordingLauncher()
+    registry = ActionRegistry({**BUILTIN_ACTIONS, "key_combo": "__main__:NoKeys", "type_text": "__main__:NoKeys"})
+    window.executor = ActionExecutor(launcher, launcher, registry)
+    window.show()
+    settle(app, QCoreApplication, QEvent)
+
+    rng = random.Random(args.seed)
+    presets = window.presets.list_presets()
+    themes = theme.names()
+    for name in themes:
+        theme.compile(name)  # A one-off cache per theme, not growth
+    samples = []
+    baseline = None
+    tracemalloc.start(10)
+    started = time.perf_counter()
+
+    def sample(press):
+        settle(app, QCoreApplication, QEvent)
+        counts = qobject_counts(app, QObject)
+        row = {"press": press, "seconds": round(time.perf_counter() - started, 1),
+               "py_mb": tracemalloc.get_traced_memory()[0] / 2**20,
+               "qobjects": sum(counts.values()), "rss_mb": rss_bytes() / 2**20}
+        samples.append(row)
+        print(f"{press:>8} presses  {row['seconds']:>7.1f} s  python {row['py_mb']:7.2f} MB  "
+              f"qobjects {row['qobjects']:>6}  rss {row['rss_mb']:7.1f} MB")
+        return row, counts
+
+    for press in range(1, args.presses + 1):
+        key = rng.randrange(1, 13)
+        window.handle_key_press(key)
+
+        if press % 50 == 0:
+            # A burst of PREV/NEXT, then let the switch settle
+            for _ in range(rng.randrange(1, 6)):
+                window.handle_key_press(rng.choice((15, 16)))
+            window.settle_preset()
+        if press % 97 == 0:
+            window.switch_preset(rng.choice(presets))
+        if press % 151 == 0:
+            window.handle_key_press(14)  # Overlay toggle
+        if press % 499 == 0:
+            editor = ActionEditor(rng.randrange(12), window.presets)
+            editor.label_input.setText(f"Edited {press}")
+            editor.update_icon(rng.choice(ICONS))
+            editor.save()
+            editor.deleteLater()
+            window.view.reload_all_pages()
+            if window.overlay:
+                window.overlay.refresh()
+        if press % 4999 == 0:
+            window.set_theme(rng.choice(themes))
+        if press % 7919 == 0:
+            # Hidden in the tray long enough to release the UI, then shown again
+            window.hide()
+            window.release_ui_resources()
+            settle(app, QCoreApplication, QEvent)
+            window.show_interface()
+        if press % 20 == 0:
+            app.processEvents()
+
+        if press == args.warmup:
+            baseline = sample(press) + (tracemalloc.take_snapshot(),)
+        elif press % args.sample_every == 0 and press < args.presses:
+            sample(press)
+
+    # Always end on a sample, even when the run stops right at the warm-up
+    last = sample(args.presses)
+
+    if args.csv:
+        with open(args.csv, "w", encoding="utf-8") as f:
+            f.write(",".join(samples[0]) + "\n")
+            for row in samples:
+                f.write(",".join(f"{v:.3f}" if isinstance(v, float) else str(v) for v in row.values()) + "\n")
+
+    print(f"\nactions recorded: {dict(launcher.calls)}")
+    if baseline is None:
+        print("run ended before the warm-up; nothing to compare")
+        return 0
+
+    (base, base_counts, base_snapshot), (end, end_counts) = baseline, last
+    growth = {"py_mb": end["py_mb"] - base["py_mb"], "qobjects": end["qobjects"] - base["qobjects"],
+              "rss_mb": end["rss_mb"] - base["rss_mb"]}
+    limits = {"py_mb": args.max_py_growth, "qobjects": args.max_qobject_growth, "rss_mb": args.max_rss_growth}
+    print(f"growth after warm-up: python {growth['py_mb']:+.2f} MB, "
+          f"qobjects {growth['qobjects']:+d}, rss {growth['rss_mb']:+.1f} MB")
+    failed = [k for k in growth if growth[k] > limits[k]]
+
+    if failed:
+        print(f"\nFAIL: {', '.join(failed)} grew past the limit")
+        print("\nPython allocation sites that grew the most:")
+        for stat in tracemalloc.take_snapshot().compare_to(base_snapshot, "traceback")[:10]:
+            print(f"  {stat.size_diff / 1024:+9.1f} KB {stat.count_diff:+7d} blocks  "
+                  f"{stat.traceback.format()[-2].strip() if len(stat.traceback) > 1 else stat.traceback}")
+        print("\nQObject classes that grew:")
+        for name, diff in (end_counts - base_counts).most_common(10):
+            print(f"  {diff:+6d}  {name}")
+    else:
+        print("OK")
+
+    if not args.keep:
+        shutil.rmtree(sandbox, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())